@@ -13,14 +13,25 @@
 # limitations under the License.
 """API reference storage and search."""
 
+import functools
 import re
 
 from abc import ABC, abstractmethod
 from collections import defaultdict
-from typing import Dict, List, Optional, Tuple
+from operator import itemgetter
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 from .model import Member, ReferableElement
 
+# Full name split in namespaces and the element name
+NamePath = Tuple[str, ...]
+
+# Normalized type of each parameter
+Signature = Tuple[str, ...]
+
+# Elements are stored with their position, to merge results from multiple lists in order
+_IndexEntry = Tuple[int, ReferableElement]
+
 
 class AmbiguousLookupError(Exception):
     """There are multiple elements matching your query. Make the query more specific.
@@ -256,24 +267,8 @@ class ParameterTypeMatcher(ElementFilter):
         if self.arg_types is None:
             return True
 
-        if not isinstance(potential_match, Member):
-            return False
-
-        params = potential_match.params or []
-
-        if not self.arg_types and not params:
-            return True
-
-        if len(self.arg_types) != len(params):
-            return False
-
-        for expected_type, param in zip(self.arg_types, params):
-            assert param.type
-
-            if self._normalize(str(param.type)) != expected_type:
-                return False
-
-        return True
+        signature = self.signature(potential_match)
+        return signature is not None and list(signature) == self.arg_types
 
     @property
     def applies(self) -> bool:
@@ -335,15 +330,78 @@ class ParameterTypeMatcher(ElementFilter):
 
         return args
 
-    @staticmethod
-    def _normalize(name: str) -> str:
+    _WHITESPACE = re.compile(r"\s+")
+    _SPACE_BEFORE_SYMBOL = re.compile(r"(\w)\s(\W)")
+    _SPACE_AFTER_SYMBOL = re.compile(r"(\W)\s(\w)")
+    _SPACE_BETWEEN_SYMBOLS = re.compile(r"(\W)\s(\W)")
+
+    @classmethod
+    @functools.lru_cache(maxsize=4096)
+    def _normalize(cls, name: str) -> str:
         name = name.strip()
-        name = re.sub(r"\s+", " ", name)
-        name = re.sub(r"(\w)\s(\W)", r"\1\2", name)
-        name = re.sub(r"(\W)\s(\w)", r"\1\2", name)
-        name = re.sub(r"(\W)\s(\W)", r"\1\2", name)
+        if not cls._WHITESPACE.search(name):
+            return name
+        name = cls._WHITESPACE.sub(" ", name)
+        name = cls._SPACE_BEFORE_SYMBOL.sub(r"\1\2", name)
+        name = cls._SPACE_AFTER_SYMBOL.sub(r"\1\2", name)
+        name = cls._SPACE_BETWEEN_SYMBOLS.sub(r"\1\2", name)
         return name
 
+    @classmethod
+    def signature(cls, element: ReferableElement) -> Optional[Signature]:
+        """Normalized parameter types of an element, as matched against the required types.
+
+        Returns:
+            The normalized type of each parameter, or None if the element has no typed parameters.
+        """
+        if not isinstance(element, Member):
+            return None
+        params = element.params or []
+        if any(param.type is None for param in params):
+            return None
+        return tuple(cls._normalize(str(param.type)) for param in params)
+
+
+class ElementLoader(ABC):
+    """Base class for loading elements into an API reference on demand.
+
+    Before searching, the API reference asks the loader to load all elements that can match the
+    search. A loader only needs to load elements once, later requests for the same elements should
+    be ignored.
+    """
+    @abstractmethod
+    def load_name(self, name: str) -> None:
+        """Load all elements with the given short name.
+
+        Args:
+            name: Name of the elements without namespace or enclosing scope.
+        """
+
+    @abstractmethod
+    def load_id(self, target_id: str) -> None:
+        """Load the element with the given id.
+
+        Args:
+            target_id: Unique id of the element.
+        """
+
+
+FindCacheKey = Tuple[Optional[str], Optional[str], Optional[str], Optional[str], Optional[str],
+                     bool]
+
+
+class _FindResult(NamedTuple):
+    """Outcome of a search in the API reference.
+
+    Attributes:
+        short_name: Name used to load elements on demand. None when searching by id.
+        element:    The element found, if any.
+        candidates: All matching elements if the search is ambiguous.
+    """
+    short_name: Optional[str]
+    element: Optional[ReferableElement] = None
+    candidates: Optional[List[ReferableElement]] = None
+
 
 class ApiReference:
     """Collection of API reference information.
@@ -351,19 +409,43 @@ class ApiReference:
     Mainains the collection of available elements and allows searching for specific elements.
 
     Attributes:
-        elements: All contained API reference elements.
+        elements:     All contained API reference elements. When using a loader, only the
+                          elements loaded until now.
+        loader:       Optional loader for elements that are not loaded yet.
+        cache_hits:   Number of `find` calls answered from the cache.
+        cache_misses: Number of `find` calls that searched the indices.
     """
     elements: List[ReferableElement]
+    loader: Optional[ElementLoader]
+    cache_hits: int
+    cache_misses: int
     _id_index: Dict[str, ReferableElement]
     _name_index: Dict[str, List[ReferableElement]]
+    _suffix_index: Dict[str, List[ReferableElement]]
+    _full_name_index: Dict[str, List[ReferableElement]]
+    _path_index: Dict[NamePath, List[_IndexEntry]]
+    _signature_index: Dict[Tuple[NamePath, Signature], List[_IndexEntry]]
+    _find_cache: Dict[FindCacheKey, _FindResult]
+
+    SUFFIX_SEPARATOR = "::"
 
-    def __init__(self):
+    def __init__(self, loader: Optional[ElementLoader] = None):
         self.elements = []
+        self.loader = loader
         self._id_index = {}
         self._name_index = defaultdict(list)
+        self._suffix_index = defaultdict(list)
+        self._full_name_index = defaultdict(list)
+        self._path_index = defaultdict(list)
+        self._signature_index = defaultdict(list)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._find_cache = {}
 
     def append(self, element: ReferableElement) -> None:
         self.elements.append(element)
+        if self._find_cache:
+            self._find_cache.clear()
 
         assert element.id
         # TODO assert element.id not in self._id_index
@@ -372,6 +454,39 @@ class ApiReference:
         assert element.name
         self._name_index[element.name].append(element)
 
+        if element.full_name:
+            self._full_name_index[element.full_name].append(element)
+
+            path = tuple(NameFilter._split_namespaces(element.full_name))
+            position = len(self.elements) - 1
+            self._path_index[path].append((position, element))
+
+            # Overload sets are indexed by the parameter types as well
+            signature = ParameterTypeMatcher.signature(element)
+            if signature is not None:
+                self._signature_index[(path, signature)].append((position, element))
+
+            separator_index = element.full_name.find(self.SUFFIX_SEPARATOR)
+            while separator_index != -1:
+                suffix = element.full_name[separator_index + len(self.SUFFIX_SEPARATOR):]
+                self._suffix_index[suffix].append(element)
+                separator_index = element.full_name.find(self.SUFFIX_SEPARATOR, separator_index + 1)
+
+    def find_by_suffix(self, name: str) -> List[ReferableElement]:
+        """Find all elements that are contained in a namespace or scope, and match a partial name.
+
+        An element matches if its fully qualified name ends with `::` followed by `name`.
+
+        Args:
+            name: Partial name to search for. Can contain namespaces or scopes itself.
+
+        Returns:
+            All matching elements, in the order they were added.
+        """
+        if self.loader is not None:
+            self.loader.load_name(name.rsplit(self.SUFFIX_SEPARATOR, maxsplit=1)[-1])
+        return list(self._suffix_index.get(name, []))
+
     def find(self,
              name: Optional[str] = None,
              *,
@@ -398,17 +513,42 @@ class ApiReference:
             target_id:       [Optional] Id of referred object
             allow_overloads: [Optional] Set to True to return the first match of an overload set.
 
+        Results, including ambiguous lookups, are cached until new elements are added.
+
         Returns:
             Information about the API element, or None if not found.
 
         Raises:
             AmbiguousLookupError: There are multiple matching elements. Make your query more narrow.
         """
-        if target_id is not None:
-            return self._id_index.get(target_id, None)
-        elif name is None:
+        if target_id is None and name is None:
             return None
 
+        key = (name, namespace, kind, lang, target_id, allow_overloads)
+        result = self._find_cache.get(key)
+        if result is not None and self.loader is not None:
+            self._load(target_id, result.short_name)
+            # Loading new elements clears all cached results
+            result = self._find_cache.get(key)
+
+        if result is None:
+            self.cache_misses += 1
+            result = self._find(name, namespace, kind, lang, target_id, allow_overloads)
+            self._find_cache[key] = result
+        else:
+            self.cache_hits += 1
+
+        if result.candidates is not None:
+            raise AmbiguousLookupError(list(result.candidates))
+        return result.element
+
+    def _find(self, name: Optional[str], namespace: Optional[str], kind: Optional[str],
+              lang: Optional[str], target_id: Optional[str], allow_overloads: bool) -> _FindResult:
+        if target_id is not None:
+            self._load(target_id, None)
+            return _FindResult(None, self._id_index.get(target_id, None))
+
+        assert name is not None
         paramtype_matcher = ParameterTypeMatcher(name)
         if paramtype_matcher.applies:
             name = paramtype_matcher.name
@@ -420,33 +560,95 @@ class ApiReference:
         else:
             short_name = name
 
-        potential_matches = self._name_index[short_name]
-        if len(potential_matches) == 0:
-            return None
+        self._load(None, short_name)
 
-        element_filter = CombinedFilter(NameFilter(name, namespace), KindFilter(kind),
-                                        LangFilter(lang), paramtype_matcher)
+        if not self._name_index.get(short_name):
+            return _FindResult(short_name)
 
-        matches = [e for e in potential_matches if element_filter(e)]
+        # Parameter types are matched by the signature index
+        signature: Optional[Signature] = None
+        if paramtype_matcher.arg_types is not None:
+            signature = tuple(paramtype_matcher.arg_types)
+        element_filter = CombinedFilter(KindFilter(kind), LangFilter(lang))
+
+        matches = [
+            e for e in self._find_by_name(name, short_name, namespace, signature=signature)
+            if element_filter(e)
+        ]
 
         if len(matches) == 1:
-            return matches[0]
+            return _FindResult(short_name, matches[0])
         elif len(matches) == 0:
-            return None
+            return _FindResult(short_name)
 
         if namespace is not None:
             exact_matches = [
-                e for e in matches if NameFilter(name, namespace, exact_namespace=True)(e)
+                e for e in self._find_by_name(
+                    name, short_name, namespace, exact_namespace=True, signature=signature)
+                if element_filter(e)
             ]
             if len(exact_matches) == 1:
-                return exact_matches[0]
+                return _FindResult(short_name, exact_matches[0])
 
-            matches_without_namespace = [e for e in matches if NameFilter(name)(e)]
+            matches_without_namespace = [
+                e for e in self._find_by_name(name, short_name, signature=signature)
+                if element_filter(e)
+            ]
             if len(matches_without_namespace) == 1:
-                return matches_without_namespace[0]
+                return _FindResult(short_name, matches_without_namespace[0])
 
         if allow_overloads and all(e.full_name == matches[0].full_name and e.kind == matches[0].kind
                                    and e.language == matches[0].language for e in matches):
-            return matches[0]
+            return _FindResult(short_name, matches[0])
 
-        raise AmbiguousLookupError(matches)
+        return _FindResult(short_name, candidates=matches)
+
+    def _load(self, target_id: Optional[str], short_name: Optional[str]) -> None:
+        if self.loader is None:
+            return
+        if target_id is not None:
+            self.loader.load_id(target_id)
+        elif short_name is not None:
+            self.loader.load_name(short_name)
+
+    def _find_by_name(self,
+                      name: str,
+                      short_name: str,
+                      namespace: Optional[str] = None,
+                      exact_namespace: bool = False,
+                      signature: Optional[Signature] = None) -> List[ReferableElement]:
+        """Find all elements matching a name, like `NameFilter` does, using the indices.
+
+        Instead of splitting the full name of each candidate, all namespace paths that can match
+        are looked up directly. If a signature is given, only elements with exactly these
+        normalized parameter types are found, like `ParameterTypeMatcher` does.
+
+        Returns:
+            All matching elements, in the order they were added.
+        """
+        if namespace is None:
+            if signature is None:
+                return [e for e in self._full_name_index.get(name, []) if e.name == short_name]
+            path = tuple(NameFilter._split_namespaces(name))
+            return [
+                e for _, e in self._signature_index.get((path, signature), [])
+                if e.full_name == name and e.name == short_name
+            ]
+
+        name_parts = tuple(NameFilter._split_namespaces(name))
+        namespace_parts = tuple(NameFilter._split_namespaces(namespace))
+        if exact_namespace:
+            paths = [namespace_parts + name_parts]
+        else:
+            paths = [namespace_parts[:i] + name_parts for i in range(len(namespace_parts) + 1)]
+
+        if signature is None:
+            found = [entry for path in paths for entry in self._path_index.get(path, [])]
+        else:
+            found = [
+                entry for path in paths
+                for entry in self._signature_index.get((path, signature), [])
+            ]
+        if len(paths) > 1:
+            found.sort(key=itemgetter(0))
+        return [e for _, e in found if e.name == short_name and e.full_name.endswith(name)]
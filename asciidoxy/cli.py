@@ -17,12 +17,14 @@ import argparse
 import asyncio
 import json
 import logging
+import os
 import shutil
 import subprocess
 import sys
 
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Optional, Sequence, List
+from typing import Dict, Optional, Sequence, List, Tuple
 
 from mako.exceptions import RichTraceback
 from tqdm import tqdm
@@ -31,9 +33,12 @@ from .api_reference import ApiReference
 from .collect import collect, specs_from_file, CollectError, SpecificationError
 from .doxygenparser import Driver as ParserDriver
 from .generator import process_adoc, AsciiDocError
+from .generator.dependencies import DependencyGraph, fingerprint_files
 from .model import json_repr
 from ._version import __version__
 
+logger = logging.getLogger(__name__)
+
 
 def error(*args, **kwargs) -> None:
     kwargs["file"] = sys.stderr
@@ -51,14 +56,150 @@ def asciidoctor(destination_dir: Path, out_file: Path, processed_file: Path, mul
                    check=True)
 
 
+def asciidoctor_batch(destination_dir: Path, conversions: Sequence[Tuple[Path, Path]],
+                      multipage: bool, backend: str, extra_args: Sequence[str]) -> None:
+    """Convert multiple generated documents in a single AsciiDoctor process.
+
+    AsciiDoctor names the output files after the input files. After converting, the output files
+    are renamed to the requested names. If the conversion fails, the output files written so far are
+    removed.
+
+    Args:
+        destination_dir: Directory to write all output files to.
+        conversions:     Generated AsciiDoc files with the output file to convert each of them to.
+        multipage:       True when multi page output is enabled.
+        backend:         AsciiDoctor backend to use.
+        extra_args:      Additional command line arguments for AsciiDoctor.
+
+    Raises:
+        CalledProcessError: AsciiDoctor failed.
+    """
+    generated_files = [(destination_dir / processed_file.with_suffix(out_file.suffix).name,
+                        out_file) for processed_file, out_file in conversions]
+
+    input_files = " ".join(os.fspath(processed_file) for processed_file, _ in conversions)
+    try:
+        subprocess.run([
+            f"asciidoctor -D {destination_dir} -b {backend} "
+            f"{'-a multipage ' if multipage else ''}"
+            f"{input_files} {' '.join(extra_args)}"
+        ],
+                       shell=True,
+                       check=True)
+    except subprocess.CalledProcessError:
+        for generated_file, _ in generated_files:
+            if generated_file.is_file():
+                generated_file.unlink()
+        raise
+
+    for generated_file, out_file in generated_files:
+        os.replace(generated_file, out_file)
+
+
+def _batches(conversions: Sequence[Tuple[Path, Path]], batch_size: int,
+             jobs: int) -> List[List[Tuple[Path, Path]]]:
+    # Keep all jobs busy, and only combine documents with the same destination directory
+    jobs = max(1, jobs)
+    batch_size = max(1, min(batch_size, (len(conversions) + jobs - 1) // jobs))
+    batches: List[List[Tuple[Path, Path]]] = []
+    open_batches: Dict[Path, List[Tuple[Path, Path]]] = {}
+    for processed_file, out_file in conversions:
+        batch = open_batches.get(out_file.parent)
+        if batch is None or len(batch) >= batch_size:
+            batch = []
+            batches.append(batch)
+            open_batches[out_file.parent] = batch
+        batch.append((processed_file, out_file))
+    return batches
+
+
+def run_asciidoctor(conversions: Sequence[Tuple[Path, Path]],
+                    destination_dir: Path,
+                    multipage: bool,
+                    backend: str,
+                    extra_args: Sequence[str],
+                    jobs: int = 1,
+                    fail_fast: bool = False,
+                    progress: Optional[tqdm] = None,
+                    batch_size: int = 1) -> Tuple[List[Path], List[Path]]:
+    """Convert generated documents using AsciiDoctor.
+
+    AsciiDoctor runs in separate processes, so the conversions are started from a pool of threads.
+    At most `jobs` conversions run at the same time. A failing conversion is reported for its own
+    file.
+
+    With a batch size larger than 1, multiple documents with the same destination directory are
+    converted by a single AsciiDoctor process, to reduce the time spent starting AsciiDoctor. If a
+    batch fails, its documents are converted separately to find the failing ones. When failing
+    fast, all documents in the batch are considered failed.
+
+    Args:
+        conversions:     Generated AsciiDoc files with the output file to convert each of them to.
+        destination_dir: Destination directory for the output files.
+        multipage:       True when multi page output is enabled.
+        backend:         AsciiDoctor backend to use.
+        extra_args:      Additional command line arguments for AsciiDoctor.
+        jobs:            Maximum number of conversions to run at the same time.
+        fail_fast:       True to stop converting after the first failure.
+        progress:        Optional progress bar to update while converting.
+        batch_size:      Maximum number of documents to convert in a single AsciiDoctor process.
+
+    Returns:
+        The output files converted successfully, and the output files that failed to convert.
+    """
+    converted: List[Path] = []
+    failed: List[Path] = []
+    remaining = list(reversed(_batches(conversions, batch_size, jobs)))
+    running: Dict[Future, List[Tuple[Path, Path]]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        while remaining or running:
+            # Only start conversions when a job is free, so nothing new starts after a failure
+            while remaining and len(running) < max(1, jobs) and not (fail_fast and failed):
+                batch = remaining.pop()
+                if len(batch) == 1:
+                    (processed_file, out_file), = batch
+                    future = executor.submit(asciidoctor, destination_dir, out_file, processed_file,
+                                             multipage, backend, extra_args)
+                else:
+                    future = executor.submit(asciidoctor_batch, batch[0][1].parent, batch,
+                                             multipage, backend, extra_args)
+                running[future] = batch
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = running.pop(future)
+                try:
+                    future.result()
+                except subprocess.CalledProcessError as e:
+                    if len(batch) > 1 and not fail_fast:
+                        logger.warning(f"AsciiDoctor failed to convert a batch of {len(batch)}"
+                                       " documents. Converting them separately.")
+                        remaining.extend([conversion] for conversion in reversed(batch))
+                        continue
+                    for processed_file, out_file in batch:
+                        logger.error(f"AsciiDoctor failed to convert {processed_file}"
+                                     f" (exit code {e.returncode}).")
+                        failed.append(out_file)
+                else:
+                    for _, out_file in batch:
+                        converted.append(out_file)
+                        logger.info(f"Generated: {out_file}")
+
+                if progress is not None:
+                    progress.update(len(batch))
+    return converted, failed
+
+
 def copy_and_switch_to_intermediate_dir(in_file: Path, adoc_dirs: List[Path],
                                         build_dir: Path) -> Path:
     intermediate_dir = build_dir / "intermediate"
 
     if intermediate_dir.exists():
-        shutil.rmtree(intermediate_dir)
+        _remove_copied_files(intermediate_dir)
 
-    shutil.copytree(str(in_file.parent), str(intermediate_dir))
+    _copy_tree(in_file.parent, intermediate_dir)
 
     for adoc_dir in adoc_dirs:
         # workaround, in Python 3.8 we can call
@@ -68,6 +209,30 @@ def copy_and_switch_to_intermediate_dir(in_file: Path, adoc_dirs: List[Path],
     return intermediate_dir / in_file.name
 
 
+def _remove_copied_files(intermediate_dir: Path) -> None:
+    # Files generated by AsciiDoxy are kept, so unchanged files do not need to be written again
+    for root, dirs, files in os.walk(intermediate_dir, topdown=False):
+        root_path = Path(root)
+        for name in files:
+            if not name.startswith(".asciidoxy."):
+                (root_path / name).unlink()
+        for name in dirs:
+            dir_path = root_path / name
+            if dir_path.is_symlink():
+                dir_path.unlink()
+            elif not any(dir_path.iterdir()):
+                dir_path.rmdir()
+
+
+def _copy_tree(src: Path, dst: Path) -> None:
+    # workaround, in Python 3.8 we can call `shutil.copytree(src, dst, dirs_exist_ok=True)`
+    for root, _, files in os.walk(src, followlinks=True):
+        target_dir = dst / Path(root).relative_to(src)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        for name in files:
+            shutil.copy2(os.path.join(root, name), os.fspath(target_dir / name))
+
+
 def output_extension(backend: str) -> Optional[str]:
     if backend == "html5":
         return ".html"
@@ -130,6 +295,34 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
                         help="Force language used when parsing doxygen XML files. Ignores the"
                         " language specified in the XML files.")
     parser.add_argument("--multipage", action="store_true", help="Generate multi-page document.")
+    parser.add_argument("-j",
+                        "--jobs",
+                        metavar="JOBS",
+                        type=int,
+                        default=1,
+                        help="Number of processes to use for parallel processing. Defaults to 1.")
+    parser.add_argument("--no-cache",
+                        action="store_true",
+                        help="Do not use cached results from previous runs stored in the build"
+                        " directory.")
+    parser.add_argument("--load-on-demand",
+                        action="store_true",
+                        help="Only load API reference information from Doxygen XML files when it"
+                        " is used. Requires the Doxygen index.")
+    parser.add_argument("--lightweight-preprocessing",
+                        action="store_true",
+                        help="Only discover the document structure when preprocessing, without"
+                        " rendering inserted API reference documentation.")
+    parser.add_argument("--incremental",
+                        action="store_true",
+                        help="Only generate and convert documents for which the input changed since"
+                        " the previous run. Has no effect with --no-cache.")
+    parser.add_argument("--asciidoctor-batch-size",
+                        metavar="BATCH_SIZE",
+                        type=int,
+                        default=1,
+                        help="Maximum number of documents to convert in a single AsciiDoctor"
+                        " process for multi-page documents. Defaults to 1.")
     if argv is None:
         argv = sys.argv[1:]
     args, extra_args = parser.parse_known_args(argv)
@@ -137,8 +330,6 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     log_level = getattr(logging, args.log)
     logging.basicConfig(level=log_level, format="%(levelname)s: %(message)s")
 
-    logger = logging.getLogger(__name__)
-
     build_dir = Path(args.build_dir).resolve()
     if args.destination_dir is not None:
         destination_dir = Path(args.destination_dir).resolve()
@@ -149,6 +340,7 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
         logger.error(f"Backend {args.backend} is not supported.")
         sys.exit(1)
 
+    api_sources: List[Path] = []
     if args.spec_file is not None:
         spec_file = Path(args.spec_file).resolve()
         if args.version_file:
@@ -174,13 +366,25 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
             sys.exit(1)
 
         logger.info("Loading packages")
+        if args.no_cache:
+            cache_dir: Optional[Path] = None
+        else:
+            cache_dir = build_dir / "cache" / "xml"
+        xml_parser = ParserDriver(force_language=args.force_language, cache_dir=cache_dir)
+
         include_dirs: List[Path] = []
-        xml_parser = ParserDriver(force_language=args.force_language)
-        for pkg in tqdm(packages, desc="Loading API reference", unit="pkg"):
+        xml_files: List[Path] = []
+        for pkg in packages:
             include_dirs.extend(pkg.include_dirs)
             for xml_dir in pkg.xml_dirs:
-                for xml_file in xml_dir.glob("**/*.xml"):
-                    xml_parser.parse(xml_file)
+                if args.incremental:
+                    api_sources.extend(xml_dir.glob("**/*.xml"))
+                if args.load_on_demand and xml_parser.parse_index(xml_dir):
+                    continue
+                xml_files.extend(xml_dir.glob("**/*.xml"))
+
+        with tqdm(desc="Loading API reference", unit="file") as progress:
+            xml_parser.parse_all(xml_files, jobs=args.jobs, progress=progress)
 
         with tqdm(desc="Resolving references ", unit="ref") as progress:
             xml_parser.resolve_references(progress)
@@ -199,14 +403,30 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     in_file = copy_and_switch_to_intermediate_dir(
         Path(args.input_file).resolve(), include_dirs, build_dir)
 
+    if args.incremental and not args.no_cache:
+        # Options changing the loaded API reference invalidate all documents
+        api_options = [
+            f"force_language={args.force_language}", f"load_on_demand={args.load_on_demand}"
+        ]
+        dependencies: Optional[DependencyGraph] = DependencyGraph(
+            build_dir / "cache" / "dependencies.json",
+            fingerprint_files(sorted(api_sources), api_options))
+    else:
+        dependencies = None
+
     try:
         with tqdm(desc="Processing asciidoc  ", total=1, unit="file") as progress:
-            in_to_out_file_map = process_adoc(in_file,
-                                              build_dir,
-                                              api_reference,
-                                              warnings_are_errors=args.warnings_are_errors,
-                                              multipage=args.multipage,
-                                              progress=progress)
+            in_to_out_file_map = process_adoc(
+                in_file,
+                build_dir,
+                api_reference,
+                warnings_are_errors=args.warnings_are_errors,
+                multipage=args.multipage,
+                progress=progress,
+                lightweight_preprocessing=args.lightweight_preprocessing,
+                jobs=args.jobs,
+                cache_dir=None if args.no_cache else build_dir / "cache",
+                dependencies=dependencies)
 
     except AsciiDocError as e:
         logger.error(f"Error while processing AsciiDoc file:\n\t{e}")
@@ -217,16 +437,44 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
                 logger.error(f"File {filename}, line {lineno}:\n\t{line}\n")
         sys.exit(1)
 
+    logger.debug(f"API reference lookups: {api_reference.cache_hits} cached,"
+                 f" {api_reference.cache_misses} searched.")
+
     logger.info("Running asciidoctor")
     in_dir = in_file.parent
-    for (in_adoc_file, out_adoc_file) in tqdm(
-        [(k, v) for (k, v) in in_to_out_file_map.items() if args.multipage or k == in_file],
-            desc="Running asciidoctor  ",
-            unit="file"):
+    conversion_options = [args.backend, str(args.multipage), str(destination_dir)] + extra_args
+    conversions = []
+    conversion_keys = {}
+    for (in_adoc_file, out_adoc_file) in in_to_out_file_map.items():
+        if not args.multipage and in_adoc_file != in_file:
+            continue
         out_file = destination_dir / in_adoc_file.relative_to(in_dir).with_suffix(extension)
-        asciidoctor(destination_dir, out_file, out_adoc_file, args.multipage, args.backend,
-                    extra_args)
-        logger.info(f"Generated: {out_file}")
+        if dependencies is not None:
+            key = dependencies.conversion_key(out_adoc_file, conversion_options)
+            if dependencies.is_converted(out_file, key):
+                logger.info(f"Unchanged: {out_file}")
+                continue
+            conversion_keys[out_file] = key
+        conversions.append((out_adoc_file, out_file))
+
+    with tqdm(desc="Running asciidoctor  ", total=len(conversions), unit="file") as progress:
+        converted, failed = run_asciidoctor(conversions,
+                                            destination_dir,
+                                            args.multipage,
+                                            args.backend,
+                                            extra_args,
+                                            jobs=args.jobs,
+                                            fail_fast=args.warnings_are_errors,
+                                            progress=progress,
+                                            batch_size=args.asciidoctor_batch_size)
+
+    if dependencies is not None:
+        for out_file in converted:
+            dependencies.converted(out_file, conversion_keys[out_file])
+        dependencies.save()
+    if failed:
+        logger.error(f"Failed to convert {len(failed)} of {len(conversions)} documents.")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,119 @@
+# Copyright (C) 2019-2020, TomTom (http://tomtom.com).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Persistent cache for elements parsed from Doxygen XML files."""
+
+import hashlib
+import logging
+import os
+import pickle
+import sys
+
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from ..model import ReferableElement, TypeRefBase
+from .._version import __version__
+
+logger = logging.getLogger(__name__)
+
+# Format of the cache entries. Increase when the pickled model classes or description sources
+# change, to avoid loading entries written by other versions of the code.
+CACHE_FORMAT = 1
+
+
+class CacheEntry(NamedTuple):
+    """Result of parsing a single XML file.
+
+    Attributes:
+        parsed:          True if the file is a valid Doxygen XML file.
+        elements:        All elements registered while parsing the file.
+        unresolved_refs: All unresolved references registered while parsing the file.
+    """
+    parsed: bool
+    elements: List[ReferableElement]
+    unresolved_refs: List[TypeRefBase]
+
+
+class ParseCache:
+    """On-disk cache of parse results for Doxygen XML files.
+
+    Entries are keyed by a hash of the XML file contents, the AsciiDoxy version, the cache format,
+    the Python version and the forced language. Changing any of these results in a cache miss.
+
+    Attributes:
+        cache_dir: Directory to store the cache entries in.
+        hits:      Number of entries found in the cache.
+        misses:    Number of entries not found in the cache.
+    """
+    cache_dir: Path
+    hits: int
+    misses: int
+    _force_language: str
+
+    def __init__(self, cache_dir: Path, force_language: Optional[str] = None):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._force_language = force_language or ""
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key(self, data: bytes) -> str:
+        """Determine the cache key for the contents of an XML file."""
+        hasher = hashlib.sha256()
+        # Entries contain pickled and marshalled data, which depends on the Python version
+        python_version = ".".join(str(part) for part in sys.version_info[:2])
+        for part in (__version__, str(CACHE_FORMAT), python_version, self._force_language):
+            hasher.update(part.encode("utf-8"))
+            hasher.update(b"\0")
+        hasher.update(data)
+        return hasher.hexdigest()
+
+    def load(self, key: str) -> Optional[CacheEntry]:
+        """Load an entry from the cache.
+
+        Returns:
+            The cached entry, or None if it is not in the cache or cannot be read.
+        """
+        entry_file = self._entry_file(key)
+        if not entry_file.is_file():
+            self.misses += 1
+            return None
+
+        try:
+            with entry_file.open("rb") as f:
+                entry = pickle.load(f)
+        except Exception:
+            logger.debug(f"Ignoring unreadable cache entry {entry_file}.", exc_info=True)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def store(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry in the cache."""
+        entry_file = self._entry_file(key)
+        tmp_file = entry_file.with_name(f"{entry_file.name}.{os.getpid()}.tmp")
+        try:
+            with tmp_file.open("wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, entry_file)
+        except (OSError, pickle.PicklingError, RecursionError):
+            logger.debug(f"Failed to write cache entry {entry_file}.", exc_info=True)
+            if tmp_file.exists():
+                tmp_file.unlink()
+
+    def _entry_file(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pickle"
@@ -19,7 +19,7 @@ from typing import List, Optional
 
 from .language_traits import LanguageTraits, TokenCategory
 from .parser_base import ParserBase
-from .type_parser import Token, TypeParser, find_tokens
+from .type_parser import Token, TokenPattern, TypeParser, find_tokens
 
 
 class CppTraits(LanguageTraits):
@@ -98,28 +98,30 @@ class CppTypeParser(TypeParser):
     """Parser for C++ types."""
     TRAITS = CppTraits
 
+    _SUFFIXES_WITHOUT_NAME = tuple(c for c in CppTraits.ALLOWED_SUFFIXES
+                                   if c not in (TokenCategory.NAME,
+                                                TokenCategory.NAMESPACE_SEPARATOR))
+    _ARG_NAME_PATTERN = TokenPattern([
+        (TokenCategory.NESTED_END, ) + CppTraits.ALLOWED_NAMES,
+        _SUFFIXES_WITHOUT_NAME,
+        _SUFFIXES_WITHOUT_NAME + (None, ),
+        _SUFFIXES_WITHOUT_NAME + (None, ),
+        _SUFFIXES_WITHOUT_NAME + (None, ),
+        _SUFFIXES_WITHOUT_NAME + (None, ),
+        _SUFFIXES_WITHOUT_NAME + (None, ),
+        _SUFFIXES_WITHOUT_NAME + (None, ),
+        [TokenCategory.NAME],
+        [TokenCategory.WHITESPACE, None],
+        [TokenCategory.ARGS_END, TokenCategory.ARGS_SEPARATOR],
+    ])
+
     @classmethod
     def adapt_tokens(cls,
                      tokens: List[Token],
                      array_tokens: Optional[List[Token]] = None) -> List[Token]:
         tokens = super().adapt_tokens(tokens, array_tokens)
 
-        suffixes_without_name: List[Optional[TokenCategory]] = list(cls.TRAITS.ALLOWED_SUFFIXES)
-        suffixes_without_name.remove(TokenCategory.NAME)
-        suffixes_without_name.remove(TokenCategory.NAMESPACE_SEPARATOR)
-        for match in find_tokens(tokens, [
-            (TokenCategory.NESTED_END, ) + cls.TRAITS.ALLOWED_NAMES,
-                suffixes_without_name,
-                suffixes_without_name + [None],
-                suffixes_without_name + [None],
-                suffixes_without_name + [None],
-                suffixes_without_name + [None],
-                suffixes_without_name + [None],
-                suffixes_without_name + [None],
-            [TokenCategory.NAME],
-            [TokenCategory.WHITESPACE, None],
-            [TokenCategory.ARGS_END, TokenCategory.ARGS_SEPARATOR],
-        ]):
+        for match in find_tokens(tokens, cls._ARG_NAME_PATTERN):
             if match[-2].category == TokenCategory.NAME:
                 match[-2].category = TokenCategory.ARG_NAME
             elif match[-3].category == TokenCategory.NAME:
@@ -14,11 +14,18 @@
 """Parser for descriptions in Doxygen XML output."""
 
 import functools
+import marshal
 import re
 
 import xml.etree.ElementTree as ET
 
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..model import DescriptionSource
+
+# Compact XML element: tag, used attributes, text, children and tail
+_CompactElement = Tuple[str, Tuple[Tuple[str, str], ...], Optional[str], Tuple, Optional[str]]
+_CompactChildren = Tuple[_CompactElement, ...]
 
 
 def select_descriptions(brief: str, detailed: str) -> Tuple[str, str]:
@@ -44,19 +51,70 @@ def select_descriptions(brief: str, detailed: str) -> Tuple[str, str]:
     return brief, detailed
 
 
+class XmlDescriptionSource(DescriptionSource):
+    """Brief and detailed description from XML, converted to AsciiDoc when they are first used.
+
+    The XML is stored in a compact form: nested tuples containing only what the description parser
+    uses, serialized using `marshal`. Parts that the parser ignores, like parameter lists and return
+    value sections, are left out. Descriptions that would be empty after conversion are not stored
+    at all.
+
+    Attributes:
+        language: Language to use for the descriptions.
+        brief:    Compact XML of the brief description, if not empty.
+        detailed: Compact XML of the detailed description, if not empty.
+    """
+    __slots__ = "language", "brief", "detailed"
+
+    language: str
+    brief: Optional[bytes]
+    detailed: Optional[bytes]
+
+    def __init__(self, language: str, brief_element: Optional[ET.Element],
+                 detailed_element: Optional[ET.Element]):
+        self.language = language
+        self.brief = _compact_description(brief_element)
+        self.detailed = _compact_description(detailed_element)
+
+    @property
+    def empty(self) -> bool:
+        """True if there are no descriptions to render."""
+        return self.brief is None and self.detailed is None
+
+    def render(self) -> Tuple[str, str]:
+        return select_descriptions(self._parse(self.brief), self._parse(self.detailed))
+
+    def _parse(self, data: Optional[bytes]) -> str:
+        if data is None:
+            return ""
+        element = ET.Element("description")
+        element.extend(_expand(child) for child in marshal.loads(data))
+        return DescriptionParser.for_language(self.language).parse(element)
+
+
 class DescriptionParser(object):
     """Parse a description from XML and convert it to AsciiDoc.
 
+    The parser does not keep any state while parsing, so a single instance can be reused for all
+    descriptions in a language. Use `for_language` to get the shared parser for a language.
+
+    Each XML tag is converted by a handler from a fixed table. Tags without a handler are converted
+    by surrounding their contents with a fixed prefix and suffix, if any.
+
     Attributes:
         language: Language to parse and return.
     """
 
     language: str
-    _parts: List[str]
 
     def __init__(self, language: str):
         self.language = language
-        self._parts = []
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def for_language(language: str) -> "DescriptionParser":
+        """Get the shared parser for a language."""
+        return DescriptionParser(language)
 
     def parse(self, element: ET.Element) -> str:
         """Parse a description from XML and convert it to AsciiDoc.
@@ -67,75 +125,73 @@ class DescriptionParser(object):
         Returns:
             AsciiDoc text representation of the element.
         """
-        self._parts = []
-        self.parse_children(element)
-        text = "".join(self._parts).strip()
-
-        # Remove spaces before a line break
-        text = re.sub(" *$", "", text, flags=re.MULTILINE)
+        parts: List[str] = []
+        self.parse_children(element, parts)
+        text = "".join(parts).strip()
 
-        # Remove single space on new line
-        text = re.sub(r"^ (\S)", r"\1", text, flags=re.MULTILINE)
+        # Remove spaces before a line break, and a single space at the start of a line
+        text = _LINE_EDGE_SPACES.sub("", text)
 
         # No more than 2 consecutive line breaks
-        text = re.sub("\n{3,}", "\n\n", text)
+        return _EXCESS_LINE_BREAKS.sub("\n\n", text)
 
-        return text
-
-    def parse_children(self, element: ET.Element) -> None:
+    def parse_children(self, element: ET.Element, parts: List[str]) -> None:
         for sub_element in element:
-            method = getattr(self, f"parse_{sub_element.tag}")
-            method(sub_element)
-
-    def _default_parse(self, element: ET.Element, prefix=None, suffix=None) -> None:
-        self.append(prefix)
-        self.append(DescriptionParser._strip_line_ends(element.text))
-        self.parse_children(element)
-        self.append(suffix)
-        self.append(DescriptionParser._strip_line_ends(element.tail))
-
-    @staticmethod
-    def _strip_line_ends(text: Optional[str]) -> Optional[str]:
-        if text is None:
-            return None
-        return re.sub("\n$", " ", text, flags=re.MULTILINE)
-
-    parse_para = functools.partialmethod(_default_parse, suffix="\n\n")
-    parse_itemizedlist = functools.partialmethod(_default_parse, prefix="\n\n", suffix="\n")
-    parse_listitem = functools.partialmethod(_default_parse, prefix="* ")
-    parse_bold = functools.partialmethod(_default_parse, prefix="**", suffix="**")
-    parse_computeroutput = functools.partialmethod(_default_parse, prefix="`", suffix="`")
-    parse_codeline = functools.partialmethod(_default_parse, suffix="\n")
-    parse_sp = functools.partialmethod(_default_parse, prefix=" ")
-    parse_row = functools.partialmethod(_default_parse, prefix="\n\n", suffix="\n")
-    parse_entry = functools.partialmethod(_default_parse, prefix="|")
-
-    def parse_ulink(self, element: ET.Element) -> None:
-        self._default_parse(element, prefix=f"{element.get('url')}[", suffix="]")
-
-    def parse_ref(self, element: ET.Element) -> None:
+            handler = _HANDLERS.get(sub_element.tag)
+            if handler is not None:
+                handler(self, sub_element, parts)
+            else:
+                prefix, suffix = _AFFIXES.get(sub_element.tag, _NO_AFFIXES)
+                self._default_parse(sub_element, parts, prefix, suffix)
+
+    def _default_parse(self,
+                       element: ET.Element,
+                       parts: List[str],
+                       prefix: str = "",
+                       suffix: str = "") -> None:
+        if prefix:
+            parts.append(prefix)
+        if element.text:
+            parts.append(_strip_line_ends(element.text))
+        self.parse_children(element, parts)
+        if suffix:
+            parts.append(suffix)
+        if element.tail:
+            parts.append(_strip_line_ends(element.tail))
+
+    def parse_ulink(self, element: ET.Element, parts: List[str]) -> None:
+        self._default_parse(element, parts, prefix=f"{element.get('url')}[", suffix="]")
+
+    def parse_ref(self, element: ET.Element, parts: List[str]) -> None:
         self._default_parse(element,
+                            parts,
                             prefix=f"xref:{self.language}-{element.get('refid')}[",
                             suffix="]")
 
-    def parse_parameterlist(self, element) -> None:
+    def parse_ignored(self, element: ET.Element, parts: List[str]) -> None:
         pass
 
-    def parse_simplesect(self, element: ET.Element) -> None:
+    def parse_simplesect(self, element: ET.Element, parts: List[str]) -> None:
         kind = element.get("kind")
-        if kind in ["note", "tip", "important", "caution", "warning"]:
-            self._default_parse(element, prefix=f"\n[{kind.upper()}]\n====\n", suffix="====\n")
+        if kind in _ADMONITIONS:
+            self._default_parse(element,
+                                parts,
+                                prefix=f"\n[{kind.upper()}]\n====\n",
+                                suffix="====\n")
 
-    def parse_programlisting(self, element: ET.Element) -> None:
-        self._default_parse(element, prefix=f"\n[source,{self.language}]\n----\n", suffix="----\n")
+    def parse_programlisting(self, element: ET.Element, parts: List[str]) -> None:
+        self._default_parse(element,
+                            parts,
+                            prefix=f"\n[source,{self.language}]\n----\n",
+                            suffix="----\n")
 
-    def parse_highlight(self, element: ET.Element) -> None:
+    def parse_highlight(self, element: ET.Element, parts: List[str]) -> None:
         if element.get("class") == "normal":
-            self._default_parse(element)
+            self._default_parse(element, parts)
         else:
-            self._default_parse(element, prefix="__", suffix="__")
+            self._default_parse(element, parts, prefix="__", suffix="__")
 
-    def parse_table(self, element: ET.Element) -> None:
+    def parse_table(self, element: ET.Element, parts: List[str]) -> None:
         caption_prefix = ""
         caption = element.find('caption')
         if caption is not None:
@@ -149,14 +205,102 @@ class DescriptionParser(object):
                 header_option = "%header,"
 
         prefix = f"\n\n{caption_prefix}[{header_option}cols={element.get('cols')}*]\n|===\n"
-        self._default_parse(element, prefix=prefix, suffix="|===\n")
+        self._default_parse(element, parts, prefix=prefix, suffix="|===\n")
+
+
+_Handler = Callable[[DescriptionParser, ET.Element, List[str]], None]
+
+_HANDLERS: Dict[str, _Handler] = {
+    "ulink": DescriptionParser.parse_ulink,
+    "ref": DescriptionParser.parse_ref,
+    "parameterlist": DescriptionParser.parse_ignored,
+    "caption": DescriptionParser.parse_ignored,
+    "simplesect": DescriptionParser.parse_simplesect,
+    "programlisting": DescriptionParser.parse_programlisting,
+    "highlight": DescriptionParser.parse_highlight,
+    "table": DescriptionParser.parse_table,
+}
+
+_NO_AFFIXES = "", ""
+
+# Prefix and suffix for tags without a specific handler
+_AFFIXES: Dict[str, Tuple[str, str]] = {
+    "para": ("", "\n\n"),
+    "itemizedlist": ("\n\n", "\n"),
+    "listitem": ("* ", ""),
+    "bold": ("**", "**"),
+    "computeroutput": ("`", "`"),
+    "codeline": ("", "\n"),
+    "sp": (" ", ""),
+    "row": ("\n\n", "\n"),
+    "entry": ("|", ""),
+}
+
+# Attributes used by the handlers, other attributes are not stored in the compact form
+_ATTRIBUTES: Dict[str, Tuple[str, ...]] = {
+    "ulink": ("url", ),
+    "ref": ("refid", ),
+    "simplesect": ("kind", ),
+    "highlight": ("class", ),
+    "table": ("cols", ),
+    "entry": ("thead", ),
+}
+
+_ADMONITIONS = "note", "tip", "important", "caution", "warning"
+
+_LINE_EDGE_SPACES = re.compile(r" +$|^ (?=\S)", flags=re.MULTILINE)
+_EXCESS_LINE_BREAKS = re.compile("\n{3,}")
+_LINE_END = re.compile("\n$", flags=re.MULTILINE)
+
+
+def _strip_line_ends(text: str) -> str:
+    # Line breaks directly followed by another line break or the end of the text become spaces
+    if "\n" not in text:
+        return text
+    return _LINE_END.sub(" ", text)
 
-    def parse_caption(self, element: ET.Element) -> None:
-        pass
 
-    def __getattr__(self, name):
-        return self._default_parse
+def _compact_description(element: Optional[ET.Element]) -> Optional[bytes]:
+    # Only the child elements are converted, any direct text is ignored
+    if element is None:
+        return None
+    children = _compact_children(element)
+    if all(_blank(child) for child in children):
+        return None
+    return marshal.dumps(children)
+
+
+def _compact_children(element: ET.Element) -> _CompactChildren:
+    return tuple(compact for compact in map(_compact, element) if compact is not None)
+
+
+def _compact(element: ET.Element) -> Optional[_CompactElement]:
+    tag = element.tag
+    if tag == "parameterlist" or (tag == "simplesect" and element.get("kind") not in _ADMONITIONS):
+        # Ignored by the parser, including the text following the element
+        return None
+    if tag == "caption":
+        # Only the text is used, by the table
+        return tag, (), element.text, (), None
+
+    names = _ATTRIBUTES.get(tag, ())
+    attributes = tuple((name, element.attrib[name]) for name in names if name in element.attrib)
+    return tag, attributes, element.text, _compact_children(element), element.tail
+
+
+def _expand(compact: _CompactElement) -> ET.Element:
+    tag, attributes, text, children, tail = compact
+    element = ET.Element(tag, dict(attributes))
+    element.text = text
+    element.tail = tail
+    element.extend(_expand(child) for child in children)
+    return element
+
 
-    def append(self, text: Optional[str]) -> None:
-        if text:
-            self._parts.append(text)
+def _blank(compact: _CompactElement) -> bool:
+    # Elements converting to whitespace only, which is stripped from the description
+    tag, _, text, children, tail = compact
+    return (tag not in _HANDLERS and all(not affix or affix.isspace()
+                                         for affix in _AFFIXES.get(tag, _NO_AFFIXES))
+            and (not text or text.isspace()) and (not tail or tail.isspace())
+            and all(_blank(child) for child in children))
@@ -13,38 +13,67 @@
 # limitations under the License.
 """Read API reference information from Doxygen XML output."""
 
+import io
 import logging
+import os
 
 import xml.etree.ElementTree as ET
 
-from typing import List, Mapping, Optional, Set
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
 
 from tqdm import tqdm
 
+from .cache import CacheEntry, ParseCache
 from .cpp import CppParser
 from .driver_base import DriverBase
 from .java import JavaParser
 from .objc import ObjectiveCParser
 from .parser_base import ParserBase
 from .python import PythonParser
-from ..api_reference import AmbiguousLookupError, ApiReference
+from ..api_reference import AmbiguousLookupError, ApiReference, ElementLoader
 from ..model import (ReferableElement, TypeRefBase)
 
 logger = logging.getLogger(__name__)
 
 
-class Driver(DriverBase):
-    """Driver for parsing Doxygen XML output."""
+class Driver(DriverBase, ElementLoader):
+    """Driver for parsing Doxygen XML output.
+
+    XML files can be parsed up front, or loaded on demand using the Doxygen index. When loading on
+    demand, files are only parsed when the API reference is searched for an element they contain.
+    """
     api_reference: ApiReference
     _unresolved_refs: List[TypeRefBase]
     _force_language: Optional[str]
+    _cache_dir: Optional[Path]
+    _cache: Optional[ParseCache]
+    _resolving: bool
+
+    _files_by_name: Dict[str, List[Path]]
+    _files_by_id: Dict[str, List[Path]]
+    _loaded_files: Set[Path]
 
     _parsers: Mapping[str, ParserBase]
 
-    def __init__(self, force_language: Optional[str] = None):
+    def __init__(self, force_language: Optional[str] = None, cache_dir: Optional[Path] = None):
+        """Construct the driver.
+
+        Args:
+            force_language: Language to use for all XML files, ignoring the language specified in
+                                the files. None to detect the language automatically.
+            cache_dir:      Directory for caching parse results of XML files. None to disable the
+                                cache.
+        """
         self.api_reference = ApiReference()
         self._unresolved_refs = []
         self._force_language = safe_language_tag(force_language)
+        self._resolving = False
+
+        self._files_by_name = {}
+        self._files_by_id = {}
+        self._loaded_files = set()
 
         self._parsers = {
             CppParser.TRAITS.TAG: CppParser(self),
@@ -60,6 +89,12 @@ class Driver(DriverBase):
                          " detection.")
             self._force_language = None
 
+        self._cache_dir = cache_dir
+        if cache_dir is not None:
+            self._cache = ParseCache(cache_dir, self._force_language)
+        else:
+            self._cache = None
+
     def _parse_element(self, xml_element: ET.Element) -> None:
         if self._force_language is not None:
             language_tag = self._force_language
@@ -85,15 +120,173 @@ class Driver(DriverBase):
         Returns:
             True if file is parsed. False if the file is invalid.
         """
+        if self._cache is not None and isinstance(file_or_path, (str, os.PathLike)):
+            return self._parse_cached(Path(file_or_path))
+        return self._parse_xml(file_or_path)
+
+    def _parse_cached(self, file_path: Path) -> bool:
+        assert self._cache is not None
+
+        data = file_path.read_bytes()
+        key = self._cache.key(data)
+
+        entry = self._cache.load(key)
+        if entry is not None:
+            for element in entry.elements:
+                self.register(element)
+            self._unresolved_refs.extend(entry.unresolved_refs)
+            return entry.parsed
+
+        element_count = len(self.api_reference.elements)
+        ref_count = len(self._unresolved_refs)
+        parsed = self._parse_xml(io.BytesIO(data))
+        self._cache.store(
+            key,
+            CacheEntry(parsed, self.api_reference.elements[element_count:],
+                       self._unresolved_refs[ref_count:]))
+        return parsed
+
+    def _parse_xml(self, file_or_path) -> bool:
+        # Type references are only shared within a single file, as each file is cached separately.
+        for parser in self._parsers.values():
+            parser.clear_shared_type_refs()
+
+        # Stream the document, handing over each top level element as soon as it is complete.
+        # Afterwards it is removed from the tree, so only a single compound is kept in memory.
+        root = None
+        depth = 0
+        for event, xml_element in ET.iterparse(file_or_path, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    if xml_element.tag != "doxygen":
+                        return False
+                    root = xml_element
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 1:
+                    assert root is not None
+                    self._parse_element(xml_element)
+                    root.remove(xml_element)
+        return root is not None
+
+    def parse_all(self,
+                  files: Sequence[Path],
+                  jobs: int = 1,
+                  progress: Optional[tqdm] = None) -> None:
+        """Parse multiple XML files, optionally spreading the work over multiple processes.
+
+        When parsing in parallel, the files are split in consecutive chunks that are parsed by
+        separate worker processes. The results are merged in the original order of the files, so
+        the resulting API reference is identical to parsing all files one by one.
+
+        Args:
+            files:    Paths of the XML files to parse.
+            jobs:     Maximum number of processes to use. 1 to parse in the current process.
+            progress: Optional progress reporter. Updated for each parsed file.
+        """
+        if progress is not None:
+            progress.total = len(files)
+
+        if jobs <= 1 or len(files) <= 1:
+            for file in files:
+                self.parse(file)
+                if progress is not None:
+                    progress.update()
+            self._log_type_cache_statistics()
+            return
+
+        chunks = _split_in_chunks(files, jobs * _CHUNKS_PER_JOB)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(_parse_chunk, [self._force_language] * len(chunks),
+                                   [self._cache_dir] * len(chunks), chunks)
+            for chunk, (elements, unresolved_refs) in zip(chunks, results):
+                for element in elements:
+                    self.register(element)
+                self._unresolved_refs.extend(unresolved_refs)
+                if progress is not None:
+                    progress.update(len(chunk))
+
+    def _log_type_cache_statistics(self) -> None:
+        for language_tag, parser in self._parsers.items():
+            cache = parser.type_cache
+            if cache.hits or cache.misses:
+                logger.debug(f"Type cache for {language_tag}: {cache.hits} hits, {cache.misses}"
+                             f" misses ({cache.hit_rate:.0%} hit rate).")
+
+    def parse_index(self, xml_dir: Path) -> bool:
+        """Read the Doxygen index of an XML directory, to load its XML files on demand.
+
+        Instead of parsing all XML files up front, an XML file is parsed the first time the API
+        reference is searched for an element it contains. References from the loaded elements are
+        resolved immediately, loading the elements they refer to as well.
+
+        Args:
+            xml_dir: Directory containing the Doxygen XML files, including `index.xml`.
 
-        tree = ET.parse(file_or_path)
-        root = tree.getroot()
-        if root.tag != "doxygen":
+        Returns:
+            True if the index is read. False if there is no valid index in the directory.
+        """
+        index_file = xml_dir / "index.xml"
+        if not index_file.is_file():
             return False
 
-        for e in root:
-            self._parse_element(e)
-        return True
+        if self._force_language is not None:
+            parsers: Sequence[ParserBase] = [self._parsers[self._force_language]]
+        else:
+            parsers = list(self._parsers.values())
+
+        root = None
+        for event, xml_element in ET.iterparse(str(index_file), events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    if xml_element.tag != "doxygenindex":
+                        return False
+                    root = xml_element
+            elif xml_element.tag == "compound":
+                assert root is not None
+                file = xml_dir / f"{xml_element.get('refid')}.xml"
+                self._index(parsers, file, xml_element)
+                for member_element in xml_element.iterfind("member"):
+                    self._index(parsers, file, member_element)
+                root.remove(xml_element)
+
+        self.api_reference.loader = self
+        return root is not None
+
+    def _index(self, parsers: Sequence[ParserBase], file: Path, xml_element: ET.Element) -> None:
+        # The language is not in the index, so add the names and ids for every language that may be
+        # used. Superfluous entries can only cause an unrelated file to be loaded.
+        name = xml_element.findtext("name", "")
+        refid = xml_element.get("refid")
+        for parser in parsers:
+            traits = parser.TRAITS
+            self._files_by_name.setdefault(traits.short_name(traits.cleanup_name(name)),
+                                           []).append(file)
+            unique_id = traits.unique_id(refid)
+            if unique_id is not None:
+                self._files_by_id.setdefault(unique_id, []).append(file)
+
+    def load_name(self, name: str) -> None:
+        self._load(self._files_by_name.pop(name, None))
+
+    def load_id(self, target_id: str) -> None:
+        self._load(self._files_by_id.pop(target_id, None))
+
+    def _load(self, files: Optional[List[Path]]) -> None:
+        if not files:
+            return
+
+        ref_count = len(self._unresolved_refs)
+        for file in files:
+            if file in self._loaded_files:
+                continue
+            self._loaded_files.add(file)
+            self.parse(file)
+
+        # While resolving, the new references are picked up by the ongoing resolution.
+        if not self._resolving:
+            self._resolve_references_from(ref_count)
 
     def register(self, element: ReferableElement) -> None:
         self.api_reference.append(element)
@@ -103,45 +296,90 @@ class Driver(DriverBase):
 
     def resolve_references(self, progress: Optional[tqdm] = None) -> None:
         """Resolve all references between objects from different XML files."""
+        self._resolve_references_from(0, progress)
 
+    def _resolve_references_from(self, start: int, progress: Optional[tqdm] = None) -> None:
+        # Resolving can load more elements on demand. Their references are added after `start` and
+        # resolved in the next round.
         unresolved_names: Set[str] = set()
         still_unresolved = []
+        resolved_count = 0
         if progress is not None:
-            progress.total = len(self._unresolved_refs)
-        for ref in self._unresolved_refs:
-            if progress is not None:
-                progress.update()
-            assert ref.name
-
-            # Try perfect match
-            try:
-                class_match = self.api_reference.find(ref.name,
-                                                      target_id=ref.id,
-                                                      lang=ref.language,
-                                                      namespace=ref.namespace)
-                if class_match is not None:
-                    ref.resolve(class_match)
-                    continue
-            except AmbiguousLookupError:
-                pass
-
-            # Find partial matches in namespaces or other scopes
-            matches = []
-            for compound in self.api_reference.elements:
-                if compound.name and compound.full_name.endswith(f"::{ref.name}"):
-                    matches.append(compound)
-            if len(matches) == 1:
-                ref.resolve(matches[0])
-                continue
-            elif len(matches) > 1:
-                logger.debug(f"Multiple matches: {ref.name} ")
-
-            still_unresolved.append(ref)
-            unresolved_names.add(ref.name)
-
-        logger.debug(f"Resolved refs: {len(self._unresolved_refs) - len(still_unresolved)}")
+            progress.total = 0
+
+        self._resolving = True
+        try:
+            while len(self._unresolved_refs) > start:
+                refs = self._unresolved_refs[start:]
+                del self._unresolved_refs[start:]
+                if progress is not None:
+                    progress.total += len(refs)
+
+                for ref in refs:
+                    if progress is not None:
+                        progress.update()
+                    if self._resolve_reference(ref):
+                        resolved_count += 1
+                    else:
+                        still_unresolved.append(ref)
+                        unresolved_names.add(ref.name)
+        finally:
+            self._resolving = False
+
+        logger.debug(f"Resolved refs: {resolved_count}")
         logger.debug(f"Still unresolved: {len(still_unresolved)}: {', '.join(unresolved_names)}")
-        self._unresolved_refs = still_unresolved
+        self._unresolved_refs.extend(still_unresolved)
+
+    def _resolve_reference(self, ref: TypeRefBase) -> bool:
+        assert ref.name
+
+        # Try perfect match
+        try:
+            class_match = self.api_reference.find(ref.name,
+                                                  target_id=ref.id,
+                                                  lang=ref.language,
+                                                  namespace=ref.namespace)
+            if class_match is not None:
+                ref.resolve(class_match)
+                return True
+        except AmbiguousLookupError:
+            pass
+
+        # Find partial matches in namespaces or other scopes
+        matches = self.api_reference.find_by_suffix(ref.name)
+        if len(matches) == 1:
+            ref.resolve(matches[0])
+            return True
+        elif len(matches) > 1:
+            logger.debug(f"Multiple matches: {ref.name} ")
+
+        return False
+
+
+_CHUNKS_PER_JOB = 4
+"""Number of chunks to create per job, to balance the load when file sizes vary."""
+
+
+def _split_in_chunks(files: Sequence[Path], count: int) -> List[Sequence[Path]]:
+    chunk_size, remainder = divmod(len(files), count)
+    chunks = []
+    start = 0
+    for i in range(min(count, len(files))):
+        end = start + chunk_size + (1 if i < remainder else 0)
+        chunks.append(files[start:end])
+        start = end
+    return chunks
+
+
+def _parse_chunk(force_language: Optional[str], cache_dir: Optional[Path],
+                 files: Sequence[Path]) -> Tuple[List[ReferableElement], List[TypeRefBase]]:
+    # Runs in a worker process. Elements and unresolved references are returned together, so
+    # references shared between them survive pickling.
+    driver = Driver(force_language=force_language, cache_dir=cache_dir)
+    for file in files:
+        driver.parse(file)
+    driver._log_type_cache_statistics()
+    return driver.api_reference.elements, driver._unresolved_refs
 
 
 def safe_language_tag(name: Optional[str]) -> str:
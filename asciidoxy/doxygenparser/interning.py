@@ -0,0 +1,84 @@
+# Copyright (C) 2019-2020, TomTom (http://tomtom.com).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Sharing of identical values created while parsing."""
+
+from typing import Dict, Optional, Tuple, overload
+
+from ..model import TypeRef
+
+TypeRefKey = Tuple[str, str, Optional[str], Optional[str], Optional[str], Optional[str],
+                   Optional[str]]
+
+
+class Interner:
+    """Share identical strings and type references between elements.
+
+    Only type references without nested types and arguments are shared. These make up the majority
+    of all type references, e.g. `int`, `const std::string &` or `NSString *`. All information used
+    to resolve a type reference, including the namespace it is referenced from, is part of the
+    identity of a type reference. Shared type references therefore resolve to the same element.
+    """
+    _strings: Dict[str, str]
+    _type_refs: Dict[TypeRefKey, TypeRef]
+
+    def __init__(self):
+        self._strings = {}
+        self._type_refs = {}
+
+    @overload
+    def string(self, value: str) -> str:
+        ...
+
+    @overload
+    def string(self, value: None) -> None:
+        ...
+
+    def string(self, value):
+        """Get the shared instance of a string."""
+        if value is None:
+            return None
+        return self._strings.setdefault(value, value)
+
+    def type_ref(self, type_ref: TypeRef) -> TypeRef:
+        """Get the shared instance of a type reference, including its nested and argument types.
+
+        Type references with nested types or arguments are not shared themselves, but the types
+        they contain are replaced by shared instances.
+        """
+        if type_ref.nested is not None:
+            type_ref.nested = [self.type_ref(t) for t in type_ref.nested]
+        if type_ref.args is not None:
+            for arg in type_ref.args:
+                if arg.type is not None:
+                    arg.type = self.type_ref(arg.type)
+        if type_ref.nested is not None or type_ref.args is not None:
+            return type_ref
+
+        type_ref.namespace = self.string(type_ref.namespace)
+        return self._type_refs.setdefault(self._key(type_ref), type_ref)
+
+    def is_shared_duplicate(self, type_ref: TypeRef) -> bool:
+        """Has the type reference been replaced by another shared instance?"""
+        if type_ref.nested is not None or type_ref.args is not None:
+            return False
+        return self._type_refs.get(self._key(type_ref), type_ref) is not type_ref
+
+    def clear_type_refs(self) -> None:
+        """Stop sharing the type references seen until now."""
+        self._type_refs.clear()
+
+    @staticmethod
+    def _key(type_ref: TypeRef) -> TypeRefKey:
+        return (type_ref.language, type_ref.name, type_ref.prefix, type_ref.suffix, type_ref.id,
+                type_ref.kind, type_ref.namespace)
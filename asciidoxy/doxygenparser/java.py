@@ -19,7 +19,7 @@ from typing import List, Optional
 
 from .language_traits import LanguageTraits, TokenCategory
 from .parser_base import ParserBase
-from .type_parser import TypeParser, Token, find_tokens
+from .type_parser import TypeParser, Token, TokenPattern, find_tokens
 
 
 class JavaTraits(LanguageTraits):
@@ -87,6 +87,12 @@ class JavaTypeParser(TypeParser):
     """Parser for Java types."""
     TRAITS = JavaTraits
 
+    _WILDCARD_PATTERN = TokenPattern([
+        [TokenCategory.NAME],
+        [TokenCategory.WHITESPACE],
+        [TokenCategory.WILDCARD_BOUNDS],
+    ])
+
     @classmethod
     def adapt_tokens(cls,
                      tokens: List[Token],
@@ -118,13 +124,9 @@ class JavaTypeParser(TypeParser):
 
         return tokens
 
-    @staticmethod
-    def detect_wildcards(tokens: List[Token]) -> List[Token]:
-        for match in find_tokens(tokens, [
-            [TokenCategory.NAME],
-            [TokenCategory.WHITESPACE],
-            [TokenCategory.WILDCARD_BOUNDS],
-        ]):
+    @classmethod
+    def detect_wildcards(cls, tokens: List[Token]) -> List[Token]:
+        for match in find_tokens(tokens, cls._WILDCARD_PATTERN):
             match[0].category = TokenCategory.WILDCARD
         return tokens
 
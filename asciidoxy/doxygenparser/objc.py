@@ -21,7 +21,7 @@ from typing import List, Optional
 
 from .language_traits import LanguageTraits, TokenCategory
 from .parser_base import ParserBase
-from .type_parser import TypeParser, Token, find_tokens
+from .type_parser import TypeParser, Token, TokenPattern, find_tokens
 from ..model import Compound, Member
 
 
@@ -109,35 +109,38 @@ class ObjectiveCTypeParser(TypeParser):
     "Parser for Objective C types." ""
     TRAITS = ObjectiveCTraits
 
+    _BLOCK_PATTERN = TokenPattern([
+        [TokenCategory.ARGS_START],
+        [TokenCategory.WHITESPACE, None],
+        [TokenCategory.BLOCK],
+        [TokenCategory.WHITESPACE, None],
+        [TokenCategory.ARGS_END],
+    ])
+    _ARG_NAME_PATTERN = TokenPattern([
+        (TokenCategory.NESTED_END, ) + ObjectiveCTraits.ALLOWED_NAMES,
+        ObjectiveCTraits.ALLOWED_SUFFIXES,
+        ObjectiveCTraits.ALLOWED_SUFFIXES + (None, ),
+        ObjectiveCTraits.ALLOWED_SUFFIXES + (None, ),
+        ObjectiveCTraits.ALLOWED_SUFFIXES + (None, ),
+        ObjectiveCTraits.ALLOWED_SUFFIXES + (None, ),
+        ObjectiveCTraits.ALLOWED_SUFFIXES + (None, ),
+        ObjectiveCTraits.ALLOWED_SUFFIXES + (None, ),
+        [TokenCategory.NAME],
+        [TokenCategory.WHITESPACE, None],
+        [TokenCategory.ARGS_END, TokenCategory.ARGS_SEPARATOR],
+    ])
+
     @classmethod
     def adapt_tokens(cls,
                      tokens: List[Token],
                      array_tokens: Optional[List[Token]] = None) -> List[Token]:
         tokens = super().adapt_tokens(tokens, array_tokens)
 
-        for match in find_tokens(tokens, [
-            [TokenCategory.ARGS_START],
-            [TokenCategory.WHITESPACE, None],
-            [TokenCategory.BLOCK],
-            [TokenCategory.WHITESPACE, None],
-            [TokenCategory.ARGS_END],
-        ]):
+        for match in find_tokens(tokens, cls._BLOCK_PATTERN):
             for t in match:
                 t.category = TokenCategory.INVALID
 
-        for match in find_tokens(tokens, [
-            (TokenCategory.NESTED_END, ) + cls.TRAITS.ALLOWED_NAMES,
-                cls.TRAITS.ALLOWED_SUFFIXES,
-                cls.TRAITS.ALLOWED_SUFFIXES + (None, ),
-                cls.TRAITS.ALLOWED_SUFFIXES + (None, ),
-                cls.TRAITS.ALLOWED_SUFFIXES + (None, ),
-                cls.TRAITS.ALLOWED_SUFFIXES + (None, ),
-                cls.TRAITS.ALLOWED_SUFFIXES + (None, ),
-                cls.TRAITS.ALLOWED_SUFFIXES + (None, ),
-            [TokenCategory.NAME],
-            [TokenCategory.WHITESPACE, None],
-            [TokenCategory.ARGS_END, TokenCategory.ARGS_SEPARATOR],
-        ]):
+        for match in find_tokens(tokens, cls._ARG_NAME_PATTERN):
             if match[-2].category == TokenCategory.NAME:
                 match[-2].category = TokenCategory.ARG_NAME
             elif match[-3].category == TokenCategory.NAME:
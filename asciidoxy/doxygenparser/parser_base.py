@@ -20,12 +20,13 @@ import xml.etree.ElementTree as ET
 from abc import ABC
 from typing import List, Optional, Tuple, Type, Union
 
-from .description_parser import DescriptionParser, select_descriptions
+from .description_parser import DescriptionParser, XmlDescriptionSource
 from .driver_base import DriverBase
+from .interning import Interner
 from .language_traits import LanguageTraits
-from .type_parser import TypeParser, TypeParseError
-from ..model import (Compound, EnumValue, Member, Parameter, ReturnValue, ThrowsClause, TypeRef,
-                     InnerTypeReference)
+from .type_parser import TypeCache, TypeParser, TypeParseError
+from ..model import (Compound, DescribedElement, EnumValue, Member, Parameter, ReferableElement,
+                     ReturnValue, ThrowsClause, TypeRef, TypeRefBase, InnerTypeReference)
 
 logger = logging.getLogger(__name__)
 
@@ -36,28 +37,65 @@ def _yes_no_to_bool(yes_no: str) -> bool:
     return False
 
 
+class _UnresolvedRefCollector(DriverBase):
+    """Collect unresolved references, to be able to drop the ones replaced by shared instances."""
+    unresolved_refs: List[TypeRefBase]
+    _driver: DriverBase
+
+    def __init__(self, driver: DriverBase):
+        self.unresolved_refs = []
+        self._driver = driver
+
+    def register(self, element: ReferableElement) -> None:
+        self._driver.register(element)
+
+    def unresolved_ref(self, ref: TypeRefBase) -> None:
+        self.unresolved_refs.append(ref)
+
+
 class ParserBase(ABC):
     """Base functionality for language parsers.
 
-    The parser is mostly anemic by design: there is no internal state that changes during parsing.
+    The parser is mostly anemic by design: the only internal state that changes during parsing is
+    the collection of shared strings and type references, and the cache of parsed types.
 
     Attributes:
         TRAITS:      Specifics for the language grammar to parse.
         TYPE_PARSER: Specific type parser for the langugage.
+        type_cache:  Types parsed before, reused for identical type XML.
     """
     TRAITS: Type[LanguageTraits]
     TYPE_PARSER: Type[TypeParser]
 
+    type_cache: TypeCache
+
     _driver: DriverBase
+    _interner: Interner
 
     def __init__(self, driver: DriverBase):
         self._driver = driver
+        self._interner = Interner()
+        self.type_cache = TypeCache()
+
+    def clear_shared_type_refs(self) -> None:
+        """Stop sharing type references with elements parsed before."""
+        self._interner.clear_type_refs()
 
     def parse_description(self, description_element: Optional[ET.Element]) -> str:
         if description_element is None:
             return ""
 
-        return DescriptionParser(self.TRAITS.TAG).parse(description_element)
+        return DescriptionParser.for_language(self.TRAITS.TAG).parse(description_element)
+
+    def parse_descriptions(self, element: ET.Element, target: DescribedElement) -> None:
+        """Set the brief and detailed description of an element.
+
+        The descriptions are only converted to AsciiDoc when they are first used.
+        """
+        source = XmlDescriptionSource(self.TRAITS.TAG, element.find("briefdescription"),
+                                      element.find("detaileddescription"))
+        if not source.empty:
+            target.set_description_source(source)
 
     def parse_parameterlist(self, memberdef_element: ET.Element,
                             kind: str) -> List[Tuple[str, str]]:
@@ -96,20 +134,28 @@ class ParserBase(ABC):
         if type_element is None:
             return None
 
+        collector = _UnresolvedRefCollector(self._driver)
         try:
             type_ref = self.TYPE_PARSER.parse_xml(type_element,
                                                   array_element,
-                                                  driver=self._driver,
-                                                  parent=parent)
+                                                  driver=collector,
+                                                  parent=parent,
+                                                  cache=self.type_cache)
         except TypeParseError:
             logger.exception(
                 f"Failed to parse type {ET.tostring(type_element, encoding='unicode')}.")
-            return None
+            type_ref = None
 
         if type_ref is not None and type_ref.name:
-            return type_ref
+            type_ref = self._interner.type_ref(type_ref)
         else:
-            return None
+            type_ref = None
+
+        for ref in collector.unresolved_refs:
+            if not isinstance(ref, TypeRef) or not self._interner.is_shared_duplicate(ref):
+                self._driver.unresolved_ref(ref)
+
+        return type_ref
 
     def parse_exceptions(self, memberdef_element: ET.Element, parent: Member) -> List[ThrowsClause]:
         exceptions = []
@@ -146,9 +192,7 @@ class ParserBase(ABC):
             v.full_name = self.TRAITS.full_name(name, parent_name)
 
             v.initializer = enumvalue_element.findtext("initializer", "")
-            v.brief, v.description = select_descriptions(
-                self.parse_description(enumvalue_element.find("briefdescription")),
-                self.parse_description(enumvalue_element.find("detaileddescription")))
+            self.parse_descriptions(enumvalue_element, v)
 
             values.append(v)
             self._driver.register(v)
@@ -158,13 +202,13 @@ class ParserBase(ABC):
     def parse_member(self, memberdef_element: ET.Element, parent: Compound) -> Optional[Member]:
         member = Member(self.TRAITS.TAG)
         member.id = self.TRAITS.unique_id(memberdef_element.get("id"))
-        member.kind = memberdef_element.get("kind", "")
-        member.prot = memberdef_element.get("prot", "")
+        member.kind = self._interner.string(memberdef_element.get("kind", ""))
+        member.prot = self._interner.string(memberdef_element.get("prot", ""))
 
         name = self.TRAITS.cleanup_name(memberdef_element.findtext("name", ""))
         member.name = self.TRAITS.short_name(name)
         member.full_name = self.TRAITS.full_name(name, parent.full_name)
-        member.namespace = self.TRAITS.namespace(member.full_name)
+        member.namespace = self._interner.string(self.TRAITS.namespace(member.full_name))
         member.include = parent.include
 
         if self.TRAITS.is_member_blacklisted(member.kind, member.name):
@@ -174,9 +218,7 @@ class ParserBase(ABC):
         member.args = memberdef_element.findtext("argsstring", "")
         member.params = self.parse_parameters(memberdef_element, member)
         member.exceptions = self.parse_exceptions(memberdef_element, member)
-        member.brief, member.description = select_descriptions(
-            self.parse_description(memberdef_element.find("briefdescription")),
-            self.parse_description(memberdef_element.find("detaileddescription")))
+        self.parse_descriptions(memberdef_element, member)
         member.returns = self.parse_returns(memberdef_element, member)
         member.enumvalues = self.parse_enumvalues(memberdef_element, member.full_name)
         member.static = _yes_no_to_bool(memberdef_element.get("static", "false"))
@@ -207,12 +249,12 @@ class ParserBase(ABC):
     def parse_compounddef(self, compounddef_element: ET.Element) -> None:
         compound = Compound(self.TRAITS.TAG)
         compound.id = self.TRAITS.unique_id(compounddef_element.get("id"))
-        compound.kind = compounddef_element.get("kind", "")
+        compound.kind = self._interner.string(compounddef_element.get("kind", ""))
 
         name = self.TRAITS.cleanup_name(compounddef_element.findtext("compoundname", ""))
         compound.name = self.TRAITS.short_name(name)
         compound.full_name = self.TRAITS.full_name(name)
-        compound.namespace = self.TRAITS.namespace(compound.full_name)
+        compound.namespace = self._interner.string(self.TRAITS.namespace(compound.full_name))
         compound.include = self.find_include(compounddef_element)
 
         compound.members = [
@@ -223,9 +265,7 @@ class ParserBase(ABC):
         ]
         compound.inner_classes = self.parse_innerclass(compound, compounddef_element)
 
-        compound.brief, compound.description = select_descriptions(
-            self.parse_description(compounddef_element.find("briefdescription")),
-            self.parse_description(compounddef_element.find("detaileddescription")))
+        self.parse_descriptions(compounddef_element, compound)
         compound.enumvalues = self.parse_enumvalues(compounddef_element, compound.full_name)
 
         self._driver.register(compound)
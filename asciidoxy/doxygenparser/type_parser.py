@@ -13,15 +13,20 @@
 # limitations under the License.
 """Parsing of types from strings and XML."""
 
+import functools
 import logging
+import re
+
+from collections import OrderedDict
 
 import xml.etree.ElementTree as ET
 
-from typing import Iterator, List, Optional, Sequence, Tuple, Type, Union
+from typing import (Callable, Dict, Hashable, Iterator, List, Optional, Pattern, Sequence, Tuple,
+                    Type, Union)
 
 from .driver_base import DriverBase
 from .language_traits import LanguageTraits, TokenCategory
-from ..model import Compound, Member, Parameter, TypeRef
+from ..model import Compound, Member, Parameter, ReferableElement, TypeRef, TypeRefBase
 
 logger = logging.getLogger(__name__)
 
@@ -75,6 +80,196 @@ class TypeParseError(Exception):
         return f"Failed to parse type: {self.msg}"
 
 
+class TextTokenizer:
+    """Split text into tokens for a specific language.
+
+    Token boundaries are matched by a single precompiled regular expression, and token categories
+    are looked up in a table. Both are built from the language traits. Use `for_traits` to get a
+    shared tokenizer for a language.
+    """
+    _pattern: Pattern
+    _categories: Dict[str, TokenCategory]
+
+    def __init__(self, traits: Type[LanguageTraits]):
+        # Token boundaries are single characters, longer boundaries never match.
+        boundaries = "".join(sorted({b for b in traits.TOKEN_BOUNDARIES if len(b) == 1}))
+        if boundaries:
+            boundary_class = re.escape(boundaries)
+            self._pattern = re.compile(f"[{boundary_class}]|[^{boundary_class}]+")
+        else:
+            self._pattern = re.compile(r"[\s\S]+")
+
+        self._categories = {}
+        for category, texts in traits.TOKENS.items():
+            for text in texts:
+                self._categories.setdefault(text, category)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def for_traits(traits: Type[LanguageTraits]) -> "TextTokenizer":
+        """Get the shared tokenizer for a language."""
+        return TextTokenizer(traits)
+
+    def tokenize(self, text: str) -> List[Token]:
+        """Split a text into language grammar tokens.
+
+        Consecutive whitespace is combined into a single token.
+        """
+        tokens: List[Token] = []
+        previous_is_whitespace = False
+        for part in self._pattern.findall(text):
+            if part.isspace():
+                if not previous_is_whitespace:
+                    tokens.append(Token(" ", TokenCategory.WHITESPACE))
+                    previous_is_whitespace = True
+            else:
+                tokens.append(Token(part, self._categories.get(part, TokenCategory.NAME)))
+                previous_is_whitespace = False
+        return tokens
+
+    def make_token(self, text: str) -> Token:
+        """Determine the token category for a text and create a token for it."""
+        if text.isspace():
+            return Token(" ", TokenCategory.WHITESPACE)
+        return Token(text, self._categories.get(text, TokenCategory.NAME))
+
+
+TypeCacheKey = Tuple[str, Optional[str], Hashable, Hashable]
+TypeCacheEntry = Tuple[Optional[TypeRef], List[TypeRef]]
+
+
+class TypeCache:
+    """Bounded cache of types parsed from XML.
+
+    The same type XML is used by many members, e.g. `const std::string &`. Parsing it again from
+    the same namespace results in an identical type reference. Type references are changed when
+    they are resolved, so the cache keeps its own copy of each parsed type and hands out a new copy
+    for every hit. The unresolved references registered while parsing are copied along, to be
+    registered again for each hit.
+
+    Attributes:
+        maxsize: Maximum number of cached types. The least recently used type is dropped first.
+        hits:    Number of types found in the cache.
+        misses:  Number of types not found in the cache.
+    """
+    MAXSIZE = 4096
+
+    maxsize: int
+    hits: int
+    misses: int
+    _entries: "OrderedDict[TypeCacheKey, TypeCacheEntry]"
+
+    def __init__(self, maxsize: int = MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that were found in the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: TypeCacheKey) -> Optional[TypeCacheEntry]:
+        """Get a copy of a cached type and the unresolved references in it.
+
+        Returns:
+            The copied type and unresolved references, or None if the type is not in the cache.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return _copy_entry(*entry)
+
+    def store(self, key: TypeCacheKey, type_ref: Optional[TypeRef],
+              unresolved_refs: List[TypeRef]) -> None:
+        """Store a copy of a parsed type and the unresolved references registered for it."""
+        self._entries[key] = _copy_entry(type_ref, unresolved_refs)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+def _copy_entry(type_ref: Optional[TypeRef], unresolved_refs: List[TypeRef]) -> TypeCacheEntry:
+    # References are copied only once, so registered references stay part of the copied type.
+    copies: Dict[int, TypeRef] = {}
+    type_ref_copy = _copy_type_ref(type_ref, copies) if type_ref is not None else None
+    return type_ref_copy, [_copy_type_ref(ref, copies) for ref in unresolved_refs]
+
+
+def _copy_type_ref(type_ref: TypeRef, copies: Dict[int, TypeRef]) -> TypeRef:
+    copy = copies.get(id(type_ref))
+    if copy is not None:
+        return copy
+
+    copy = TypeRef(type_ref.language, type_ref.name)
+    copy.id = type_ref.id
+    copy.namespace = type_ref.namespace
+    copy.kind = type_ref.kind
+    copy.prefix = type_ref.prefix
+    copy.suffix = type_ref.suffix
+    if type_ref.nested is not None:
+        copy.nested = [_copy_type_ref(nested, copies) for nested in type_ref.nested]
+    if type_ref.args is not None:
+        copy.args = []
+        for arg in type_ref.args:
+            arg_copy = Parameter()
+            arg_copy.type = _copy_type_ref(arg.type, copies) if arg.type is not None else None
+            arg_copy.name = arg.name
+            arg_copy.description = arg.description
+            copy.args.append(arg_copy)
+    copies[id(type_ref)] = copy
+    return copy
+
+
+class _RefRecorder(DriverBase):
+    """Record the unresolved references registered while parsing a type."""
+    unresolved_refs: List[TypeRef]
+    _driver: Optional[DriverBase]
+
+    def __init__(self, driver: Optional[DriverBase]):
+        self.unresolved_refs = []
+        self._driver = driver
+
+    def register(self, element: ReferableElement) -> None:
+        if self._driver is not None:
+            self._driver.register(element)
+
+    def unresolved_ref(self, ref: TypeRefBase) -> None:
+        assert isinstance(ref, TypeRef)
+        self.unresolved_refs.append(ref)
+        if self._driver is not None:
+            self._driver.unresolved_ref(ref)
+
+
+def _xml_key(element: Optional[ET.Element], tail: bool = False) -> Hashable:
+    """Hashable representation of all information in an XML element.
+
+    The tail of the element itself is only included on request. For the root element it is the
+    indentation following the element in the XML file, which is not part of the type.
+    """
+    if element is None:
+        return None
+    return (element.tag, tuple(sorted(element.attrib.items())), element.text,
+            tuple(_xml_key(child, tail=True) for child in element), element.tail if tail else None)
+
+
+def _namespace(parent: Optional[Union[Compound, Member]]) -> Optional[str]:
+    if isinstance(parent, Compound):
+        return parent.full_name
+    elif isinstance(parent, Member):
+        return parent.namespace
+    return None
+
+
 class TypeParser:
     """Generic type parser from XML and plain text.
 
@@ -91,7 +286,8 @@ class TypeParser:
                   type_element: ET.Element,
                   array_element: Optional[ET.Element] = None,
                   driver: Optional[DriverBase] = None,
-                  parent: Optional[Union[Compound, Member]] = None) -> Optional[TypeRef]:
+                  parent: Optional[Union[Compound, Member]] = None,
+                  cache: Optional[TypeCache] = None) -> Optional[TypeRef]:
         """Parse a type from an XML element.
 
         Information from the Doxygen `<type>` and `<array>` elements are combined if needed.
@@ -101,11 +297,36 @@ class TypeParser:
             array_element: The `<array>` element from Doxygen, if available.
             driver:        Driver to register types without refids with.
             parent:        Parent element for resolving the namespace.
+            cache:         Cache of previously parsed types to reuse, if available.
         Returns:
             A `TypeRef` for the type, or None if there is no type information.
         """
-        tokens = cls.tokenize_xml(type_element)
-        array_tokens = cls.tokenize_xml(array_element) if array_element is not None else []
+        if cache is None:
+            return cls._parse_xml(type_element, array_element, driver, parent)
+
+        key = (cls.TRAITS.TAG, _namespace(parent), _xml_key(type_element), _xml_key(array_element))
+        entry = cache.get(key)
+        if entry is not None:
+            type_ref, unresolved_refs = entry
+            if driver is not None:
+                for ref in unresolved_refs:
+                    driver.unresolved_ref(ref)
+            return type_ref
+
+        recorder = _RefRecorder(driver)
+        type_ref = cls._parse_xml(type_element, array_element, recorder, parent)
+        cache.store(key, type_ref, recorder.unresolved_refs)
+        return type_ref
+
+    @classmethod
+    def _parse_xml(cls, type_element: ET.Element, array_element: Optional[ET.Element],
+                   driver: Optional[DriverBase],
+                   parent: Optional[Union[Compound, Member]]) -> Optional[TypeRef]:
+        tokens = cls.tokenize_xml(type_element, tail=False)
+        if array_element is not None:
+            array_tokens = cls.tokenize_xml(array_element, tail=False)
+        else:
+            array_tokens = []
         tokens = cls.adapt_tokens(tokens, array_tokens)
         if len(tokens) == 0 or all(token.category == TokenCategory.WHITESPACE for token in tokens):
             return None
@@ -163,49 +384,24 @@ class TypeParser:
     @classmethod
     def tokenize_text(cls, text: str) -> List[Token]:
         """Split a text into language grammar tokens."""
-        tokens: List[Token] = []
-
-        def append_token(text: str) -> None:
-            token = cls.make_text_token(text)
-            if token.category == TokenCategory.WHITESPACE and tokens and tokens[
-                    -1].category == token.category:
-                pass
-            else:
-                tokens.append(token)
-
-        while text:
-            for i, c in enumerate(text):
-                if c in cls.TRAITS.TOKEN_BOUNDARIES:
-                    if i > 0:
-                        append_token(text[:i])
-                    append_token(text[i])
-                    text = text[i + 1:]
-                    break
-            else:
-                append_token(text)
-                text = ""
-
-        return tokens
+        return TextTokenizer.for_traits(cls.TRAITS).tokenize(text)
 
     @classmethod
     def make_text_token(cls, text: str) -> Token:
         """Determine the token category for a text and create a token for it."""
-        if text.isspace():
-            category = TokenCategory.WHITESPACE
-            text = " "
-        else:
-            for token_type, tokens in cls.TRAITS.TOKENS.items():
-                if text in tokens:
-                    category = token_type
-                    break
-            else:
-                category = TokenCategory.NAME
-
-        return Token(text, category)
+        return TextTokenizer.for_traits(cls.TRAITS).make_token(text)
 
     @classmethod
-    def tokenize_xml(cls, element: ET.Element) -> List[Token]:
-        """Split an XML element and its contents into language grammar tokens."""
+    def tokenize_xml(cls, element: ET.Element, tail: bool = True) -> List[Token]:
+        """Split an XML element and its contents into language grammar tokens.
+
+        Args:
+            element: XML element to split.
+            tail:    Also split the text following the element.
+
+        Returns:
+            The tokens in the element and its contents.
+        """
         tokens = []
 
         if element.tag == "ref":
@@ -225,7 +421,7 @@ class TypeParser:
 
         for child in element:
             tokens.extend(cls.tokenize_xml(child))
-        if element.tail:
+        if tail and element.tail:
             tokens.extend(cls.tokenize_text(element.tail))
 
         return tokens
@@ -240,99 +436,7 @@ class TypeParser:
         Returns:
             A `TypeRef` if sufficient tokens are present, or None if all tokens are whitespace.
         """
-        if not tokens or all(t.category == TokenCategory.WHITESPACE for t in tokens):
-            return None
-
-        original_tokens = tokens
-        tokens = tokens[:]
-
-        prefixes, tokens = cls.select_tokens(tokens, cls.TRAITS.ALLOWED_PREFIXES)
-        cls.remove_leading_whitespace(prefixes)
-
-        names, tokens = cls.select_tokens(tokens, cls.TRAITS.ALLOWED_NAMES)
-        cls.remove_leading_whitespace(names)
-        tokens[:0] = cls.remove_trailing_whitespace(names)
-
-        nested_types: Optional[List[TypeRef]] = []
-        arg_types: Optional[List[Parameter]] = []
-        try:
-            nested_types, tokens = cls.nested_types(tokens, driver, parent)
-            arg_types, tokens = cls.arg_types(tokens, driver, parent)
-        except TypeParseError as e:
-            logger.warning(f"Failed to parse nested types or args: {e}")
-
-        suffixes, tokens = cls.select_tokens(tokens, cls.TRAITS.ALLOWED_SUFFIXES)
-        cls.remove_trailing_whitespace(suffixes)
-
-        if not names:
-            logger.warning(f"No name found in `{'`,`'.join(t.text for t in original_tokens)}`")
-            return TypeRef(cls.TRAITS.TAG, "".join(t.text for t in original_tokens))
-
-        if tokens and any(t.category != TokenCategory.WHITESPACE for t in tokens):
-            logger.warning(f"Unexpected trailing token(s) `{'`,`'.join(t.text for t in tokens)}`"
-                           f" in `{'`,`'.join(t.text for t in original_tokens)}`")
-            suffixes.extend(tokens)
-
-        type_ref = TypeRef(cls.TRAITS.TAG)
-        type_ref.name = cls.TRAITS.cleanup_name("".join(n.text for n in names))
-        type_ref.prefix = "".join(p.text for p in prefixes)
-        type_ref.suffix = "".join(s.text for s in suffixes)
-        type_ref.nested = nested_types
-        type_ref.args = arg_types
-        type_ref.id = cls.TRAITS.unique_id(names[0].refid)
-        type_ref.kind = names[0].kind
-
-        if isinstance(parent, Compound):
-            type_ref.namespace = parent.full_name
-        elif isinstance(parent, Member):
-            type_ref.namespace = parent.namespace
-
-        if (driver is not None and type_ref.name and not type_ref.id
-                and not cls.TRAITS.is_language_standard_type(type_ref.name)):
-            driver.unresolved_ref(type_ref)
-
-        return type_ref
-
-    @staticmethod
-    def select_tokens(
-            tokens: List[Token],
-            categories: Optional[Sequence[TokenCategory]]) -> Tuple[List[Token], List[Token]]:
-        """Select all tokens matching a sequence of categories.
-
-        Picks tokens from the front of `tokens` until a token of another category is encountered.
-
-        Args:
-            tokens:     Tokens to select from.
-            categories: Categories for which the tokens needs to be selected. Can be None to not
-                            select any tokens.
-        Returns:
-            Tokens matching the categories.
-            Tokens left-over after removing the matching tokens.
-        """
-        if categories:
-            for i, t in enumerate(tokens):
-                if t.category not in categories:
-                    return tokens[:i], tokens[i:]
-            return tokens, []
-        else:
-            return [], tokens
-
-    @classmethod
-    def remove_leading_whitespace(cls, tokens) -> List[Token]:
-        """Remove leading whitespace from `tokens` and return it."""
-        return cls._remove_whitespace(tokens, 0)
-
-    @classmethod
-    def remove_trailing_whitespace(cls, tokens) -> List[Token]:
-        """Remove trailing whitespace from `tokens` and return it."""
-        return cls._remove_whitespace(tokens, -1)
-
-    @staticmethod
-    def _remove_whitespace(tokens, location) -> List[Token]:
-        ret = []
-        while tokens and tokens[location].category == TokenCategory.WHITESPACE:
-            ret.append(tokens.pop(location))
-        return ret
+        return cls._type_from_range(_TokenSequence(tokens, driver, parent), 0, len(tokens))
 
     @classmethod
     def nested_types(
@@ -346,15 +450,10 @@ class TypeParser:
         Returns:
             A list of `TypeRef` for each nested type, an empty list if a nested block is present
                 without types, or None if there is no nested block.
+            Left-over tokens after removing the nested block.
         """
-
-        nested_type_tokens, tokens = cls.select_nested_tokens(tokens, TokenCategory.NESTED_START,
-                                                              TokenCategory.NESTED_END,
-                                                              TokenCategory.NESTED_SEPARATOR)
-        if nested_type_tokens is None:
-            return None, tokens
-        types = (cls.type_from_tokens(ntt, driver, parent) for ntt in nested_type_tokens)
-        return [t for t in types if t is not None], tokens
+        types, cursor = cls._nested_types(_TokenSequence(tokens, driver, parent), 0, len(tokens))
+        return types, tokens[cursor:]
 
     @classmethod
     def arg_types(
@@ -368,16 +467,10 @@ class TypeParser:
         Returns:
             A list of `Parameter` for each argument, an empty list if an argument block is present
                 without arguments, or None if there is no argument block.
+            Left-over tokens after removing the argument block.
         """
-
-        nested_type_tokens, tokens = cls.select_nested_tokens(tokens, TokenCategory.ARGS_START,
-                                                              TokenCategory.ARGS_END,
-                                                              TokenCategory.ARGS_SEPARATOR)
-        if nested_type_tokens is None:
-            return None, tokens
-
-        args = (cls.arg_from_tokens(ntt, driver, parent) for ntt in nested_type_tokens)
-        return [a for a in args if a is not None], tokens
+        args, cursor = cls._arg_types(_TokenSequence(tokens, driver, parent), 0, len(tokens))
+        return args, tokens[cursor:]
 
     @classmethod
     def arg_from_tokens(cls,
@@ -389,17 +482,7 @@ class TypeParser:
         Returns:
             The argument definition, or None if there is only whitespace.
         """
-        if not tokens or all(t.category == TokenCategory.WHITESPACE for t in tokens):
-            return None
-
-        name_tokens: List[Token] = []
-        while tokens and tokens[-1].category == TokenCategory.ARG_NAME:
-            name_tokens.insert(0, tokens.pop(-1))
-
-        arg = Parameter()
-        arg.type = cls.type_from_tokens(tokens, driver, parent)
-        arg.name = "".join(t.text for t in name_tokens)
-        return arg
+        return cls._arg_from_range(_TokenSequence(tokens, driver, parent), 0, len(tokens))
 
     @classmethod
     def select_nested_tokens(
@@ -415,51 +498,279 @@ class TypeParser:
         Raises:
             TypeParseError The nested block is not terminated correctly.
         """
-        original_tokens = tokens
-        tokens = tokens[:]
-        nested_type_tokens = []
-
-        for i, t in enumerate(tokens):
-            if t.category == TokenCategory.WHITESPACE:
-                continue
-            elif t.category == start_token:
-                tokens = tokens[i + 1:]
-                break
+        ranges, cursor = _TokenSequence(tokens).block_ranges(0, len(tokens), start_token, end_token,
+                                                             separator_token)
+        if ranges is None:
+            return None, tokens[cursor:]
+        return [tokens[s:e] for s, e in ranges], tokens[cursor:]
+
+    # The methods below work on a range of a shared sequence of tokens. Nested types and arguments
+    # are parsed by moving through the same sequence, instead of copying the tokens for each level.
+
+    @classmethod
+    def _type_from_range(cls, sequence: "_TokenSequence", start: int,
+                         end: int) -> Optional[TypeRef]:
+        tokens = sequence.tokens
+        if _only_whitespace(tokens, start, end):
+            return None
+
+        prefix_end = _skip(tokens, start, end, cls.TRAITS.ALLOWED_PREFIXES)
+        prefix_start = _skip(tokens, start, prefix_end, _WHITESPACE)
+
+        names_end = _skip(tokens, prefix_end, end, cls.TRAITS.ALLOWED_NAMES)
+        names_start = _skip(tokens, prefix_end, names_end, _WHITESPACE)
+        names_end = _skip_backwards(tokens, names_start, names_end, _WHITESPACE)
+
+        cursor = names_end
+        nested_types: Optional[List[TypeRef]] = []
+        arg_types: Optional[List[Parameter]] = []
+        try:
+            nested_types, cursor = cls._nested_types(sequence, cursor, end)
+            arg_types, cursor = cls._arg_types(sequence, cursor, end)
+        except TypeParseError as e:
+            logger.warning(f"Failed to parse nested types or args: {e}")
+
+        suffixes_end = _skip(tokens, cursor, end, cls.TRAITS.ALLOWED_SUFFIXES)
+        suffix = _join(tokens, cursor, _skip_backwards(tokens, cursor, suffixes_end, _WHITESPACE))
+
+        if names_start == names_end:
+            logger.warning(f"No name found in `{_join(tokens, start, end, '`,`')}`")
+            return TypeRef(cls.TRAITS.TAG, _join(tokens, start, end))
+
+        if not _only_whitespace(tokens, suffixes_end, end):
+            logger.warning(
+                f"Unexpected trailing token(s) `{_join(tokens, suffixes_end, end, '`,`')}`"
+                f" in `{_join(tokens, start, end, '`,`')}`")
+            suffix += _join(tokens, suffixes_end, end)
+
+        type_ref = TypeRef(cls.TRAITS.TAG)
+        type_ref.name = cls.TRAITS.cleanup_name(_join(tokens, names_start, names_end))
+        type_ref.prefix = _join(tokens, prefix_start, prefix_end)
+        type_ref.suffix = suffix
+        type_ref.nested = nested_types
+        type_ref.args = arg_types
+        type_ref.id = cls.TRAITS.unique_id(tokens[names_start].refid)
+        type_ref.kind = tokens[names_start].kind
+
+        type_ref.namespace = _namespace(sequence.parent)
+
+        if (sequence.driver is not None and type_ref.name and not type_ref.id
+                and not cls.TRAITS.is_language_standard_type(type_ref.name)):
+            sequence.driver.unresolved_ref(type_ref)
+
+        return type_ref
+
+    @classmethod
+    def _nested_types(cls, sequence: "_TokenSequence", start: int,
+                      end: int) -> Tuple[Optional[List[TypeRef]], int]:
+        ranges, cursor = sequence.block_ranges(start, end, TokenCategory.NESTED_START,
+                                               TokenCategory.NESTED_END,
+                                               TokenCategory.NESTED_SEPARATOR)
+        if ranges is None:
+            return None, cursor
+        types = (cls._type_from_range(sequence, s, e) for s, e in ranges)
+        return [t for t in types if t is not None], cursor
+
+    @classmethod
+    def _arg_types(cls, sequence: "_TokenSequence", start: int,
+                   end: int) -> Tuple[Optional[List[Parameter]], int]:
+        ranges, cursor = sequence.block_ranges(start, end, TokenCategory.ARGS_START,
+                                               TokenCategory.ARGS_END, TokenCategory.ARGS_SEPARATOR)
+        if ranges is None:
+            return None, cursor
+        args = (cls._arg_from_range(sequence, s, e) for s, e in ranges)
+        return [a for a in args if a is not None], cursor
+
+    @classmethod
+    def _arg_from_range(cls, sequence: "_TokenSequence", start: int,
+                        end: int) -> Optional[Parameter]:
+        if _only_whitespace(sequence.tokens, start, end):
+            return None
+
+        type_end = _skip_backwards(sequence.tokens, start, end, _ARG_NAME)
+
+        arg = Parameter()
+        arg.type = cls._type_from_range(sequence, start, type_end)
+        arg.name = _join(sequence.tokens, type_end, end)
+        return arg
+
+
+class _TokenSequence:
+    """Sequence of tokens shared by all levels of a type while parsing it.
+
+    The positions of nested blocks are determined in a single pass over all tokens, the first time
+    they are needed. Afterwards, finding the entries of a nested block does not require scanning
+    its contents again.
+    """
+    tokens: Sequence[Token]
+    driver: Optional[DriverBase]
+    parent: Optional[Union[Compound, Member]]
+    _blocks: Dict[TokenCategory, Tuple[Dict[int, int], Dict[int, List[int]]]]
+
+    def __init__(self,
+                 tokens: Sequence[Token],
+                 driver: Optional[DriverBase] = None,
+                 parent: Optional[Union[Compound, Member]] = None):
+        self.tokens = tokens
+        self.driver = driver
+        self.parent = parent
+        self._blocks = {}
+
+    def block_ranges(self, start: int, end: int, start_token: TokenCategory,
+                     end_token: TokenCategory,
+                     separator_token: TokenCategory) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+        """Find a nested block in `tokens[start:end]`.
+
+        The nested block must be the first token, apart from whitespace.
+
+        Returns:
+            The start and end index of each entry in the nested block, an empty list if the nested
+                block is empty, or None if there is no nested block.
+            Index after the nested block, or `start` if there is no nested block.
+        Raises:
+            TypeParseError The nested block is not terminated correctly.
+        """
+        block_start = _skip(self.tokens, start, end, _WHITESPACE)
+        if block_start == end or self.tokens[block_start].category != start_token:
+            return None, start
+
+        block_ends, separators = self._find_blocks(start_token, end_token, separator_token)
+        block_end = block_ends.get(block_start)
+        if block_end is None or block_end >= end:
+            raise TypeParseError(
+                f"Unexpected end of nested types: `{_join(self.tokens, start, end)}`")
+
+        ranges = []
+        entry_start = block_start + 1
+        for separator in separators[block_start]:
+            ranges.append((entry_start, separator))
+            entry_start = separator + 1
+        ranges.append((entry_start, block_end))
+        return ranges, block_end + 1
+
+    def _find_blocks(self, start_token: TokenCategory, end_token: TokenCategory,
+                     separator_token: TokenCategory) -> Tuple[Dict[int, int], Dict[int, List[int]]]:
+        # For each block start: the index of the matching block end, and the indices of the
+        # separators directly inside the block.
+        blocks = self._blocks.get(start_token)
+        if blocks is None:
+            block_ends: Dict[int, int] = {}
+            separators: Dict[int, List[int]] = {}
+            open_blocks: List[int] = []
+            for i, token in enumerate(self.tokens):
+                if token.category == start_token:
+                    open_blocks.append(i)
+                    separators[i] = []
+                elif token.category == end_token:
+                    if open_blocks:
+                        block_ends[open_blocks.pop()] = i
+                elif token.category == separator_token:
+                    if open_blocks:
+                        separators[open_blocks[-1]].append(i)
+            blocks = self._blocks[start_token] = block_ends, separators
+        return blocks
+
+
+_WHITESPACE = TokenCategory.WHITESPACE,
+_ARG_NAME = TokenCategory.ARG_NAME,
+
+
+def _skip(tokens: Sequence[Token], start: int, end: int,
+          categories: Optional[Sequence[TokenCategory]]) -> int:
+    # Index of the first token from `start` that is not in one of the categories.
+    if categories:
+        while start < end and tokens[start].category in categories:
+            start += 1
+    return start
+
+
+def _skip_backwards(tokens: Sequence[Token], start: int, end: int,
+                    categories: Sequence[TokenCategory]) -> int:
+    # Index after the last token before `end` that is not in one of the categories.
+    while end > start and tokens[end - 1].category in categories:
+        end -= 1
+    return end
+
+
+def _only_whitespace(tokens: Sequence[Token], start: int, end: int) -> bool:
+    for i in range(start, end):
+        if tokens[i].category != TokenCategory.WHITESPACE:
+            return False
+    return True
+
+
+def _join(tokens: Sequence[Token], start: int, end: int, separator: str = "") -> str:
+    return separator.join(tokens[i].text for i in range(start, end))
+
+
+class TokenPattern:
+    """Precompiled pattern of token categories to search for in a sequence of tokens.
+
+    The pattern is a sequence of sequences of categories to match. Tokens need to match at least one
+    of the categories in each sequence, in order. If `None` is present in a sequence, it means that
+    the sequence is optional and can be skipped.
+
+    Matching is greedy and does not backtrack: an optional sequence always matches a token if it
+    can. A pattern does not match if the tokens end before the pattern does, even if the remaining
+    sequences are optional.
+
+    The pattern is compiled into a regular expression, matching a string with a single character
+    for the category of each token. All matches are found in a single pass over this string. The
+    same sequences of categories occur often, so the matches for recent sequences are cached.
+    """
+    _regex: Pattern
+    _spans: Callable[[str], Tuple[Tuple[int, int], ...]]
+
+    CACHE_SIZE = 1024
+
+    # Characters without special meaning in regular expressions
+    _CODES = {category: chr(0x100 + i) for i, category in enumerate(TokenCategory)}
+
+    def __init__(self, search_pattern: Sequence[Sequence[Optional[TokenCategory]]]):
+        elements = []
+        for categories in search_pattern:
+            category_class = "".join(self._CODES[c] for c in categories if c is not None)
+            if category_class:
+                category_class = f"[{category_class}]"
             else:
-                return None, tokens
-        else:
-            return None, tokens
-
-        level = 0
-        while tokens:
-            for i, t in enumerate(tokens):
-                if t.category == start_token:
-                    level += 1
-                elif level > 0 and t.category == end_token:
-                    level -= 1
-                elif level == 0 and t.category in (separator_token, end_token):
-                    nested_type_tokens.append(tokens[:i])
-                    tokens = tokens[i + 1:]
-
-                    if t.category == end_token:
-                        return nested_type_tokens, tokens
-                    else:
-                        break
+                category_class = "(?!)"
+
+            if None in categories:
+                # Consume a matching token if there is one, skip without backtracking otherwise
+                elements.append(f"(?:{category_class}|(?!{category_class})(?=.))")
             else:
-                break
+                elements.append(category_class)
+        self._regex = re.compile(f"(?=({''.join(elements)}))", re.DOTALL)
+        self._spans = functools.lru_cache(maxsize=self.CACHE_SIZE)(self._find_spans)
 
-        raise TypeParseError("Unexpected end of nested types:"
-                             f" `{''.join(t.text for t in original_tokens)}`")
+    def find(self, tokens: Sequence[Token]) -> Iterator[Sequence[Token]]:
+        """Find all sequences of tokens matching the pattern.
+
+        Matches can overlap. The categories of all tokens are read before searching, so changing
+        the category of a token does not affect later matches.
+
+        Args:
+            tokens: Sequence of tokens to search in.
+        Returns:
+            Iterator over all matches, ordered by their start.
+        """
+        codes = "".join([self._CODES[t.category] for t in tokens])
+        for start, end in self._spans(codes):
+            yield tokens[start:end]
+
+    def _find_spans(self, codes: str) -> Tuple[Tuple[int, int], ...]:
+        spans = (match.span(1) for match in self._regex.finditer(codes))
+        return tuple((start, end) for start, end in spans if start < len(codes))
 
 
 def find_tokens(
-        tokens: Sequence[Token],
-        search_pattern: Sequence[Sequence[Optional[TokenCategory]]]) -> Iterator[Sequence[Token]]:
+    tokens: Sequence[Token], search_pattern: Union[TokenPattern,
+                                                   Sequence[Sequence[Optional[TokenCategory]]]]
+) -> Iterator[Sequence[Token]]:
     """Find a sequence of tokens matching a sequence of categories.
 
-    The `search_pattern` is a sequence of sequences of categories to match. Tokens need to match at
-    least one of the categories in each sequence, in order. If `None` is present in a sequence, it
-    means that the sequence is optional and can be skipped.
+    See `TokenPattern` for the syntax of `search_pattern`. Precompile patterns that are used more
+    than once using `TokenPattern`.
 
     Args:
         tokens: Sequence of tokens to search in.
@@ -467,20 +778,6 @@ def find_tokens(
     Returns:
         Iterator over all matches.
     """
-    for search_start in range(len(tokens)):
-        search_index = search_start
-
-        for categories in search_pattern:
-            if search_index >= len(tokens):
-                break
-
-            if tokens[search_index].category in categories:
-                search_index += 1
-            elif None in categories:
-                continue
-            else:
-                break
-        else:
-            yield tokens[search_start:search_index]
-
-    return None
+    if not isinstance(search_pattern, TokenPattern):
+        search_pattern = TokenPattern(search_pattern)
+    return search_pattern.find(tokens)
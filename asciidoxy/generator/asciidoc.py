@@ -14,25 +14,29 @@
 """Generation of AsciiDoc output."""
 
 import functools
+import hashlib
+import json
 import logging
 import os
 
+from concurrent.futures import ProcessPoolExecutor
+
 from mako.exceptions import TopLevelLookupException
-from mako.lookup import TemplateLookup
 from mako.template import Template
 from pathlib import Path
 from packaging.specifiers import SpecifierSet
 from packaging.version import Version
-from typing import MutableMapping, NamedTuple, Optional
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
 
 from tqdm import tqdm
 
-from .. import templates
 from ..api_reference import AmbiguousLookupError, ApiReference
 from ..doxygenparser import safe_language_tag
 from ..model import ReferableElement
 from .._version import __version__
-from .context import Context
+from .cache import OutputManifest, TemplateCache
+from .context import Context, FragmentJob, FragmentResult, RenderedFragment
+from .dependencies import DependencyGraph, DocumentDependencies, document_files
 from .errors import (AmbiguousReferenceError, ConsistencyError, IncludeFileNotFoundError,
                      IncompatibleVersionError, ReferenceNotFoundError, TemplateMissingError,
                      UnlinkableError)
@@ -44,12 +48,6 @@ logger = logging.getLogger(__name__)
 
 class Api(object):
     """Methods to insert and link to API reference documentation from AsciiDoc files."""
-    class TemplateKey(NamedTuple):
-        lang: str
-        kind: str
-
-    _template_cache: MutableMapping[TemplateKey, Template] = {}
-
     _current_file: Path
     _context: Context
 
@@ -345,14 +343,17 @@ class Api(object):
         else:
             kind = kind_override
 
-        rendered_doc = self._template(element.language, kind).render(element=element,
-                                                                     insert_filter=insert_filter,
-                                                                     api_context=self._context,
-                                                                     api=self)
-
-        if not self._context.preprocessing_run:
-            with fragment_file.open("w", encoding="utf-8") as f:
-                print(rendered_doc, file=f)
+        if self._context.preprocessing_run and self._context.lightweight_preprocessing:
+            # Only the document tree is discovered, fragments are rendered in the second run
+            pass
+        elif self._context.reuse_fragments:
+            self._reuse_or_render_fragment(element, kind, insert_filter, fragment_file)
+        elif self._context.fragment_jobs is not None and not self._context.preprocessing_run:
+            self._add_fragment_job(element, kind, insert_filter)
+        else:
+            rendered_doc = self._render_fragment(element, kind, insert_filter)
+            if not self._context.preprocessing_run:
+                self._context.write_file(fragment_file, rendered_doc)
 
         asciidoc_options["leveloffset"] = leveloffset
         attributes = ",".join(f"{str(key)}={str(value)}" for key, value in asciidoc_options.items())
@@ -485,23 +486,57 @@ class Api(object):
             return ""
 
         toc_content = multipage_toc(self._context.current_document, side)
-        with _docinfo_footer_file_name(self._current_file).open(mode="w", encoding="utf-8") as f:
-            f.write(toc_content)
+        self._context.outputs.write(_docinfo_footer_file_name(self._current_file), toc_content)
         return ":docinfo: private"
 
+    def _render_fragment(self, element, kind: str, insert_filter: InsertionFilter) -> str:
+        return self._template(element.language, kind).render(element=element,
+                                                             insert_filter=insert_filter,
+                                                             api_context=self._context,
+                                                             api=self)
+
+    def _reuse_or_render_fragment(self, element, kind: str, insert_filter: InsertionFilter,
+                                  fragment_file: Path) -> None:
+        context = self._context
+        # Fragments inserted in other fragments are reused together with the outer fragment
+        is_outer = not context.fragment_stack
+        key = (context.current_document.in_file, element.language, element.id, kind,
+               insert_filter.spec_key())
+
+        if not context.preprocessing_run and is_outer:
+            reusable = context.reusable_fragment(key)
+            if reusable is not None:
+                context.write_fragment(reusable)
+                return
+            if context.fragment_jobs is not None:
+                self._add_fragment_job(element, kind, insert_filter)
+                return
+
+        fragment = RenderedFragment(fragment_file)
+        if not is_outer:
+            context.fragment_stack[-1].children.append(fragment)
+        context.fragment_stack.append(fragment)
+        try:
+            fragment.text = self._render_fragment(element, kind, insert_filter)
+        finally:
+            context.fragment_stack.pop()
+
+        if context.preprocessing_run:
+            if is_outer:
+                context.rendered_fragments[key] = fragment
+        else:
+            context.write_file(fragment_file, fragment.text)
+
+    def _add_fragment_job(self, element, kind: str, insert_filter: InsertionFilter) -> None:
+        assert self._context.fragment_jobs is not None
+        self._context.fragment_jobs.append(
+            FragmentJob(element.id, kind, insert_filter, self._context.current_document.in_file))
+
     def _template(self, lang: str, kind: str) -> Template:
-        key = Api.TemplateKey(lang, kind)
-        template = self._template_cache.get(key, None)
-        if template is None:
-            templates_path = templates.__path__  # type: ignore  # mypy issue #1422
-            lookup = TemplateLookup(directories=templates_path + [self._context.base_dir],
-                                    input_encoding="utf-8")
-            try:
-                template = lookup.get_template(f"{lang}/{kind}.mako")
-                self._template_cache[key] = template
-            except TopLevelLookupException:
-                raise TemplateMissingError(lang, kind)
-        return template
+        try:
+            return self._context.templates.api_template(lang, kind)
+        except TopLevelLookupException:
+            raise TemplateMissingError(lang, kind)
 
 
 def process_adoc(in_file: Path,
@@ -509,15 +544,50 @@ def process_adoc(in_file: Path,
                  api_reference: ApiReference,
                  warnings_are_errors: bool = False,
                  multipage: bool = False,
-                 progress: Optional[tqdm] = None):
+                 progress: Optional[tqdm] = None,
+                 reuse_fragments: bool = True,
+                 lightweight_preprocessing: bool = False,
+                 jobs: int = 1,
+                 cache_dir: Optional[Path] = None,
+                 dependencies: Optional[DependencyGraph] = None):
     """Process an AsciiDoc file and insert API reference.
 
+    The documents are processed twice. The first run collects the document tree and the inserted
+    elements. The second run generates the output, which requires this information for links and
+    cross-document references. The compiled documents are reused in the second run. Inserted
+    fragments rendered in the first run are reused if their links do not change.
+
+    With lightweight preprocessing the first run only discovers the document tree, without
+    rendering the inserted fragments. The inserted elements are collected in the second run
+    instead. Links to other documents are completed after the second run.
+
+    With multiple jobs, the fragments of the second run are rendered by separate worker processes,
+    after all documents have been processed. The results are merged in the order the fragments are
+    inserted, so the output is identical to rendering them in the current process.
+
+    With a dependency graph, documents that did not change since the previous run are not
+    generated again. Their inserted and linked elements are taken from the graph. If links in the
+    reused documents would change, all documents are generated again.
+
     Args:
         in_file:             AsciiDoc file to process.
         build_dir:           Directory to store build artifacts in.
         api_reference:       API reference to insert in the documents.
         warnings_are_errors: True to treat every warning as an error.
-        multipage:          True to enable multi page output.
+        multipage:           True to enable multi page output.
+        progress:            Optional progress bar to update while processing.
+        reuse_fragments:     True to reuse fragments rendered in the first run. False to render
+                                 all fragments again.
+        lightweight_preprocessing: True to not render fragments in the first run.
+        jobs:                Maximum number of processes to use for rendering fragments. 1 to
+                                 render in the current process.
+        cache_dir:           Directory to store compiled templates and the manifest of generated
+                                 files in, to reuse them in later runs. Generated files are only
+                                 written if their content changed since the previous run. None
+                                 to not reuse anything from previous runs.
+        dependencies:        Dependencies of the documents generated in the previous run, updated
+                                 with the documents generated in this run. The caller needs to
+                                 save the graph. None to generate all documents.
 
     Returns:
         Dictionary that maps input AsciiDoc files to output AsciiDoc files with inserted API
@@ -536,21 +606,68 @@ def process_adoc(in_file: Path,
     context.warnings_are_errors = warnings_are_errors
     context.multipage = multipage
     context.progress = progress
+    if cache_dir is not None:
+        context.templates = TemplateCache(context.base_dir, cache_dir / "templates")
+        context.outputs = OutputManifest(cache_dir / "outputs.json")
+    context.reuse_fragments = reuse_fragments and not lightweight_preprocessing
+    context.lightweight_preprocessing = lightweight_preprocessing
+    if dependencies is not None:
+        dependencies.start(context.base_dir, [multipage, warnings_are_errors])
+        context.dependencies = dependencies
 
     _process_adoc(in_file, context)
     context.linked = []
     context.preprocessing_run = False
+    tree = _tree_fingerprint(context.current_document)
+    if dependencies is not None and multipage and not dependencies.tree_unchanged(tree):
+        # The navigation bar and table of contents depend on the complete tree
+        dependencies.clear()
+    if jobs > 1:
+        context.fragment_jobs = []
     context.in_to_out_file_map[in_file] = _process_adoc(in_file, context)
+    if context.fragment_jobs:
+        _render_fragment_jobs(context, jobs)
+    context.complete_links()
+    context.rendered_fragments.clear()
+    context.outputs.save()
+    logger.info(f"Generated files: {context.outputs.written} written,"
+                f" {context.outputs.skipped} unchanged.")
+
+    if dependencies is not None:
+        if not _record_dependencies(context):
+            logger.info("Links in reused documents changed, generating all documents.")
+            dependencies.clear()
+            if progress is not None:
+                progress.reset()
+            return process_adoc(in_file, build_dir, api_reference, warnings_are_errors, multipage,
+                                progress, reuse_fragments, lightweight_preprocessing, jobs,
+                                cache_dir, dependencies)
+        dependencies.finish(tree)
+        logger.info(f"Documents: {len(dependencies.rendered)} generated,"
+                    f" {dependencies.reused} reused.")
+    if cache_dir is not None:
+        logger.debug(f"Template cache: {context.templates.hits} hits,"
+                     f" {context.templates.misses} misses.")
     _check_links(context)
     return context.in_to_out_file_map
 
 
 def _process_adoc(in_file: Path, context: Context):
     logger.info(f"Processing {in_file}")
-    api = Api(in_file, context)
     out_file = _out_file_name(in_file)
 
-    template = Template(filename=os.fspath(in_file), input_encoding="utf-8")
+    if context.dependencies is not None:
+        state = _document_state(context)
+        record = _reusable_document(in_file, state, context)
+        if record is not None:
+            _reuse_document(in_file, out_file, record, context)
+            return out_file
+        if not context.preprocessing_run:
+            context.dependencies.rendered[in_file] = state
+
+    api = Api(in_file, context)
+
+    template = context.templates.document(in_file)
     if context.preprocessing_run:
         context.in_to_out_file_map[in_file] = out_file
 
@@ -561,12 +678,11 @@ def _process_adoc(in_file: Path, context: Context):
     rendered_doc = template.render(api=api)
 
     if not context.preprocessing_run:
-        with out_file.open("w", encoding="utf-8") as f:
-            print(rendered_doc, file=f)
-            if context.multipage:
-                nav_bar = navigation_bar(context.current_document)
-                if nav_bar:
-                    print(nav_bar, file=f)
+        if context.multipage:
+            nav_bar = navigation_bar(context.current_document)
+            if nav_bar:
+                rendered_doc = f"{rendered_doc}\n{nav_bar}"
+        context.write_file(out_file, rendered_doc)
 
     if context.progress is not None:
         context.progress.update()
@@ -574,6 +690,208 @@ def _process_adoc(in_file: Path, context: Context):
     return out_file
 
 
+def _document_state(context: Context) -> Optional[List]:
+    state = [context.namespace, context.language, list(context.insert_filter.specs())]
+    try:
+        # Compare in the same form as stored in the dependency graph
+        return json.loads(json.dumps(state))
+    except (TypeError, ValueError):
+        return None
+
+
+def _reusable_document(in_file: Path, state: Optional[List],
+                       context: Context) -> Optional[DocumentDependencies]:
+    assert context.dependencies is not None
+    if state is None:
+        return None
+    record = context.dependencies.reusable(in_file, state)
+    if record is None or context.preprocessing_run:
+        return record
+
+    # With lightweight preprocessing the inserted elements are only known after the second run
+    if (context.multipage and not context.lightweight_preprocessing
+            and not _links_unchanged(record, context)):
+        return None
+    if not context.dependencies.files_unchanged(record):
+        return None
+    return record
+
+
+def _reuse_document(in_file: Path, out_file: Path, record: DocumentDependencies,
+                    context: Context) -> None:
+    assert context.dependencies is not None
+    if context.preprocessing_run:
+        context.in_to_out_file_map[in_file] = out_file
+        if context.progress is not None:
+            context.progress.total = 2 * len(context.in_to_out_file_map)
+            context.progress.update(0)
+    else:
+        context.dependencies.reused += 1
+
+    context.reuse_document(record)
+
+    for child in record.children:
+        child_file = Path(child)
+        child_record = context.dependencies.recorded(child_file)
+        assert child_record is not None
+
+        sub_context = context.sub_context()
+        if context.preprocessing_run:
+            sub_context.current_document = DocumentTreeNode(child_file, context.current_document)
+            context.current_document.children.append(sub_context.current_document)
+        else:
+            sub_context.current_document = context.current_document.find_child(child_file)
+            assert sub_context.current_document is not None
+        sub_context.namespace, sub_context.language, specs = child_record.state
+        sub_context.insert_filter = InsertionFilter(*specs)
+        _process_adoc(child_file, sub_context)
+
+    if context.progress is not None:
+        context.progress.update()
+
+
+def _links_unchanged(record: DocumentDependencies, context: Context) -> bool:
+    for element_id, target in record.linked.items():
+        in_file = context.inserted.get(element_id)
+        if (None if in_file is None else os.fspath(in_file)) != target:
+            return False
+    return True
+
+
+def _record_dependencies(context: Context) -> bool:
+    dependencies = context.dependencies
+    assert dependencies is not None
+
+    inserted_ids: Dict[Path, List[str]] = {}
+    for element_id, in_file in context.inserted.items():
+        inserted_ids.setdefault(in_file, []).append(element_id)
+
+    for document in context.current_document.all_documents_in_tree():
+        in_file = document.in_file
+        if in_file not in dependencies.rendered:
+            record = dependencies.recorded(in_file)
+            if context.multipage and record is not None and not _links_unchanged(record, context):
+                return False
+            continue
+
+        state = dependencies.rendered[in_file]
+        if state is None:
+            continue
+        inserted = {}
+        for element_id in inserted_ids.get(in_file, []):
+            element = context.reference.find(target_id=element_id)
+            inserted[element_id] = element.name if element is not None else element_id
+        linked = {
+            element_id: context.inserted.get(element_id)
+            for element_id in sorted(dependencies.links.get(in_file, ()))
+        }
+        children = [child.in_file for child in document.children]
+        files = document_files(context.in_to_out_file_map[in_file], context.fragment_dir)
+        dependencies.record(in_file, state, children, inserted, linked, files)
+    return True
+
+
+def _tree_fingerprint(root: DocumentTreeNode) -> str:
+    hasher = hashlib.sha256()
+    for document in root.all_documents_in_tree():
+        parent = document.parent.in_file if document.parent is not None else ""
+        for part in (os.fspath(document.in_file), os.fspath(parent), document.title):
+            hasher.update(part.encode("utf-8"))
+            hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+class _RenderSettings(NamedTuple):
+    base_dir: Path
+    build_dir: Path
+    fragment_dir: Path
+    multipage: bool
+    lightweight_preprocessing: bool
+    cache_dir: Optional[Path]
+
+
+class _FragmentJobContext(Context):
+    """Context for rendering a fragment job.
+
+    Collects the files to write and the inserted elements, to be merged by `Context.merge_fragment`.
+    """
+    files: List[Tuple[Path, str]]
+    inserted_elements: List[Tuple[str, str]]
+
+    def __init__(self, settings: _RenderSettings, reference: ApiReference, templates: TemplateCache,
+                 inserted: Dict[str, Path], document: Path):
+        super().__init__(base_dir=settings.base_dir,
+                         build_dir=settings.build_dir,
+                         fragment_dir=settings.fragment_dir,
+                         reference=reference,
+                         current_document=DocumentTreeNode(document))
+        self.templates = templates
+        self.preprocessing_run = False
+        self.multipage = settings.multipage
+        self.lightweight_preprocessing = settings.lightweight_preprocessing
+        self.inserted = inserted
+
+        self.files = []
+        self.inserted_elements = []
+
+    def insert(self, element) -> str:
+        if self.lightweight_preprocessing:
+            self.inserted_elements.append((element.id, element.name))
+        return ""
+
+    def write_file(self, file: Path, text: str) -> None:
+        self.files.append((file, text))
+
+
+def _render_fragment_job(settings: _RenderSettings, reference: ApiReference,
+                         templates: TemplateCache, inserted: Dict[str, Path],
+                         job: FragmentJob) -> FragmentResult:
+    context = _FragmentJobContext(settings, reference, templates, inserted, job.document)
+    element = reference.find(target_id=job.element_id)
+    Api(job.document, context).insert_fragment(element, job.insert_filter, kind_override=job.kind)
+    return FragmentResult(context.files, context.inserted_elements, context.pending_links,
+                          [e.id for e in context.linked if e.id is not None])
+
+
+def _render_fragment_chunk(settings: _RenderSettings, elements: List[ReferableElement],
+                           inserted: Dict[str, Path],
+                           jobs: Sequence[FragmentJob]) -> List[FragmentResult]:
+    # Runs in a worker process, with its own snapshot of the API reference.
+    reference = ApiReference()
+    for element in elements:
+        reference.append(element)
+    templates = TemplateCache(settings.base_dir, settings.cache_dir)
+    return [_render_fragment_job(settings, reference, templates, inserted, job) for job in jobs]
+
+
+def _render_fragment_jobs(context: Context, jobs: int) -> None:
+    assert context.fragment_jobs is not None
+    fragment_jobs = context.fragment_jobs
+    settings = _RenderSettings(context.base_dir, context.build_dir, context.fragment_dir,
+                               context.multipage, context.lightweight_preprocessing,
+                               context.templates.cache_dir)
+    inserted = dict(context.inserted)
+
+    if len(fragment_jobs) <= 1:
+        results = [
+            _render_fragment_job(settings, context.reference, context.templates, inserted, job)
+            for job in fragment_jobs
+        ]
+    else:
+        # Interleave the jobs, as fragments in the same document tend to have a similar size
+        count = min(jobs, len(fragment_jobs))
+        chunks = [fragment_jobs[i::count] for i in range(count)]
+        with ProcessPoolExecutor(max_workers=count) as executor:
+            chunk_results = list(
+                executor.map(_render_fragment_chunk, [settings] * count,
+                             [context.reference.elements] * count, [inserted] * count, chunks))
+        results = [chunk_results[i % count][i // count] for i in range(len(fragment_jobs))]
+
+    for job, result in zip(fragment_jobs, results):
+        context.merge_fragment(job, result)
+    fragment_jobs.clear()
+
+
 def _check_links(context: Context):
     linked = {e.id for e in context.linked}
     dangling = linked - context.inserted.keys()
@@ -0,0 +1,211 @@
+# Copyright (C) 2019-2020, TomTom (http://tomtom.com).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Caches for compiled Mako templates and generated files."""
+
+import hashlib
+import json
+import logging
+import os
+
+from mako.lookup import TemplateLookup
+from mako.template import Template
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .. import templates
+from .._version import __version__
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateCache:
+    """Compiled templates for API reference and documents.
+
+    API reference templates are loaded through a single template lookup. Documents and templates
+    are only compiled once per cache.
+
+    If a cache directory is set, the compiled templates are also stored in it, to be reused by later
+    runs and by worker processes. Compiled templates are keyed by a hash of the template source, its
+    location and the AsciiDoxy version. Changing any of these results in a cache miss.
+
+    Attributes:
+        cache_dir: Directory to store the compiled templates in. None to only compile in memory.
+        lookup:    Lookup for API reference templates. Templates in the base directory override the
+                       default templates.
+        hits:      Number of compiled templates loaded from the cache directory.
+        misses:    Number of compiled templates not found in the cache directory.
+    """
+    cache_dir: Optional[Path]
+    lookup: TemplateLookup
+    hits: int
+    misses: int
+    _api_templates: Dict[Tuple[str, str], Template]
+    _documents: Dict[Path, Template]
+
+    def __init__(self, base_dir: Path, cache_dir: Optional[Path] = None):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._api_templates = {}
+        self._documents = {}
+
+        if cache_dir is not None:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            modulename_callable = self._module_filename
+        else:
+            modulename_callable = None
+
+        templates_path = templates.__path__  # type: ignore  # mypy issue #1422
+        self.lookup = TemplateLookup(directories=list(templates_path) + [os.fspath(base_dir)],
+                                     input_encoding="utf-8",
+                                     modulename_callable=modulename_callable)
+
+    def api_template(self, lang: str, kind: str) -> Template:
+        """Get the template for inserting API reference.
+
+        Args:
+            lang: Language of the element to insert.
+            kind: Kind of the element to insert.
+
+        Returns:
+            The compiled template.
+
+        Raises:
+            TopLevelLookupException: There is no template for the language and kind.
+        """
+        key = lang, kind
+        template = self._api_templates.get(key)
+        if template is None:
+            template = self.lookup.get_template(f"{lang}/{kind}.mako")
+            self._api_templates[key] = template
+        return template
+
+    def document(self, in_file: Path) -> Template:
+        """Get the template for an AsciiDoc document.
+
+        Args:
+            in_file: Path to the document.
+
+        Returns:
+            The compiled document.
+        """
+        template = self._documents.get(in_file)
+        if template is None:
+            filename = os.fspath(in_file)
+            if self.cache_dir is not None:
+                module_filename: Optional[str] = self._module_filename(filename, filename)
+            else:
+                module_filename = None
+            template = Template(filename=filename,
+                                input_encoding="utf-8",
+                                module_filename=module_filename)
+            self._documents[in_file] = template
+        return template
+
+    def _module_filename(self, filename: str, uri: str) -> str:
+        assert self.cache_dir is not None
+
+        hasher = hashlib.sha256()
+        for part in (__version__, uri, filename):
+            hasher.update(part.encode("utf-8"))
+            hasher.update(b"\0")
+        with open(filename, "rb") as f:
+            hasher.update(f.read())
+        module_file = self.cache_dir / f"{hasher.hexdigest()}.py"
+
+        if module_file.is_file():
+            # The key guarantees the compiled module matches the source. Mako compiles the template
+            # again if the source file is newer, for example after copying it.
+            os.utime(module_file)
+            self.hits += 1
+        else:
+            self.misses += 1
+        return os.fspath(module_file)
+
+
+class OutputManifest:
+    """Manifest of generated files, to skip writing files that did not change.
+
+    For each file written, the manifest stores a hash of its content and the size and modification
+    time of the file. A file is only written again if its content changes, or if the file on disk no
+    longer matches the manifest.
+
+    Attributes:
+        manifest_file: File to store the manifest in. None to not store the manifest.
+        written:       Number of files written.
+        skipped:       Number of files not written, because they did not change.
+    """
+    manifest_file: Optional[Path]
+    written: int
+    skipped: int
+    _entries: Dict[str, Tuple[str, int, int]]
+
+    def __init__(self, manifest_file: Optional[Path] = None):
+        self.manifest_file = manifest_file
+        self.written = 0
+        self.skipped = 0
+        self._entries = {}
+
+        if manifest_file is not None and manifest_file.is_file():
+            try:
+                with manifest_file.open("r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data["version"] == __version__:
+                    self._entries = {
+                        file: (digest, size, mtime)
+                        for file, (digest, size, mtime) in data["files"].items()
+                    }
+            except (OSError, ValueError, KeyError, TypeError):
+                logger.debug(f"Ignoring unreadable manifest {manifest_file}.", exc_info=True)
+
+    def write(self, file: Path, content: str) -> bool:
+        """Write a generated file, unless it already has the same content.
+
+        Args:
+            file:    File to write.
+            content: Text to write to the file.
+
+        Returns:
+            True if the file is written, False if it is skipped.
+        """
+        key = os.fspath(file)
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == digest:
+            try:
+                stat = file.stat()
+            except OSError:
+                stat = None
+            if stat is not None and (stat.st_size, stat.st_mtime_ns) == entry[1:]:
+                self.skipped += 1
+                return False
+
+        with file.open("w", encoding="utf-8") as f:
+            f.write(content)
+        stat = file.stat()
+        self._entries[key] = digest, stat.st_size, stat.st_mtime_ns
+        self.written += 1
+        return True
+
+    def save(self) -> None:
+        """Store the manifest, if a manifest file is set."""
+        if self.manifest_file is None:
+            return
+
+        self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.manifest_file.with_name(f"{self.manifest_file.name}.tmp")
+        with tmp_file.open("w", encoding="utf-8") as f:
+            json.dump({"version": __version__, "files": self._entries}, f)
+        os.replace(tmp_file, self.manifest_file)
@@ -14,20 +14,85 @@
 """Context of the document being generated."""
 
 import logging
+import re
 
 from pathlib import Path
-from typing import Dict, List, MutableMapping, Optional
+from typing import Dict, List, MutableMapping, NamedTuple, Optional, Tuple
 
 from tqdm import tqdm
 
 from ..api_reference import ApiReference
 from ..model import ReferableElement
+from .cache import OutputManifest, TemplateCache
+from .dependencies import DependencyGraph, DocumentDependencies
 from .errors import ConsistencyError
 from .filters import InsertionFilter
 from .navigation import DocumentTreeNode, relative_path
 
 logger = logging.getLogger(__name__)
 
+FragmentKey = Tuple[Path, str, str, str, str]
+"""Document, language, element id, kind and filter of an inserted fragment."""
+
+_PENDING_LINK = re.compile("\x00([0-9]+)\x00")
+
+
+class FragmentJob(NamedTuple):
+    """Fragment to render in parallel, after all documents have been processed.
+
+    Attributes:
+        element_id:    Id of the element to insert.
+        kind:          Kind of template to use.
+        insert_filter: Filter for the parts of the element to insert.
+        document:      Document in which the fragment is inserted.
+    """
+    element_id: str
+    kind: str
+    insert_filter: InsertionFilter
+    document: Path
+
+
+class FragmentResult(NamedTuple):
+    """Result of rendering a fragment job.
+
+    Attributes:
+        files:         Fragment files to write, including fragments inserted in the fragment.
+        inserted:      Id and name of the elements inserted, in order of insertion. Only collected
+                           with lightweight preprocessing.
+        pending_links: Links waiting for the file part, as in `Context.pending_links`. The files
+                           refer to them by their index in this list.
+        linked:        Ids of the elements linked to.
+    """
+    files: List[Tuple[Path, str]]
+    inserted: List[Tuple[str, str]]
+    pending_links: List[Tuple[str, Path]]
+    linked: List[str]
+
+
+class RenderedFragment(object):
+    """Documentation fragment rendered during the preprocessing run.
+
+    Links are the only part of a fragment that depends on information that is incomplete during
+    preprocessing. If all links still point to the same files, the fragment can be reused.
+
+    Attributes:
+        file:     File to write the fragment to.
+        text:     Rendered AsciiDoc text of the fragment.
+        links:    Links in the fragment: the id of the element linked to, the file part of the
+                      link, and the element linked to, if it is known.
+        children: Fragments inserted in this fragment.
+    """
+    file: Path
+    text: str
+    links: List[Tuple[str, str, Optional[ReferableElement]]]
+    children: List["RenderedFragment"]
+
+    def __init__(self, file: Path):
+        self.file = file
+        self.text = ""
+        self.links = []
+        self.children = []
+
 
 class Context(object):
     """Contextual information about the document being generated.
@@ -51,6 +116,22 @@ class Context(object):
         inserted:           All elements that have been inserted in the documentation.
         in_to_out_file_map: Mapping from input files for AsciiDoctor to the resulting output files.
         current_document:   Node in the Document Tree that is currently being processed.
+        reuse_fragments:    True to reuse fragments rendered during preprocessing.
+        rendered_fragments: Fragments rendered during preprocessing that can be reused.
+        fragment_stack:     Fragments that are currently being rendered, innermost last.
+        templates:          Compiled templates for API reference and documents.
+        lightweight_preprocessing: True to only discover the document tree during preprocessing,
+                                without rendering inserted fragments. Inserted elements are then
+                                collected while generating, and links to other documents are
+                                completed after all documents have been generated.
+        pending_links:      Links waiting for the file part: the id of the element linked to, and
+                                the document containing the link.
+        pending_files:      Generated files containing links that are not complete yet.
+        fragment_jobs:      Fragments to render in parallel after processing all documents. None
+                                to render fragments immediately.
+        outputs:            Manifest of the generated files, used to skip writing unchanged files.
+        dependencies:       Dependencies of the generated documents, to reuse unchanged documents
+                                from the previous run. None to generate all documents.
     """
     base_dir: Path
     build_dir: Path
@@ -72,6 +153,18 @@ class Context(object):
     in_to_out_file_map: Dict[Path, Path]
     current_document: DocumentTreeNode
 
+    reuse_fragments: bool = False
+    rendered_fragments: Dict[FragmentKey, RenderedFragment]
+    fragment_stack: List[RenderedFragment]
+    templates: TemplateCache
+
+    lightweight_preprocessing: bool = False
+    pending_links: List[Tuple[str, Path]]
+    pending_files: Dict[Path, str]
+    fragment_jobs: Optional[List[FragmentJob]] = None
+    outputs: OutputManifest
+    dependencies: Optional[DependencyGraph] = None
+
     def __init__(self, base_dir: Path, build_dir: Path, fragment_dir: Path, reference: ApiReference,
                  current_document: DocumentTreeNode):
         self.base_dir = base_dir
@@ -87,18 +180,30 @@ class Context(object):
         self.in_to_out_file_map = {}
         self.current_document = current_document
 
+        self.rendered_fragments = {}
+        self.fragment_stack = []
+        self.templates = TemplateCache(base_dir)
+
+        self.pending_links = []
+        self.pending_files = {}
+        self.outputs = OutputManifest()
+
     def insert(self, element) -> str:
-        if self.preprocessing_run:
-            if element.id in self.inserted:
-                msg = f"Duplicate insertion of {element.name}"
-                if self.warnings_are_errors:
-                    raise ConsistencyError(msg)
-                else:
-                    logger.warning(msg)
-            self.inserted[element.id] = self.current_document.in_file
+        # Lightweight preprocessing does not render fragments, so collect them while generating
+        if self.preprocessing_run != self.lightweight_preprocessing:
+            self._register_insertion(element.id, element.name, self.current_document.in_file)
 
         return ""  # Prevent output in templates
 
+    def _register_insertion(self, element_id: str, name: str, in_file: Path) -> None:
+        if element_id in self.inserted:
+            msg = f"Duplicate insertion of {name}"
+            if self.warnings_are_errors:
+                raise ConsistencyError(msg)
+            else:
+                logger.warning(msg)
+        self.inserted[element_id] = in_file
+
     def sub_context(self) -> "Context":
         sub = Context(base_dir=self.base_dir,
                       build_dir=self.build_dir,
@@ -112,6 +217,8 @@ class Context(object):
         sub.preprocessing_run = self.preprocessing_run
         sub.warnings_are_errors = self.warnings_are_errors
         sub.multipage = self.multipage
+        sub.reuse_fragments = self.reuse_fragments
+        sub.lightweight_preprocessing = self.lightweight_preprocessing
 
         # References
         sub.linked = self.linked
@@ -119,6 +226,14 @@ class Context(object):
         sub.in_to_out_file_map = self.in_to_out_file_map
         sub.insert_filter = self.insert_filter
         sub.progress = self.progress
+        sub.rendered_fragments = self.rendered_fragments
+        sub.fragment_stack = self.fragment_stack
+        sub.templates = self.templates
+        sub.pending_links = self.pending_links
+        sub.pending_files = self.pending_files
+        sub.fragment_jobs = self.fragment_jobs
+        sub.outputs = self.outputs
+        sub.dependencies = self.dependencies
 
         return sub
 
@@ -126,17 +241,131 @@ class Context(object):
                         element_id: str,
                         link_text: str,
                         element: Optional[ReferableElement] = None) -> str:
-        def file_part():
-            if not self.multipage or element_id not in self.inserted:
-                return ""
-            containing_file = self.inserted[element_id]
-            assert containing_file is not None
-            if self.current_document.in_file != containing_file:
-                return f"{relative_path(self.current_document.in_file, containing_file)}#"
-
         if element is None:
             element = self.reference.find(target_id=element_id)
         if element is not None:
             self.linked.append(element)
+        if not self.preprocessing_run:
+            self._record_links(self.current_document.in_file, [element_id])
+
+        if self._defer_links():
+            self.pending_links.append((element_id, self.current_document.in_file))
+            return f"xref:\x00{len(self.pending_links) - 1}\x00{element_id}[{link_text}]"
+
+        file_part = self._file_part(element_id)
+        if self.fragment_stack:
+            self.fragment_stack[-1].links.append((element_id, file_part, element))
+
+        return f"xref:{file_part}{element_id}[{link_text}]"
+
+    def reusable_fragment(self, key: FragmentKey) -> Optional[RenderedFragment]:
+        """Find a fragment rendered during preprocessing that can be reused.
+
+        Args:
+            key: Identification of the fragment to insert.
+
+        Returns:
+            The rendered fragment, or None if the fragment needs to be rendered again.
+        """
+        fragment = self.rendered_fragments.get(key)
+        if fragment is None or not self._links_unchanged(fragment):
+            return None
+        return fragment
+
+    def write_file(self, file: Path, text: str) -> None:
+        """Write a generated document or fragment.
+
+        Files containing links that are not complete yet, are kept until `complete_links` is
+        called. Files are not written if their content did not change.
+        """
+        if self._defer_links():
+            self.pending_files[file] = text
+        else:
+            self.outputs.write(file, f"{text}\n")
+
+    def complete_links(self) -> None:
+        """Complete the links to other documents, and write the files containing them."""
+        def complete(match) -> str:
+            element_id, in_file = self.pending_links[int(match.group(1))]
+            return self._file_part(element_id, in_file)
+
+        for file, text in self.pending_files.items():
+            self.outputs.write(file, f"{_PENDING_LINK.sub(complete, text)}\n")
+        self.pending_files.clear()
+        self.pending_links.clear()
+
+    def merge_fragment(self, job: FragmentJob, result: FragmentResult) -> None:
+        """Merge the result of a fragment job rendered in parallel.
+
+        Results need to be merged in the order the jobs were created, to get the same result as
+        rendering the fragments immediately.
+        """
+        for element_id, name in result.inserted:
+            self._register_insertion(element_id, name, job.document)
+
+        offset = len(self.pending_links)
+        self.pending_links.extend(result.pending_links)
+
+        def renumber(match) -> str:
+            return f"\x00{int(match.group(1)) + offset}\x00"
+
+        for file, text in result.files:
+            if result.pending_links:
+                text = _PENDING_LINK.sub(renumber, text)
+            self.write_file(file, text)
+
+        for element_id in result.linked:
+            element = self.reference.find(target_id=element_id)
+            if element is not None:
+                self.linked.append(element)
+        self._record_links(job.document, result.linked)
+
+    def write_fragment(self, fragment: RenderedFragment) -> None:
+        """Write a fragment rendered during preprocessing, and the fragments inserted in it."""
+        self.write_file(fragment.file, fragment.text)
+        self.linked.extend(element for _, _, element in fragment.links if element is not None)
+        self._record_links(self.current_document.in_file,
+                           [element_id for element_id, _, _ in fragment.links])
+        for child in fragment.children:
+            self.write_fragment(child)
+
+    def reuse_document(self, record: DocumentDependencies) -> None:
+        """Register the elements inserted in and linked from a document reused from a previous run.
+
+        Elements are registered in the same run as when the document would be generated.
+        """
+        in_file = self.current_document.in_file
+        if self.preprocessing_run != self.lightweight_preprocessing:
+            for element_id, name in record.inserted.items():
+                self._register_insertion(element_id, name, in_file)
+
+        if not self.preprocessing_run:
+            for element_id in record.linked:
+                element = self.reference.find(target_id=element_id)
+                if element is not None:
+                    self.linked.append(element)
+
+    def _links_unchanged(self, fragment: RenderedFragment) -> bool:
+        for element_id, file_part, _ in fragment.links:
+            if self._file_part(element_id) != file_part:
+                return False
+        return all(self._links_unchanged(child) for child in fragment.children)
+
+    def _record_links(self, in_file: Path, element_ids: List[str]) -> None:
+        if self.dependencies is not None:
+            self.dependencies.links.setdefault(in_file, set()).update(element_ids)
+
+    def _defer_links(self) -> bool:
+        # Only in multipage mode links depend on the inserted elements
+        return self.lightweight_preprocessing and self.multipage and not self.preprocessing_run
 
-        return f"xref:{file_part() or ''}{element_id}[{link_text}]"
+    def _file_part(self, element_id: str, in_file: Optional[Path] = None) -> str:
+        if not self.multipage or element_id not in self.inserted:
+            return ""
+        if in_file is None:
+            in_file = self.current_document.in_file
+        containing_file = self.inserted[element_id]
+        assert containing_file is not None
+        if in_file != containing_file:
+            return f"{relative_path(in_file, containing_file)}#"
+        return ""
@@ -0,0 +1,289 @@
+# Copyright (C) 2019-2020, TomTom (http://tomtom.com).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Dependencies of generated documents, for incremental builds."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set
+
+from .._version import __version__
+
+logger = logging.getLogger(__name__)
+
+_INCLUDE = re.compile(r"^include::(.+?)\[", re.MULTILINE)
+
+
+class DocumentDependencies(NamedTuple):
+    """Everything a generated document depended on when it was last generated.
+
+    Attributes:
+        source:   Hash of the AsciiDoc source of the document.
+        state:    Namespace, language and insertion filter specifications inherited from the
+                      including document.
+        children: Documents included by the document.
+        inserted: Ids and names of the elements inserted in the document.
+        linked:   Ids of the elements linked to from the document, with the document inserting the
+                      element. None if the element is not inserted.
+        files:    Hashes of the generated files for the document: the document itself, its docinfo
+                      files and the fragments it includes.
+    """
+    source: str
+    state: List
+    children: List[str]
+    inserted: Dict[str, str]
+    linked: Dict[str, Optional[str]]
+    files: Dict[str, Optional[str]]
+
+
+class DependencyGraph:
+    """Dependencies of the generated documents and their conversion by AsciiDoctor.
+
+    Documents are only generated again if their source, the state inherited from the including
+    document, or the files generated for them changed since the previous run. Changes to the API
+    reference, the templates or the options invalidate all documents. The output of AsciiDoctor is
+    only converted again if any of its input files changed.
+
+    Attributes:
+        graph_file:      File to store the graph in.
+        api_fingerprint: Fingerprint of the source files of the API reference.
+        reused:          Number of documents reused from the previous run.
+        rendered:        Inherited state of the documents generated in the current run.
+        links:           Ids of the elements linked to from each document in the current run.
+    """
+    graph_file: Path
+    api_fingerprint: str
+    reused: int
+    rendered: Dict[Path, Optional[List]]
+    links: Dict[Path, Set[str]]
+
+    _fingerprint: Optional[str]
+    _tree: Optional[str]
+    _documents: Dict[str, DocumentDependencies]
+    _conversions: Dict[str, str]
+    _sources: Dict[Path, str]
+
+    def __init__(self, graph_file: Path, api_fingerprint: str = ""):
+        self.graph_file = graph_file
+        self.api_fingerprint = api_fingerprint
+        self.reused = 0
+        self.rendered = {}
+        self.links = {}
+
+        self._fingerprint = None
+        self._tree = None
+        self._documents = {}
+        self._conversions = {}
+        self._sources = {}
+
+        if graph_file.is_file():
+            try:
+                with graph_file.open("r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data["version"] == __version__:
+                    self._fingerprint = data["fingerprint"]
+                    self._tree = data["tree"]
+                    self._documents = {
+                        in_file: DocumentDependencies(*record)
+                        for in_file, record in data["documents"].items()
+                    }
+                    self._conversions = data["conversions"]
+            except (OSError, ValueError, KeyError, TypeError):
+                logger.debug(f"Ignoring unreadable dependency graph {graph_file}.", exc_info=True)
+
+    def start(self, base_dir: Path, options: Sequence) -> None:
+        """Start generating documents.
+
+        Documents from the previous run are only reused if the API reference, the templates and
+        the options are the same.
+
+        Args:
+            base_dir: Base directory containing the documents and custom templates.
+            options:  Options affecting the generated documents.
+        """
+        fingerprint = fingerprint_files(sorted(base_dir.glob("**/*.mako")),
+                                        [__version__, self.api_fingerprint] +
+                                        [str(option) for option in options])
+        if fingerprint != self._fingerprint:
+            self._documents.clear()
+            self._fingerprint = fingerprint
+        self.reused = 0
+        self.rendered.clear()
+        self.links.clear()
+
+    def reusable(self, in_file: Path, state: List) -> Optional[DocumentDependencies]:
+        """Dependencies of a document that can be reused from the previous run.
+
+        Args:
+            in_file: Source of the document.
+            state:   Namespace, language and insertion filter specifications inherited from the
+                         including document.
+
+        Returns:
+            The dependencies of the document, or None if the document needs to be generated.
+        """
+        record = self._documents.get(os.fspath(in_file))
+        if record is None or record.source != self._source(in_file) or record.state != state:
+            return None
+        if any(child not in self._documents or not Path(child).is_file()
+               for child in record.children):
+            return None
+        return record
+
+    def recorded(self, in_file: Path) -> Optional[DocumentDependencies]:
+        """Dependencies of a document recorded in the previous or current run."""
+        return self._documents.get(os.fspath(in_file))
+
+    def tree_unchanged(self, tree: str) -> bool:
+        """Check whether the document tree is the same as in the previous run."""
+        return tree == self._tree
+
+    def files_unchanged(self, record: DocumentDependencies) -> bool:
+        """Check whether the files generated for a document are still present and unchanged."""
+        return all(_file_digest(Path(file)) == digest for file, digest in record.files.items())
+
+    def record(self, in_file: Path, state: List, children: Iterable[Path], inserted: Dict[str, str],
+               linked: Dict[str, Optional[Path]], files: Iterable[Path]) -> None:
+        """Record the dependencies of a document generated in the current run."""
+        self._documents[os.fspath(in_file)] = DocumentDependencies(
+            source=self._source(in_file),
+            state=state,
+            children=[os.fspath(child) for child in children],
+            inserted=inserted,
+            linked={
+                element_id: None if target is None else os.fspath(target)
+                for element_id, target in linked.items()
+            },
+            files={os.fspath(file): _file_digest(file)
+                   for file in files})
+
+    def finish(self, tree: str) -> None:
+        """Finish generating documents, with the final document tree."""
+        self._tree = tree
+
+    def clear(self) -> None:
+        """Forget all documents of the previous run."""
+        self._documents.clear()
+        self._tree = None
+
+    def conversion_key(self, processed_file: Path, options: Sequence[str]) -> str:
+        """Key identifying the input for converting a document.
+
+        Args:
+            processed_file: Generated document to convert.
+            options:        Options for the conversion.
+
+        Returns:
+            Hash of the options, the generated document, its docinfo files and its included files.
+        """
+        return fingerprint_files(document_files(processed_file), options)
+
+    def is_converted(self, out_file: Path, key: str) -> bool:
+        """Check whether an output file is converted from the same input in a previous run."""
+        return self._conversions.get(os.fspath(out_file)) == key and out_file.is_file()
+
+    def converted(self, out_file: Path, key: str) -> None:
+        """Record the conversion of an output file."""
+        self._conversions[os.fspath(out_file)] = key
+
+    def save(self) -> None:
+        """Store the dependency graph for the next run."""
+        self.graph_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.graph_file.with_name(f"{self.graph_file.name}.tmp")
+        with tmp_file.open("w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": __version__,
+                    "fingerprint": self._fingerprint,
+                    "tree": self._tree,
+                    "documents": self._documents,
+                    "conversions": self._conversions,
+                }, f)
+        os.replace(tmp_file, self.graph_file)
+
+    def _source(self, in_file: Path) -> str:
+        digest = self._sources.get(in_file)
+        if digest is None:
+            digest = _file_digest(in_file) or ""
+            self._sources[in_file] = digest
+        return digest
+
+
+def fingerprint_files(files: Iterable[Path], extra: Sequence[str] = ()) -> str:
+    """Hash of the names and contents of files, and additional strings.
+
+    Missing files are included as missing, so creating them changes the fingerprint.
+    """
+    hasher = hashlib.sha256()
+    for item in extra:
+        hasher.update(item.encode("utf-8"))
+        hasher.update(b"\0")
+    for file in files:
+        hasher.update(os.fsencode(file))
+        hasher.update(b"\0")
+        hasher.update((_file_digest(file) or "missing").encode("ascii"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+def document_files(document: Path, include_dir: Optional[Path] = None) -> List[Path]:
+    """Files AsciiDoctor reads when converting a generated document.
+
+    These are the document itself, its private docinfo files, and all files it includes, directly
+    or indirectly.
+
+    Args:
+        document:    Generated document.
+        include_dir: Only follow includes of files in this directory. None to follow all includes.
+
+    Returns:
+        The files, in the order they are found.
+    """
+    files = [document]
+    for suffix in ("docinfo", "docinfo-header", "docinfo-footer"):
+        for extension in (".html", ".xml"):
+            docinfo_file = document.with_name(f"{document.stem}-{suffix}{extension}")
+            if docinfo_file.is_file():
+                files.append(docinfo_file)
+
+    seen = {document}
+    pending = [document]
+    while pending:
+        current = pending.pop()
+        try:
+            text = current.read_text(encoding="utf-8")
+        except (OSError, ValueError):
+            continue
+        for match in _INCLUDE.finditer(text):
+            included = current.parent / match.group(1)
+            if included in seen:
+                continue
+            if include_dir is not None and included.parent != include_dir:
+                continue
+            seen.add(included)
+            files.append(included)
+            pending.append(included)
+    return files
+
+
+def _file_digest(file: Path) -> Optional[str]:
+    try:
+        with file.open("rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
@@ -14,11 +14,13 @@
 """Filters for selecting which parts of elements are generated."""
 
 import collections
+import operator
 import re
 
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Generator, List, Mapping, Optional, Pattern, Sequence, Type, TypeVar, Union
+from typing import (Collection, Dict, Generator, Iterable, List, Mapping, Optional, Pattern,
+                    Sequence, Tuple, Type, TypeVar, Union)
 
 from ..model import Compound, EnumValue, InnerTypeReference, Member, ThrowsClause
 
@@ -332,6 +334,60 @@ def combine_specs(first: Optional[FilterSpec],
         return combine_strings(first, second)
 
 
+class MemberPartition:
+    """Members of a compound matching a filter, grouped by kind, protection and static.
+
+    Templates select the same kinds of members several times while rendering a compound. Grouping
+    the members once makes each selection only visit the members it returns.
+
+    Attributes:
+        members: All members matching the filter.
+    """
+    members: List[Member]
+    _groups: Dict[Tuple[str, Optional[str], bool], List[Tuple[int, Member]]]
+    _selections: Dict[Tuple[Collection[str], Optional[Collection[Optional[str]]], Optional[bool]],
+                      List[Member]]
+
+    def __init__(self, members: Iterable[Member]):
+        self.members = list(members)
+        self._groups = collections.defaultdict(list)
+        self._selections = {}
+
+        for position, member in enumerate(self.members):
+            self._groups[(member.kind, member.prot, bool(member.static))].append((position, member))
+
+    def select(self,
+               kinds: Collection[str],
+               prots: Optional[Collection[Optional[str]]] = None,
+               static: Optional[bool] = None) -> List[Member]:
+        """Select members of specific kinds.
+
+        Args:
+            kinds:  Kinds of members to select.
+            prots:  Protection levels of members to select. None to select any protection level.
+            static: True to select only static members, False to select only non-static members.
+                        None to select both.
+
+        Returns:
+            The selected members, in their original order. The list is shared with later calls,
+                and should not be modified.
+        """
+        key = (kinds, prots, static)
+        selection = self._selections.get(key)
+        if selection is None:
+            entries: List[Tuple[int, Member]] = []
+            for (kind, prot, is_static), group in self._groups.items():
+                if kind not in kinds or (prots is not None and prot not in prots):
+                    continue
+                if static is not None and is_static != static:
+                    continue
+                entries.extend(group)
+            entries.sort(key=operator.itemgetter(0))
+            selection = [member for _, member in entries]
+            self._selections[key] = selection
+        return selection
+
+
 class InsertionFilter:
     """Filter members of an element to be inserted."""
     _member_filter: Optional[MemberFilter]
@@ -344,6 +400,8 @@ class InsertionFilter:
     _enum_value_spec: Optional[FilterSpec]
     _exception_spec: Optional[FilterSpec]
 
+    _partitions: Dict[int, Tuple[Compound, MemberPartition]]
+
     def __init__(self,
                  members: Optional[FilterSpec] = None,
                  inner_classes: Optional[FilterSpec] = None,
@@ -358,6 +416,26 @@ class InsertionFilter:
         self._inner_class_filter = InnerClassFilter.from_spec(inner_classes)
         self._enum_value_filter = EnumValueFilter.from_spec(enum_values)
         self._exception_filter = ExceptionFilter.from_spec(exceptions)
+        self._partitions = {}
+
+    def __reduce__(self):
+        # Only pickle the specifications, the filters and member partitions are recreated
+        return (InsertionFilter, self.specs())
+
+    def specs(self) -> Tuple[Optional[FilterSpec], ...]:
+        """Filter specifications for members, inner classes, enum values and exceptions.
+
+        Passing the specifications to the constructor creates an identical filter.
+        """
+        return (self._member_spec, self._inner_class_spec, self._enum_value_spec,
+                self._exception_spec)
+
+    def spec_key(self) -> str:
+        """Representation of the filter specifications, usable as a key.
+
+        Filters with the same specifications select the same parts of an element.
+        """
+        return repr(self.specs())
 
     def members(self, compound: Compound) -> Generator[Member, None, None]:
         """Get members matching the filter."""
@@ -365,6 +443,18 @@ class InsertionFilter:
             if self._member_filter is None or self._member_filter(member):
                 yield member
 
+    def member_partition(self, compound: Compound) -> MemberPartition:
+        """Get members matching the filter, grouped by kind, protection and static.
+
+        The members are only filtered and grouped the first time for each compound.
+        """
+        # The compound is stored with its partition, so its id cannot be reused by another object
+        entry = self._partitions.get(id(compound))
+        if entry is None:
+            entry = compound, MemberPartition(self.members(compound))
+            self._partitions[id(compound)] = entry
+        return entry[1]
+
     def inner_classes(self, compound: Compound) -> Generator[InnerTypeReference, None, None]:
         """Get inner classes matching the filter."""
         for inner in compound.inner_classes:
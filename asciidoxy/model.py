@@ -14,12 +14,18 @@
 """Models of API reference elements."""
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 
 def json_repr(obj):
     data = {"__CLASS__": obj.__class__.__name__}
-    data.update(vars(obj))
+    for cls in reversed(type(obj).__mro__):
+        for attr in getattr(cls, "__slots__", ()):
+            if not attr.startswith("_"):
+                data[attr] = getattr(obj, attr)
+        for attr, value in vars(cls).items():
+            if isinstance(value, property):
+                data[attr] = getattr(obj, attr)
     return data
 
 
@@ -33,14 +39,20 @@ class ReferableElement:
         language:  Language the element is written in.
         kind:      Kind of language element.
     """
-    id: Optional[str] = None
-    name: str = ""
-    full_name: str = ""
+    __slots__ = "id", "name", "full_name", "language", "kind"
+
+    id: Optional[str]
+    name: str
+    full_name: str
     language: str
-    kind: str = ""
+    kind: str
 
     def __init__(self, language: str):
+        self.id = None
+        self.name = ""
+        self.full_name = ""
         self.language = language
+        self.kind = ""
 
     def __str__(self) -> str:
         text = (f"ReferableElement [\n id [{self.id}]\n  name [{self.name}]\n "
@@ -48,6 +60,74 @@ class ReferableElement:
         return text + "]"
 
 
+class DescriptionSource(ABC):
+    """Source of descriptions that are only rendered when they are used for the first time."""
+    __slots__ = ()
+
+    @abstractmethod
+    def render(self) -> Tuple[str, str]:
+        """Render the descriptions.
+
+        Returns:
+            brief:       Brief description.
+            description: Full description.
+        """
+        pass
+
+
+class DescribedElement(ReferableElement):
+    """Base class for referable elements with a brief and a full description.
+
+    The descriptions can be set directly, or be provided by a `DescriptionSource`. In the latter
+    case they are rendered the first time either of them is accessed.
+
+    Attributes:
+        brief:       Brief description of the element.
+        description: Full description of the element.
+    """
+    __slots__ = "_brief", "_description", "_description_source"
+
+    _brief: str
+    _description: str
+    _description_source: Optional[DescriptionSource]
+
+    def __init__(self, language: str):
+        super().__init__(language)
+        self._brief = ""
+        self._description = ""
+        self._description_source = None
+
+    @property
+    def brief(self) -> str:
+        self._render_descriptions()
+        return self._brief
+
+    @brief.setter
+    def brief(self, value: str) -> None:
+        self._render_descriptions()
+        self._brief = value
+
+    @property
+    def description(self) -> str:
+        self._render_descriptions()
+        return self._description
+
+    @description.setter
+    def description(self, value: str) -> None:
+        self._render_descriptions()
+        self._description = value
+
+    def set_description_source(self, source: Optional[DescriptionSource]) -> None:
+        """Set the source to render the descriptions from when they are first accessed."""
+        self._description_source = source
+
+    def _render_descriptions(self) -> None:
+        if self._description_source is not None:
+            source = self._description_source
+            self._description_source = None
+            self._brief, self._description = source.render()
+
+
 class TypeRefBase(ABC):
     """Base class for references to types.
     Attributes:
@@ -56,16 +136,20 @@ class TypeRefBase(ABC):
         language:  Language the type is written in.
         namespace: Namespace, or package, from which the type is referenced.
     """
+    __slots__ = "id", "name", "language", "namespace"
+
     # doxygen based fields
-    id: Optional[str] = None
+    id: Optional[str]
     name: str
     # custom fields
     language: str
-    namespace: Optional[str] = None
+    namespace: Optional[str]
 
     def __init__(self, language: str, name: str = ""):
+        self.id = None
         self.language = language
         self.name = name
+        self.namespace = None
 
     @abstractmethod
     def resolve(self, reference_target: ReferableElement) -> None:
@@ -85,19 +169,23 @@ class TypeRef(TypeRefBase):
         args:      Arguments for function like types. None if no arguments, an empty list if zero
                        arguments.
     """
+    __slots__ = "kind", "prefix", "suffix", "nested", "args"
 
     # doxygen based fields
-    kind: Optional[str] = None
+    kind: Optional[str]
     # custom fields
-    prefix: Optional[str] = None
-    suffix: Optional[str] = None
-    nested: Optional[List["TypeRef"]] = None
-    args: Optional[List["Parameter"]] = None
+    prefix: Optional[str]
+    suffix: Optional[str]
+    nested: Optional[List["TypeRef"]]
+    args: Optional[List["Parameter"]]
 
     def __init__(self, language: str, name: str = ""):
         super().__init__(language, name)
-        self.name = name
-        self.language = language
+        self.kind = None
+        self.prefix = None
+        self.suffix = None
+        self.nested = None
+        self.args = None
 
     def __str__(self) -> str:
         nested_str = ""
@@ -123,11 +211,17 @@ class Parameter:
         name:        Name used for the parameter.
         description: Explanation of the parameter.
     """
+    __slots__ = "type", "name", "description"
 
     # doxygen based fields
-    type: Optional[TypeRef] = None
-    name: str = ""
-    description: str = ""
+    type: Optional[TypeRef]
+    name: str
+    description: str
+
+    def __init__(self):
+        self.type = None
+        self.name = ""
+        self.description = ""
 
 
 class ReturnValue:
@@ -137,9 +231,14 @@ class ReturnValue:
         type:        Reference to the type of return value.
         description: Explanation of the return value.
     """
+    __slots__ = "type", "description"
+
+    type: Optional[TypeRef]
+    description: str
 
-    type: Optional[TypeRef] = None
-    description: str = ""
+    def __init__(self):
+        self.type = None
+        self.description = ""
 
 
 class ThrowsClause:
@@ -150,15 +249,17 @@ class ThrowsClause:
         description: Explanation of when the exception is thrown.
 
     """
+    __slots__ = "type", "description"
 
     type: TypeRef
-    description: str = ""
+    description: str
 
     def __init__(self, language: str):
         self.type = TypeRef(language)
+        self.description = ""
 
 
-class EnumValue(ReferableElement):
+class EnumValue(DescribedElement):
     """Single value in an enum type.
 
     Attributes:
@@ -166,17 +267,20 @@ class EnumValue(ReferableElement):
         brief:       Brief description of the enum value.
         description: Full description of the enum value.
     """
+    __slots__ = "initializer",
 
     # doxygen based fields
-    initializer: str = ""
-    brief: str = ""
-    description: str = ""
+    initializer: str
 
-    # custom fields
-    kind: str = "enumvalue"
+    def __init__(self, language: str):
+        super().__init__(language)
+        self.initializer = ""
 
+        # custom fields
+        self.kind = "enumvalue"
 
-class Member(ReferableElement):
+
+class Member(DescribedElement):
     """Member of a compound object.
 
     Representation of the doxygen type memberDef.
@@ -195,25 +299,32 @@ class Member(ReferableElement):
         include:     Name of the include (file) required to use this member.
         namespace:   Namespace, or scope, the member is contained in.
     """
+    __slots__ = ("definition", "args", "params", "exceptions", "prot", "returns", "enumvalues",
+                 "static", "include", "namespace")
 
-    definition: str = ""
-    args: str = ""
+    definition: str
+    args: str
     params: List[Parameter]
     exceptions: List[ThrowsClause]
-    brief: str = ""
-    description: str = ""
-    prot: str = ""
-    returns: Optional[ReturnValue] = None
+    prot: str
+    returns: Optional[ReturnValue]
     enumvalues: List[EnumValue]
-    static: bool = False
-    include: Optional[str] = None
-    namespace: Optional[str] = None
+    static: bool
+    include: Optional[str]
+    namespace: Optional[str]
 
     def __init__(self, language: str):
         super().__init__(language)
+        self.definition = ""
+        self.args = ""
         self.params = []
         self.exceptions = []
+        self.prot = ""
+        self.returns = None
         self.enumvalues = []
+        self.static = False
+        self.include = None
+        self.namespace = None
 
     def __str__(self):
         return f"Member [{super().__str__()}]"
@@ -227,14 +338,19 @@ class InnerTypeReference(TypeRefBase):
     Attributes:
         referred_object: Element being referenced.
     """
+    __slots__ = "referred_object",
+
+    referred_object: Optional["Compound"]
 
-    referred_object: Optional["Compound"] = None
+    def __init__(self, language: str, name: str = ""):
+        super().__init__(language, name)
+        self.referred_object = None
 
     def resolve(self, reference_target):
         self.referred_object = reference_target
 
 
-class Compound(ReferableElement):
+class Compound(DescribedElement):
     """Compound object. E.g. a class or enum.
 
     Representation of the doxygen type compound.
@@ -248,20 +364,21 @@ class Compound(ReferableElement):
         include:       Name of the include (file) required to use this compound.
         namespace:     Namespace, or package, the compound is contained in.
     """
+    __slots__ = "members", "inner_classes", "enumvalues", "include", "namespace"
 
     members: List[Member]
     inner_classes: List[InnerTypeReference]
-    brief: str = ""
-    description: str = ""
     enumvalues: List[EnumValue]
-    include: Optional[str] = None
-    namespace: Optional[str] = None
+    include: Optional[str]
+    namespace: Optional[str]
 
     def __init__(self, language: str):
         super().__init__(language)
         self.members = []
         self.inner_classes = []
         self.enumvalues = []
+        self.include = None
+        self.namespace = None
 
     def __str__(self):
         return f"Compound [{super().__str__()}]"
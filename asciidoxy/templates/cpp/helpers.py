@@ -17,26 +17,27 @@ from asciidoxy.generator.filters import InsertionFilter
 
 
 def public_static_methods(element, insert_filter: InsertionFilter):
-    return (m for m in insert_filter.members(element)
-            if (m.kind == "function" and m.returns and not m.name.startswith("operator")
-                and m.prot == "public" and m.static))
+    return (m for m in insert_filter.member_partition(element).select(("function", ), ("public", ),
+                                                                      static=True)
+            if m.returns and not m.name.startswith("operator"))
 
 
 def public_methods(element, insert_filter: InsertionFilter):
-    return (m for m in insert_filter.members(element)
-            if (m.kind == "function" and m.returns and not m.name.startswith("operator")
-                and m.prot == "public" and not m.static))
+    return (m for m in insert_filter.member_partition(element).select(("function", ), ("public", ),
+                                                                      static=False)
+            if m.returns and not m.name.startswith("operator"))
 
 
 def public_constructors(element, insert_filter: InsertionFilter):
     constructor_name = element.name
-    return (m for m in insert_filter.members(element)
-            if m.kind == "function" and m.name == constructor_name and m.prot == "public")
+    return (m for m in insert_filter.member_partition(element).select(("function", ), ("public", ))
+            if m.name == constructor_name)
 
 
 def public_simple_enclosed_types(element, insert_filter: InsertionFilter):
-    return (m for m in insert_filter.members(element)
-            if m.prot in ("public", "protected", None) and m.kind in ["enum", "typedef"])
+    return iter(
+        insert_filter.member_partition(element).select(("enum", "typedef"),
+                                                       ("public", "protected", None)))
 
 
 def public_complex_enclosed_types(element, insert_filter: InsertionFilter):
@@ -45,5 +46,4 @@ def public_complex_enclosed_types(element, insert_filter: InsertionFilter):
 
 
 def public_variables(element, insert_filter: InsertionFilter):
-    return (m for m in insert_filter.members(element)
-            if m.kind == "variable" and m.prot == "public")
+    return iter(insert_filter.member_partition(element).select(("variable", ), ("public", )))
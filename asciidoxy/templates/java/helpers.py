@@ -17,25 +17,25 @@ from asciidoxy.generator.filters import InsertionFilter
 
 
 def public_methods(element, insert_filter: InsertionFilter):
-    return (m for m in insert_filter.members(element)
-            if (m.kind == "function" and m.returns and m.prot == "public" and not m.static))
+    return (m for m in insert_filter.member_partition(element).select(("function", ), ("public", ),
+                                                                      static=False) if m.returns)
 
 
 def public_static_methods(element, insert_filter: InsertionFilter):
-    return (m for m in insert_filter.members(element)
-            if (m.kind == "function" and m.returns and m.prot == "public" and m.static))
+    return (m for m in insert_filter.member_partition(element).select(("function", ), ("public", ),
+                                                                      static=True) if m.returns)
 
 
 def public_constructors(element, insert_filter: InsertionFilter):
     constructor_name = element.name
-    return (m for m in insert_filter.members(element)
-            if m.kind == "function" and m.name == constructor_name and m.prot == "public")
+    return (m for m in insert_filter.member_partition(element).select(("function", ), ("public", ))
+            if m.name == constructor_name)
 
 
 def public_constants(element, insert_filter: InsertionFilter):
-    return (m for m in insert_filter.members(element)
-            if (m.kind == "variable" and m.prot == "public" and m.returns and m.returns.type
-                and m.returns.type.prefix and "final" in m.returns.type.prefix))
+    return (m for m in insert_filter.member_partition(element).select(("variable", ), ("public", ))
+            if (m.returns and m.returns.type and m.returns.type.prefix
+                and "final" in m.returns.type.prefix))
 
 
 def public_complex_enclosed_types(element, insert_filter: InsertionFilter):
@@ -46,5 +46,4 @@ def public_complex_enclosed_types(element, insert_filter: InsertionFilter):
 def enums(element, insert_filter: InsertionFilter):
     # enum types generated by SWIG contain other members that do not need to be documented.
     # We want to filter and document only enum fields.
-    return (m for m in insert_filter.members(element)
-            if (m.kind == "variable" and m.prot == "public"))
+    return iter(insert_filter.member_partition(element).select(("variable", ), ("public", )))
@@ -61,20 +61,19 @@ def objc_block_definition(block, context: Context):
 
 
 def public_methods(element, insert_filter: InsertionFilter):
-    return (m for m in insert_filter.members(element)
-            if (m.kind == "function" and m.prot == "public" and not m.static))
+    return iter(
+        insert_filter.member_partition(element).select(("function", ), ("public", ), static=False))
 
 
 def public_class_methods(element, insert_filter: InsertionFilter):
-    return (m for m in insert_filter.members(element)
-            if (m.kind == "function" and m.prot == "public" and m.static))
+    return iter(
+        insert_filter.member_partition(element).select(("function", ), ("public", ), static=True))
 
 
 def public_properties(element, insert_filter: InsertionFilter):
-    return (m for m in insert_filter.members(element)
-            if m.kind == "property" and m.prot == "public")
+    return iter(insert_filter.member_partition(element).select(("property", ), ("public", )))
 
 
 def public_simple_enclosed_types(element, insert_filter: InsertionFilter):
     # For some reason enclosed types are always set to private, so ignore visibility
-    return (m for m in insert_filter.members(element) if m.kind in ["enum", "class", "protocol"])
+    return iter(insert_filter.member_partition(element).select(("enum", "class", "protocol")))
@@ -32,18 +32,18 @@ def params(element):
 
 
 def public_static_methods(element, insert_filter: InsertionFilter):
-    return (m for m in insert_filter.members(element)
-            if (m.kind == "function" and m.returns and not m.name.startswith("_") and m.static))
+    return (m for m in insert_filter.member_partition(element).select(("function", ), static=True)
+            if m.returns and not m.name.startswith("_"))
 
 
 def public_methods(element, insert_filter: InsertionFilter):
-    return (m for m in insert_filter.members(element)
-            if (m.kind == "function" and m.returns and not m.name.startswith("_") and not m.static))
+    return (m for m in insert_filter.member_partition(element).select(("function", ), static=False)
+            if m.returns and not m.name.startswith("_"))
 
 
 def public_constructors(element, insert_filter: InsertionFilter):
-    return (m for m in insert_filter.members(element)
-            if m.kind == "function" and m.name == "__init__")
+    return (m for m in insert_filter.member_partition(element).select(("function", ))
+            if m.name == "__init__")
 
 
 def public_enclosed_types(element, insert_filter: InsertionFilter):
@@ -52,8 +52,8 @@ def public_enclosed_types(element, insert_filter: InsertionFilter):
 
 
 def public_variables(element, insert_filter: InsertionFilter):
-    return (m for m in insert_filter.members(element)
-            if m.kind == "variable" and not m.name.startswith("_"))
+    return (m for m in insert_filter.member_partition(element).select(("variable", ))
+            if not m.name.startswith("_"))
 
 
 def method_signature(element, context: Context, max_width: int = 80):
@@ -0,0 +1,84 @@
+# Copyright (C) 2019-2020, TomTom (http://tomtom.com).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark for parsing deeply nested types.
+
+Parses generated C++ types with increasing levels of nested templates from their tokens. The time
+per level of nesting should stay about the same for all depths.
+"""
+
+import argparse
+import time
+
+from asciidoxy.doxygenparser.cpp import CppTypeParser
+
+DEFAULT_DEPTHS = [4, 16, 64]
+
+
+def nested_type(depth: int) -> str:
+    """Generate the text of a C++ type with nested templates.
+
+    The type is a tuple of 4 nested function types, each with `depth` levels of nesting.
+
+    Args:
+        depth: Number of levels of nesting.
+
+    Returns:
+        Text of the type.
+    """
+    function = "std::function< " * depth + "int" + " >" * depth
+    return "const " + ", ".join([function] * 4).join(["std::tuple< ", " > &"])
+
+
+def run(text: str, number: int) -> float:
+    """Time parsing a type from its tokens.
+
+    Args:
+        text:   Text of the type to parse.
+        number: Number of times to parse the type.
+
+    Returns:
+        The total time for parsing the type `number` times, in seconds.
+    """
+    tokens = CppTypeParser.adapt_tokens(CppTypeParser.tokenize_text(text))
+    start = time.perf_counter()
+    for _ in range(number):
+        CppTypeParser.type_from_tokens(list(tokens))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("depths",
+                        metavar="DEPTH",
+                        type=int,
+                        nargs="*",
+                        default=DEFAULT_DEPTHS,
+                        help="Levels of nesting of the generated types.")
+    parser.add_argument("-n",
+                        "--number",
+                        type=int,
+                        default=200,
+                        help="Number of times to parse each type.")
+    args = parser.parse_args()
+
+    print(f"{'depth':>6} {'tokens':>7} {'total (s)':>10} {'per parse (ms)':>15}")
+    for depth in args.depths:
+        text = nested_type(depth)
+        tokens = len(CppTypeParser.tokenize_text(text))
+        duration = run(text, args.number)
+        print(f"{depth:>6} {tokens:>7} {duration:>10.3f} {duration / args.number * 1e3:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Copyright (C) 2019-2020, TomTom (http://tomtom.com).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark for resolving references to elements in other namespaces.
+
+Generates API reference sets of increasing size. Each element has one unresolved reference using
+a partial name, which is not found by an exact lookup and needs the partial name fallback. With
+the fallback using an index the time per reference stays about the same for all sizes.
+"""
+
+import argparse
+import logging
+import time
+
+from typing import List, Tuple
+
+from asciidoxy.doxygenparser import Driver
+from asciidoxy.model import Compound, TypeRef
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def generate(size: int) -> Tuple[Driver, List[TypeRef]]:
+    """Generate elements and unresolved partial name references to them.
+
+    Args:
+        size: Number of elements, and of references, to generate.
+
+    Returns:
+        A driver with all elements and references registered, and the references.
+    """
+    driver = Driver()
+    refs = []
+    for i in range(size):
+        element = Compound("cpp")
+        element.id = f"cpp-class{i}"
+        element.name = f"Class{i}"
+        element.full_name = f"ns{i % 100}::sub{i}::Class{i}"
+        element.kind = "class"
+        driver.register(element)
+
+        ref = TypeRef("cpp", f"sub{i}::Class{i}")
+        driver.unresolved_ref(ref)
+        refs.append(ref)
+    return driver, refs
+
+
+def run(size: int) -> float:
+    """Time resolving all references in a generated reference set.
+
+    Args:
+        size: Number of elements, and of references, to generate.
+
+    Returns:
+        The time it took to resolve all references, in seconds.
+    """
+    driver, refs = generate(size)
+    start = time.perf_counter()
+    driver.resolve_references()
+    duration = time.perf_counter() - start
+
+    assert all(ref.id == f"cpp-class{i}" for i, ref in enumerate(refs)), "Unresolved references"
+    return duration
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes",
+                        metavar="SIZE",
+                        type=int,
+                        nargs="*",
+                        default=DEFAULT_SIZES,
+                        help="Number of elements to generate. Defaults to 1k, 10k and 100k.")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    print(f"{'elements':>10} {'time (s)':>10} {'per ref (us)':>14}")
+    for size in args.sizes:
+        duration = run(size)
+        print(f"{size:>10} {duration:>10.3f} {duration / size * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Copyright (C) 2019-2020, TomTom (http://tomtom.com).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Microbenchmark for splitting type text into tokens.
+
+Tokenizes generated nested C++ types of increasing length. The time per character should stay
+about the same for all lengths.
+"""
+
+import argparse
+import timeit
+
+from asciidoxy.doxygenparser.cpp import CppTypeParser
+
+DEFAULT_DEPTHS = [2, 4, 8, 16, 32]
+
+
+def nested_type(depth: int) -> str:
+    """Generate the text of a C++ type with nested templates and function arguments.
+
+    Args:
+        depth: Number of levels of nesting.
+
+    Returns:
+        Text of the type.
+    """
+    text = "Value"
+    for i in range(depth):
+        if i % 2:
+            text = f"std::map< std::string, {text} >"
+        else:
+            text = f"std::function< void(const {text}&, int) >"
+    return text
+
+
+def run(text: str, number: int) -> float:
+    """Time tokenizing a type.
+
+    Args:
+        text:   Text of the type to tokenize.
+        number: Number of times to tokenize the type in each measurement.
+
+    Returns:
+        The best time per tokenization, in seconds.
+    """
+    timer = timeit.Timer(lambda: CppTypeParser.tokenize_text(text))
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("depths",
+                        metavar="DEPTH",
+                        type=int,
+                        nargs="*",
+                        default=DEFAULT_DEPTHS,
+                        help="Levels of nesting of the generated types.")
+    parser.add_argument("-n",
+                        "--number",
+                        type=int,
+                        default=1000,
+                        help="Number of times to tokenize each type per measurement.")
+    args = parser.parse_args()
+
+    print(f"{'depth':>6} {'chars':>6} {'tokens':>7} {'time (us)':>10} {'per char (ns)':>14}")
+    for depth in args.depths:
+        text = nested_type(depth)
+        tokens = len(CppTypeParser.tokenize_text(text))
+        duration = run(text, args.number)
+        print(f"{depth:>6} {len(text):>6} {tokens:>7} {duration * 1e6:>10.1f}"
+              f" {duration / len(text) * 1e9:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
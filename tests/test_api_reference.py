@@ -15,8 +15,10 @@
 
 import pytest
 
-from asciidoxy.api_reference import AmbiguousLookupError, NameFilter, ParameterTypeMatcher
+from asciidoxy.api_reference import (AmbiguousLookupError, ApiReference, ElementLoader, NameFilter,
+                                     ParameterTypeMatcher)
 from asciidoxy.doxygenparser import Driver as ParserDriver
+from asciidoxy.model import Compound, Member, Parameter, TypeRef
 
 
 def test_function_matcher__parse__no_arguments():
@@ -421,3 +423,207 @@ def test_find_method__select_based_on_args_2(api_reference):
 
     element = api_reference.find("asciidoxy::geometry::Coordinate::Update(double, double, double)")
     assert element is not None
+
+
+def _element(name, full_name, id_=None):
+    element = Compound("cpp")
+    element.id = id_ or full_name
+    element.name = name
+    element.full_name = full_name
+    return element
+
+
+def test_find_by_suffix():
+    api_reference = ApiReference()
+    coordinate = _element("Coordinate", "asciidoxy::geometry::Coordinate")
+    other_coordinate = _element("Coordinate", "other::Coordinate")
+    global_coordinate = _element("Coordinate", "Coordinate")
+    for element in (coordinate, other_coordinate, global_coordinate):
+        api_reference.append(element)
+
+    assert api_reference.find_by_suffix("Coordinate") == [coordinate, other_coordinate]
+    assert api_reference.find_by_suffix("geometry::Coordinate") == [coordinate]
+    assert api_reference.find_by_suffix("asciidoxy::geometry::Coordinate") == []
+    assert api_reference.find_by_suffix("ometry::Coordinate") == []
+    assert api_reference.find_by_suffix("Position") == []
+
+
+def test_find_by_suffix__same_as_full_name_endswith():
+    api_reference = ApiReference()
+    for i, full_name in enumerate(("a::b::c", "a:::c", "b::c", "x<a::c>", "c", "a::c::c")):
+        api_reference.append(_element(full_name.rsplit("::", 1)[-1], full_name, str(i)))
+
+    for name in ("c", ":c", "b::c", "c::c", "c>", "a::b::c", "x"):
+        expected = [e for e in api_reference.elements if e.full_name.endswith(f"::{name}")]
+        assert api_reference.find_by_suffix(name) == expected
+
+
+def test_find_by_name__namespace_paths_in_original_order():
+    api_reference = ApiReference()
+    elements = [
+        _element("create", "a::b::Builder::create"),
+        _element("create", "Builder::create"),
+        _element("create", "a::Builder::create"),
+        _element("create", "c::Builder::create"),
+    ]
+    for element in elements:
+        api_reference.append(element)
+
+    assert api_reference._find_by_name("Builder::create", "create", "a::b") == elements[:3]
+    assert api_reference.find("Builder::create", namespace="a::b") is elements[0]
+    assert api_reference.find("Builder::create", namespace="a::b::x") is elements[1]
+    assert api_reference.find("Builder::create", namespace="c") is elements[3]
+    assert api_reference.find("b::Builder::create", namespace="a") is elements[0]
+    assert api_reference.find("Builder::create", namespace="d") is elements[1]
+    assert api_reference.find("create", namespace="d") is None
+
+
+def test_find_by_name__same_as_name_filter():
+    api_reference = ApiReference()
+    full_names = ("a::b::c", "a:: b ::c", "b::c", "a.b.c", "c", "a::c::c", "x::a::b::c", "a::b::c ")
+    for i, full_name in enumerate(full_names):
+        api_reference.append(_element("c", full_name, str(i)))
+
+    for name in ("c", "b::c", "a::b::c", "b.c", "c::c", "x::c"):
+        for namespace in ("a", "a::b", "a.b", "x::a", "a::b::c", ""):
+            for exact_namespace in (False, True):
+                name_filter = NameFilter(name, namespace, exact_namespace)
+                expected = [e for e in api_reference.elements if name_filter(e)]
+                assert api_reference._find_by_name(name, "c", namespace,
+                                                   exact_namespace) == expected
+
+        name_filter = NameFilter(name)
+        expected = [e for e in api_reference.elements if name_filter(e)]
+        assert api_reference._find_by_name(name, "c") == expected
+
+
+def test_find__cached_until_append():
+    api_reference = ApiReference()
+    coordinate = _element("Coordinate", "asciidoxy::geometry::Coordinate")
+    api_reference.append(coordinate)
+
+    assert api_reference.find("Coordinate", namespace="asciidoxy::geometry") is coordinate
+    assert api_reference.cache_hits == 0
+    assert api_reference.cache_misses == 1
+
+    assert api_reference.find("Coordinate", namespace="asciidoxy::geometry") is coordinate
+    assert api_reference.find("Coordinate", namespace="asciidoxy::geometry", kind="class") is None
+    assert api_reference.find("geometry::Coordinate") is None
+    assert api_reference.cache_hits == 1
+    assert api_reference.cache_misses == 3
+
+    other_coordinate = _element("Coordinate", "geometry::Coordinate")
+    api_reference.append(other_coordinate)
+    assert api_reference.find("geometry::Coordinate") is other_coordinate
+    assert api_reference.cache_hits == 1
+    assert api_reference.cache_misses == 4
+
+
+def test_find__cached_ambiguous_lookup():
+    api_reference = ApiReference()
+    coordinates = [
+        _element("Coordinate", "asciidoxy::geometry::Coordinate", id_) for id_ in ("a", "b")
+    ]
+    for element in coordinates:
+        api_reference.append(element)
+
+    for _ in range(2):
+        with pytest.raises(AmbiguousLookupError) as exception_info:
+            api_reference.find("Coordinate", namespace="asciidoxy::geometry")
+        assert exception_info.value.candidates == coordinates
+    assert api_reference.cache_hits == 1
+    assert api_reference.cache_misses == 1
+
+
+def test_find__cached_by_id():
+    api_reference = ApiReference()
+    coordinate = _element("Coordinate", "asciidoxy::geometry::Coordinate", "cpp-coordinate")
+    api_reference.append(coordinate)
+
+    assert api_reference.find(target_id="cpp-coordinate") is coordinate
+    assert api_reference.find(target_id="cpp-coordinate") is coordinate
+    assert api_reference.find(target_id="cpp-other") is None
+    assert api_reference.cache_hits == 1
+    assert api_reference.cache_misses == 2
+
+
+class _LoaderMock(ElementLoader):
+    def __init__(self, api_reference, elements_by_name):
+        self.api_reference = api_reference
+        self.elements_by_name = elements_by_name
+        self.loaded_names = []
+
+    def load_name(self, name):
+        self.loaded_names.append(name)
+        for element in self.elements_by_name.pop(name, []):
+            self.api_reference.append(element)
+
+    def load_id(self, target_id):
+        pass
+
+
+def test_find__cached_with_loader():
+    api_reference = ApiReference()
+    coordinate = _element("Coordinate", "asciidoxy::geometry::Coordinate", "a")
+    other_coordinate = _element("Coordinate", "asciidoxy::geometry::Coordinate", "b")
+    loader = _LoaderMock(api_reference, {"Coordinate": [coordinate]})
+    api_reference.loader = loader
+
+    assert api_reference.find("Coordinate", namespace="asciidoxy::geometry") is coordinate
+    assert api_reference.find("Coordinate", namespace="asciidoxy::geometry") is coordinate
+    assert loader.loaded_names == ["Coordinate", "Coordinate"]
+    assert api_reference.cache_hits == 1
+
+    # Elements loaded for a cached lookup invalidate the cached result
+    loader.elements_by_name["Coordinate"] = [other_coordinate]
+    with pytest.raises(AmbiguousLookupError):
+        api_reference.find("Coordinate", namespace="asciidoxy::geometry")
+    assert api_reference.cache_hits == 1
+
+
+def _method(full_name, *param_types, id_=None):
+    element = Member("cpp")
+    element.id = id_ or f"{full_name}({', '.join(param_types)})"
+    element.name = full_name.rsplit("::", 1)[-1]
+    element.full_name = full_name
+    element.kind = "function"
+    for param_type in param_types:
+        param = Parameter()
+        param.type = TypeRef("cpp", param_type)
+        element.params.append(param)
+    return element
+
+
+def test_function_matcher__signature():
+    assert ParameterTypeMatcher.signature(_method("Type::method")) == ()
+    assert (ParameterTypeMatcher.signature(_method("Type::method", "const std::string &",
+                                                   "int")) == ("const std::string&", "int"))
+    assert ParameterTypeMatcher.signature(_element("Type", "Type")) is None
+
+    method = _method("Type::method", "int")
+    method.params.append(Parameter())
+    assert ParameterTypeMatcher.signature(method) is None
+
+
+def test_find_method__signature_index():
+    api_reference = ApiReference()
+    no_args = _method("asciidoxy::Type::method")
+    int_arg = _method("asciidoxy::Type::method", "int")
+    string_arg = _method("asciidoxy::Type::method", "const std::string &")
+    other_int_arg = _method("other::Type::method", "int")
+    untyped_arg = _method("asciidoxy::Type::method", "int")
+    untyped_arg.params[0].type = None
+    for element in (no_args, int_arg, string_arg, other_int_arg, untyped_arg):
+        api_reference.append(element)
+
+    assert api_reference.find("asciidoxy::Type::method()") is no_args
+    assert api_reference.find("asciidoxy::Type::method(int)") is int_arg
+    assert api_reference.find("asciidoxy::Type::method(const std::string&)") is string_arg
+    assert api_reference.find("Type::method( const  std::string & )",
+                              namespace="asciidoxy") is string_arg
+    assert api_reference.find("method(int)", namespace="other::Type") is other_int_arg
+    assert api_reference.find("asciidoxy::Type::method(double)") is None
+
+    with pytest.raises(AmbiguousLookupError) as exception_info:
+        api_reference.find("asciidoxy::Type::method")
+    assert exception_info.value.candidates == [no_args, int_arg, string_arg, untyped_arg]
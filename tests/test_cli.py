@@ -12,8 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
+import os
 import pytest
 import shutil
+import subprocess
 
 from unittest.mock import patch
 
@@ -147,6 +150,7 @@ def test_all_options(asciidoctor_mock, build_dir, spec_file, version_file, desti
         "--debug",
         "--log",
         "WARNING",
+        "--no-cache",
     ])
 
     output_file = destination_dir / "simple_test.input.html"
@@ -213,3 +217,272 @@ def test_no_reference_loaded(asciidoctor_mock, build_dir, destination_dir, adoc_
     asciidoctor_mock.assert_called_once_with(destination_dir, output_file, processed_file, False,
                                              "html5", [])
     assert processed_file.is_file()
+
+
+def test_parallel_jobs(asciidoctor_mock, build_dir, spec_file, destination_dir, adoc_data):
+    in_file = adoc_data / "simple_test.input.adoc"
+
+    main([
+        str(in_file), "--spec-file",
+        str(spec_file), "--destination-dir",
+        str(destination_dir), "--build-dir",
+        str(build_dir), "--jobs", "2"
+    ])
+
+    output_file = destination_dir / "simple_test.input.html"
+    processed_file = build_dir / "intermediate" / ".asciidoxy.simple_test.input.adoc"
+    asciidoctor_mock.assert_called_once_with(destination_dir, output_file, processed_file, False,
+                                             "html5", [])
+    assert processed_file.is_file()
+
+
+def test_load_on_demand(asciidoctor_mock, build_dir, spec_file, destination_dir, adoc_data):
+    in_file = adoc_data / "simple_test.input.adoc"
+
+    main([
+        str(in_file), "--spec-file",
+        str(spec_file), "--destination-dir",
+        str(destination_dir), "--build-dir",
+        str(build_dir), "--load-on-demand"
+    ])
+
+    output_file = destination_dir / "simple_test.input.html"
+    processed_file = build_dir / "intermediate" / ".asciidoxy.simple_test.input.adoc"
+    asciidoctor_mock.assert_called_once_with(destination_dir, output_file, processed_file, False,
+                                             "html5", [])
+    assert processed_file.is_file()
+
+
+def test_lightweight_preprocessing(asciidoctor_mock, build_dir, spec_file, destination_dir,
+                                   adoc_data):
+    in_file = adoc_data / "simple_test.input.adoc"
+
+    main([
+        str(in_file), "--spec-file",
+        str(spec_file), "--destination-dir",
+        str(destination_dir), "--build-dir",
+        str(build_dir), "--multipage", "--lightweight-preprocessing"
+    ])
+
+    output_file = destination_dir / "simple_test.input.html"
+    processed_file = build_dir / "intermediate" / ".asciidoxy.simple_test.input.adoc"
+    asciidoctor_mock.assert_called_once_with(destination_dir, output_file, processed_file, True,
+                                             "html5", [])
+    assert processed_file.is_file()
+
+
+def test_template_cache(asciidoctor_mock, build_dir, destination_dir, adoc_data):
+    in_file = adoc_data / "no_api_reference.input.adoc"
+    args = [str(in_file), "--destination-dir", str(destination_dir), "--build-dir", str(build_dir)]
+
+    main(args + ["--no-cache"])
+    assert not (build_dir / "cache" / "templates").exists()
+
+    main(args)
+    assert list((build_dir / "cache" / "templates").glob("*.py"))
+
+
+def test_unchanged_files_not_written_again(asciidoctor_mock, build_dir, destination_dir, adoc_data):
+    in_file = adoc_data / "no_api_reference.input.adoc"
+    args = [str(in_file), "--destination-dir", str(destination_dir), "--build-dir", str(build_dir)]
+
+    main(args)
+    processed_file = build_dir / "intermediate" / ".asciidoxy.no_api_reference.input.adoc"
+    stale_file = build_dir / "intermediate" / "removed.adoc"
+    stale_file.write_text("Removed from the input directory", encoding="utf-8")
+    mtime = processed_file.stat().st_mtime_ns
+
+    main(args)
+    assert processed_file.stat().st_mtime_ns == mtime
+    assert not stale_file.exists()
+    assert (build_dir / "intermediate" / in_file.name).is_file()
+
+
+def test_incremental(asciidoctor_mock, build_dir, spec_file, destination_dir, adoc_data):
+    def create_output(destination_dir, out_file, *args):
+        out_file.parent.mkdir(parents=True, exist_ok=True)
+        out_file.touch()
+
+    asciidoctor_mock.side_effect = create_output
+    in_file = adoc_data / "simple_test.input.adoc"
+    args = [
+        str(in_file), "--spec-file",
+        str(spec_file), "--destination-dir",
+        str(destination_dir), "--build-dir",
+        str(build_dir), "--multipage", "--incremental"
+    ]
+
+    main(args)
+    asciidoctor_mock.assert_called_once()
+    assert (build_dir / "cache" / "dependencies.json").is_file()
+
+    asciidoctor_mock.reset_mock()
+    main(args)
+    asciidoctor_mock.assert_not_called()
+
+    (destination_dir / "simple_test.input.html").unlink()
+    main(args)
+    asciidoctor_mock.assert_called_once()
+
+
+@pytest.mark.parametrize("api_option", [["--force-language", "cpp"], ["--load-on-demand"]])
+def test_incremental__api_options(asciidoctor_mock, build_dir, spec_file, destination_dir,
+                                  adoc_data, tmp_path, caplog, api_option):
+    caplog.set_level(logging.INFO)
+    in_file = tmp_path / "input" / "simple_test.input.adoc"
+    in_file.parent.mkdir()
+    shutil.copy(adoc_data / "simple_test.input.adoc", in_file)
+    args = [
+        str(in_file), "--spec-file",
+        str(spec_file), "--destination-dir",
+        str(destination_dir), "--build-dir",
+        str(build_dir), "--incremental"
+    ]
+    main(args)
+
+    caplog.clear()
+    main(args + api_option)
+    assert "Documents: 1 generated, 0 reused." in caplog.text
+
+    caplog.clear()
+    main(args + api_option)
+    assert "Documents: 0 generated, 1 reused." in caplog.text
+
+
+@pytest.fixture
+def multipage_input(tmp_path):
+    input_dir = tmp_path / "multipage"
+    input_dir.mkdir()
+    (input_dir / "index.adoc").write_text(
+        "= Index\n${api.include('a.adoc')}\n${api.include('b.adoc')}\n", encoding="utf-8")
+    (input_dir / "a.adoc").write_text("= A\n", encoding="utf-8")
+    (input_dir / "b.adoc").write_text("= B\n", encoding="utf-8")
+    return input_dir / "index.adoc"
+
+
+def _fail_for(name):
+    def asciidoctor(destination_dir, out_file, processed_file, *args):
+        if processed_file.name == name:
+            raise subprocess.CalledProcessError(1, "asciidoctor")
+
+    return asciidoctor
+
+
+def test_parallel_asciidoctor(asciidoctor_mock, build_dir, destination_dir, multipage_input):
+    main([
+        str(multipage_input), "--destination-dir",
+        str(destination_dir), "--build-dir",
+        str(build_dir), "--multipage", "--jobs", "2"
+    ])
+
+    out_files = {call[0][1] for call in asciidoctor_mock.call_args_list}
+    assert out_files == {destination_dir / name for name in ("index.html", "a.html", "b.html")}
+
+
+def test_asciidoctor_failure(asciidoctor_mock, build_dir, destination_dir, multipage_input):
+    asciidoctor_mock.side_effect = _fail_for(".asciidoxy.a.adoc")
+
+    with pytest.raises(SystemExit) as exit_info:
+        main([
+            str(multipage_input), "--destination-dir",
+            str(destination_dir), "--build-dir",
+            str(build_dir), "--multipage"
+        ])
+    assert exit_info.value.code == 1
+    assert asciidoctor_mock.call_count == 3
+
+
+def test_asciidoctor_failure__warnings_are_errors(asciidoctor_mock, build_dir, destination_dir,
+                                                  multipage_input):
+    asciidoctor_mock.side_effect = _fail_for(".asciidoxy.a.adoc")
+
+    with pytest.raises(SystemExit) as exit_info:
+        main([
+            str(multipage_input), "--destination-dir",
+            str(destination_dir), "--build-dir",
+            str(build_dir), "--multipage", "-W"
+        ])
+    assert exit_info.value.code == 1
+    converted = [call[0][2].name for call in asciidoctor_mock.call_args_list]
+    assert converted == [".asciidoxy.index.adoc", ".asciidoxy.a.adoc"]
+
+
+_ASCIIDOCTOR_STUB = """#!/bin/sh
+echo "$@" >> "$(dirname "$0")/calls.txt"
+while [ $# -gt 0 ]; do
+    case "$1" in
+        -D) out_dir="$2"; shift 2;;
+        -o) out_file="$2"; shift 2;;
+        -b|-a) shift 2;;
+        *.adoc) files="$files $1"; shift;;
+        *) shift;;
+    esac
+done
+for f in $files; do
+    if [ -n "$FAIL_FOR" ] && [ "$(basename "$f")" = "$FAIL_FOR" ]; then
+        exit 1
+    fi
+    echo "$(basename "$f")" > "${out_file:-$out_dir/$(basename "$f" .adoc).html}"
+done
+"""
+
+
+@pytest.fixture
+def asciidoctor_stub(tmp_path, monkeypatch):
+    stub_dir = tmp_path / "bin"
+    stub_dir.mkdir()
+    stub = stub_dir / "asciidoctor"
+    stub.write_text(_ASCIIDOCTOR_STUB, encoding="utf-8")
+    stub.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{stub_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.delenv("FAIL_FOR", raising=False)
+    return stub_dir / "calls.txt"
+
+
+def _output_files(destination_dir):
+    return {f.name: f.read_text(encoding="utf-8").strip() for f in destination_dir.iterdir()}
+
+
+def test_batched_asciidoctor(asciidoctor_stub, build_dir, destination_dir, multipage_input):
+    main([
+        str(multipage_input), "--destination-dir",
+        str(destination_dir), "--build-dir",
+        str(build_dir), "--multipage", "--asciidoctor-batch-size", "3"
+    ])
+
+    assert len(asciidoctor_stub.read_text(encoding="utf-8").splitlines()) == 1
+    assert _output_files(destination_dir) == {
+        "index.html": ".asciidoxy.index.adoc",
+        "a.html": ".asciidoxy.a.adoc",
+        "b.html": ".asciidoxy.b.adoc",
+    }
+
+
+def test_batched_asciidoctor__split_over_jobs(asciidoctor_stub, build_dir, destination_dir,
+                                              multipage_input):
+    main([
+        str(multipage_input), "--destination-dir",
+        str(destination_dir), "--build-dir",
+        str(build_dir), "--multipage", "--asciidoctor-batch-size", "10", "--jobs", "2"
+    ])
+
+    assert len(asciidoctor_stub.read_text(encoding="utf-8").splitlines()) == 2
+    assert set(_output_files(destination_dir)) == {"index.html", "a.html", "b.html"}
+
+
+def test_batched_asciidoctor__failure(asciidoctor_stub, build_dir, destination_dir, multipage_input,
+                                      monkeypatch):
+    monkeypatch.setenv("FAIL_FOR", ".asciidoxy.a.adoc")
+
+    with pytest.raises(SystemExit) as exit_info:
+        main([
+            str(multipage_input), "--destination-dir",
+            str(destination_dir), "--build-dir",
+            str(build_dir), "--multipage", "--asciidoctor-batch-size", "3"
+        ])
+    assert exit_info.value.code == 1
+    # The failed batch is converted again one document at a time
+    assert len(asciidoctor_stub.read_text(encoding="utf-8").splitlines()) == 4
+    # Output written by the failed batch before it stopped is removed
+    assert not (destination_dir / ".asciidoxy.index.html").exists()
+    assert set(_output_files(destination_dir)) == {"index.html", "b.html"}
@@ -13,6 +13,14 @@
 # limitations under the License.
 """Generic tests for parsing Doxygen XML files."""
 
+import json
+
+import pytest
+
+from asciidoxy.api_reference import AmbiguousLookupError
+from asciidoxy.doxygenparser import Driver
+from asciidoxy.model import json_repr
+
 from .shared import ProgressMock
 
 
@@ -246,7 +254,7 @@ def test_resolve_references__report_progress(parser_driver_factory):
     parser.resolve_references(progress=progress_mock)
 
     assert progress_mock.ready == progress_mock.total
-    assert progress_mock.total == 40
+    assert progress_mock.total == 38
 
 
 def test_force_language_java(parser_driver_factory):
@@ -283,3 +291,161 @@ def test_force_language_empty(parser_driver_factory):
                                         lang="cpp")
     assert element is not None
     assert element.language == "cpp"
+
+
+def _xml_files(xml_data, *test_dirs):
+    return [
+        xml_file for test_dir in test_dirs for xml_file in (xml_data / test_dir).glob("**/*.xml")
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2, 3])
+def test_parse_all__same_result_as_parsing_one_by_one(xml_data, jobs):
+    xml_files = _xml_files(xml_data, "cpp/default", "cpp/consumer", "java/default")
+
+    serial_driver = Driver()
+    for xml_file in xml_files:
+        serial_driver.parse(xml_file)
+    serial_driver.resolve_references()
+
+    parallel_driver = Driver()
+    parallel_driver.parse_all(xml_files, jobs=jobs)
+    parallel_driver.resolve_references()
+
+    serial_json = json.dumps(serial_driver.api_reference.elements, default=json_repr)
+    parallel_json = json.dumps(parallel_driver.api_reference.elements, default=json_repr)
+    assert parallel_json == serial_json
+    assert len(parallel_driver._unresolved_refs) == len(serial_driver._unresolved_refs)
+
+
+def test_parse_all__force_language(xml_data):
+    driver = Driver(force_language="java")
+    driver.parse_all(_xml_files(xml_data, "cpp/default"), jobs=2)
+
+    element = driver.api_reference.find("asciidoxy.traffic.TrafficEvent", kind="class", lang="java")
+    assert element is not None
+    assert element.language == "java"
+
+
+def test_parse_all__report_progress(xml_data):
+    xml_files = _xml_files(xml_data, "cpp/default")
+    driver = Driver()
+
+    progress_mock = ProgressMock()
+    driver.parse_all(xml_files, jobs=2, progress=progress_mock)
+
+    assert progress_mock.ready == progress_mock.total
+    assert progress_mock.total == len(xml_files)
+
+
+def test_parse__not_a_doxygen_file(tmp_path):
+    xml_file = tmp_path / "other.xml"
+    xml_file.write_text("<other><compounddef language='C++' id='a'/></other>")
+
+    driver = Driver()
+    assert driver.parse(xml_file) is False
+    assert len(driver.api_reference.elements) == 0
+
+
+def test_parse__file_object(xml_data):
+    driver = Driver()
+    with (xml_data / "cpp" / "default" / "xml" /
+          "classasciidoxy_1_1geometry_1_1_coordinate.xml").open("rb") as f:
+        assert driver.parse(f) is True
+
+    assert driver.api_reference.find("asciidoxy::geometry::Coordinate", kind="class") is not None
+
+
+def _eager_and_on_demand_drivers(xml_data, *test_dirs, force_language=None):
+    eager_driver = Driver(force_language=force_language)
+    for xml_file in _xml_files(xml_data, *test_dirs):
+        eager_driver.parse(xml_file)
+    eager_driver.resolve_references()
+
+    on_demand_driver = Driver(force_language=force_language)
+    for test_dir in test_dirs:
+        assert on_demand_driver.parse_index(xml_data / test_dir / "xml") is True
+    on_demand_driver.resolve_references()
+
+    return eager_driver, on_demand_driver
+
+
+def _find_as_json(api_reference, *args, **kwargs):
+    try:
+        return json.dumps(api_reference.find(*args, **kwargs), default=json_repr)
+    except AmbiguousLookupError as e:
+        return json.dumps(e.candidates, default=json_repr)
+
+
+@pytest.mark.parametrize("test_dirs", [("cpp/default", "cpp/consumer"), ("java/default", ),
+                                       ("objc/default", ), ("python/default", )])
+def test_parse_index__same_result_as_parsing_all(xml_data, test_dirs):
+    eager_driver, on_demand_driver = _eager_and_on_demand_drivers(xml_data, *test_dirs)
+
+    for element in eager_driver.api_reference.elements:
+        assert (_find_as_json(on_demand_driver.api_reference,
+                              target_id=element.id) == _find_as_json(eager_driver.api_reference,
+                                                                     target_id=element.id))
+
+    for element in eager_driver.api_reference.elements:
+        assert (_find_as_json(on_demand_driver.api_reference,
+                              element.full_name,
+                              kind=element.kind,
+                              lang=element.language) == _find_as_json(eager_driver.api_reference,
+                                                                      element.full_name,
+                                                                      kind=element.kind,
+                                                                      lang=element.language))
+
+    assert (len(on_demand_driver.api_reference.elements) == len(
+        eager_driver.api_reference.elements))
+
+
+def test_parse_index__force_language(xml_data):
+    _, driver = _eager_and_on_demand_drivers(xml_data, "cpp/default", force_language="java")
+
+    element = driver.api_reference.find("asciidoxy.traffic.TrafficEvent", kind="class", lang="java")
+    assert element is not None
+    assert element.language == "java"
+
+
+def test_parse_index__only_load_requested_elements(xml_data):
+    driver = Driver()
+    assert driver.parse_index(xml_data / "cpp" / "default" / "xml") is True
+    assert len(driver.api_reference.elements) == 0
+
+    element = driver.api_reference.find("asciidoxy::geometry::Coordinate", kind="class")
+    assert element is not None
+    assert driver.api_reference.find(target_id=element.id) is element
+
+    loaded_ids = {e.id for e in driver.api_reference.elements}
+    assert "cpp-classasciidoxy_1_1geometry_1_1_coordinate" in loaded_ids
+    assert "cpp-classasciidoxy_1_1traffic_1_1_traffic_event" not in loaded_ids
+
+
+def test_parse_index__resolve_references_of_loaded_elements(xml_data):
+    driver = Driver()
+    assert driver.parse_index(xml_data / "cpp" / "default" / "xml") is True
+    assert driver.parse_index(xml_data / "cpp" / "consumer" / "xml") is True
+
+    member = driver.api_reference.find("asciidoxy::positioning::Positioning::CurrentPosition",
+                                       kind="function",
+                                       lang="cpp")
+    assert member is not None
+    assert member.returns
+    assert member.returns.type
+    assert member.returns.type.id == "cpp-classasciidoxy_1_1geometry_1_1_coordinate"
+    assert member.returns.type.kind == "class"
+
+
+def test_parse_index__no_index(tmp_path):
+    driver = Driver()
+    assert driver.parse_index(tmp_path) is False
+    assert driver.api_reference.loader is None
+
+
+def test_parse_index__not_a_doxygen_index(tmp_path):
+    (tmp_path / "index.xml").write_text("<other><compound refid='a'/></other>")
+
+    driver = Driver()
+    assert driver.parse_index(tmp_path) is False
+    assert driver.api_reference.loader is None
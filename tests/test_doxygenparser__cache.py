@@ -0,0 +1,133 @@
+# Copyright (C) 2019-2020, TomTom (http://tomtom.com).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for caching parse results of Doxygen XML files."""
+
+import json
+
+import pytest
+
+from asciidoxy.doxygenparser import Driver, cache
+from asciidoxy.doxygenparser.cache import CacheEntry, ParseCache
+from asciidoxy.model import json_repr
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return tmp_path / "cache"
+
+
+@pytest.fixture
+def xml_files(xml_data):
+    return list((xml_data / "cpp" / "default").glob("**/*.xml"))
+
+
+def _parse(xml_files, **kwargs):
+    driver = Driver(**kwargs)
+    for xml_file in xml_files:
+        driver.parse(xml_file)
+    driver.resolve_references()
+    return driver
+
+
+def _as_json(driver):
+    return json.dumps(driver.api_reference.elements, default=json_repr)
+
+
+def test_key__depends_on_content_and_language(cache_dir):
+    assert ParseCache(cache_dir).key(b"a") == ParseCache(cache_dir).key(b"a")
+    assert ParseCache(cache_dir).key(b"a") != ParseCache(cache_dir).key(b"b")
+    assert ParseCache(cache_dir).key(b"a") != ParseCache(cache_dir, "java").key(b"a")
+
+
+def test_key__depends_on_cache_format(cache_dir, monkeypatch):
+    key = ParseCache(cache_dir).key(b"a")
+    monkeypatch.setattr(cache, "CACHE_FORMAT", cache.CACHE_FORMAT + 1)
+    assert ParseCache(cache_dir).key(b"a") != key
+
+
+def test_key__depends_on_python_version(cache_dir, monkeypatch):
+    key = ParseCache(cache_dir).key(b"a")
+    monkeypatch.setattr(cache.sys, "version_info", (2, 7, 18, "final", 0))
+    assert ParseCache(cache_dir).key(b"a") != key
+
+
+def test_load__missing_entry(cache_dir):
+    cache = ParseCache(cache_dir)
+    assert cache.load(cache.key(b"a")) is None
+    assert cache.misses == 1
+    assert cache.hits == 0
+
+
+def test_load__unreadable_entry(cache_dir):
+    cache = ParseCache(cache_dir)
+    key = cache.key(b"a")
+    (cache_dir / f"{key}.pickle").write_bytes(b"garbage")
+    assert cache.load(key) is None
+    assert cache.misses == 1
+
+
+def test_store_and_load(cache_dir):
+    cache = ParseCache(cache_dir)
+    key = cache.key(b"a")
+    cache.store(key, CacheEntry(True, [], []))
+    assert cache.load(key) == CacheEntry(True, [], [])
+    assert cache.hits == 1
+
+
+def test_parse__cold_and_warm_cache_same_result_as_without_cache(xml_files, cache_dir):
+    expected = _as_json(_parse(xml_files))
+
+    cold = _parse(xml_files, cache_dir=cache_dir)
+    assert cold._cache.hits == 0
+    assert cold._cache.misses == len(xml_files)
+    assert _as_json(cold) == expected
+
+    warm = _parse(xml_files, cache_dir=cache_dir)
+    assert warm._cache.hits == len(xml_files)
+    assert warm._cache.misses == 0
+    assert _as_json(warm) == expected
+    assert len(warm._unresolved_refs) == len(cold._unresolved_refs)
+
+
+def test_parse__changed_file_is_parsed_again(xml_data, tmp_path, cache_dir):
+    xml_file = tmp_path / "class.xml"
+    xml_file.write_bytes((xml_data / "cpp" / "default" / "xml" /
+                          "classasciidoxy_1_1geometry_1_1_coordinate.xml").read_bytes())
+
+    _parse([xml_file], cache_dir=cache_dir)
+
+    xml_file.write_text(xml_file.read_text().replace("Coordinate", "Position"))
+    driver = _parse([xml_file], cache_dir=cache_dir)
+    assert driver._cache.misses == 1
+    assert driver.api_reference.find("asciidoxy::geometry::Position") is not None
+
+
+def test_parse__forced_language_is_not_mixed(xml_files, cache_dir):
+    _parse(xml_files, cache_dir=cache_dir)
+    driver = _parse(xml_files, cache_dir=cache_dir, force_language="java")
+    assert driver._cache.hits == 0
+
+    element = driver.api_reference.find("asciidoxy.traffic.TrafficEvent", kind="class", lang="java")
+    assert element is not None
+
+
+def test_parse_all__uses_cache(xml_files, cache_dir):
+    expected = _as_json(_parse(xml_files))
+
+    _parse(xml_files, cache_dir=cache_dir)
+
+    driver = Driver(cache_dir=cache_dir)
+    driver.parse_all(xml_files, jobs=2)
+    driver.resolve_references()
+    assert _as_json(driver) == expected
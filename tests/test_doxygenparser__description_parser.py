@@ -20,7 +20,7 @@ import re
 
 import xml.etree.ElementTree as ET
 
-from asciidoxy.doxygenparser.description_parser import DescriptionParser
+from asciidoxy.doxygenparser.description_parser import DescriptionParser, XmlDescriptionSource
 from tests.shared import sub_element
 
 
@@ -359,3 +359,124 @@ def test_table_with_caption():
 |text
 
 |==="""
+
+
+def test_xml_description_source__empty():
+    assert XmlDescriptionSource("lang", None, None).empty
+    assert XmlDescriptionSource("lang", ET.Element("briefdescription"),
+                                ET.Element("detaileddescription")).empty
+
+    brief = ET.Element("briefdescription")
+    brief.text = "\n"
+    assert XmlDescriptionSource("lang", brief, None).empty
+
+
+def test_xml_description_source__empty__only_ignored_parts():
+    detailed = ET.Element("detaileddescription")
+    para = sub_element(detailed, "para", text="\n", tail="\n")
+    parameterlist = sub_element(para, "parameterlist", kind="param", tail="\n")
+    sub_element(parameterlist, "parameteritem", text="Parameter description.")
+    sub_element(para, "simplesect", kind="return", text="Return value description.", tail="\n")
+
+    assert XmlDescriptionSource("lang", None, detailed).empty
+
+
+def _description_with_all_handlers():
+    detailed = ET.Element("detaileddescription")
+    para = sub_element(detailed, "para", text="See ", tail="\n")
+    sub_element(para, "ulink", text="the site", url="https://example.com", tail=" and ")
+    sub_element(para, "ref", text="Other", refid="other", kindref="compound", tail=".\n")
+    parameterlist = sub_element(para, "parameterlist", kind="param", tail="Not shown.")
+    sub_element(parameterlist, "parameteritem", text="Parameter description.")
+    sub_element(para, "simplesect", kind="return", text="Return value.", tail="Not shown.")
+    note = sub_element(para, "simplesect", kind="note", tail="\n")
+    sub_element(note, "para", text="A note.")
+    listing = sub_element(para, "programlisting")
+    codeline = sub_element(listing, "codeline")
+    sub_element(codeline, "highlight", text="int", **{"class": "keywordtype"})
+    sub_element(codeline, "sp")
+    sub_element(codeline, "highlight", text="x;", **{"class": "normal"})
+    table = sub_element(para, "table", rows="2", cols="1")
+    sub_element(table, "caption", text="Caption", tail="Not shown.")
+    row = sub_element(table, "row")
+    entry = sub_element(row, "entry", thead="yes")
+    sub_element(entry, "para", text="Header")
+    row = sub_element(table, "row")
+    entry = sub_element(row, "entry", thead="no")
+    sub_element(entry, "para", text="Cell")
+    return detailed
+
+
+def test_xml_description_source__render__same_as_parser():
+    detailed = _description_with_all_handlers()
+    expected = DescriptionParser("lang").parse(detailed)
+    assert "Not shown." not in expected
+
+    source = XmlDescriptionSource("lang", None, detailed)
+    assert source.render() == tuple(expected.split("\n", maxsplit=1))
+
+
+def test_xml_description_source__ignored_parts_not_stored():
+    source = XmlDescriptionSource("lang", None, _description_with_all_handlers())
+    assert source.detailed is not None
+    for ignored in (b"parameterlist", b"Parameter description.", b"Return value.", b"Not shown.",
+                    b"kindref", b"rows"):
+        assert ignored not in source.detailed
+
+
+def test_for_language__shared_parser():
+    parser = DescriptionParser.for_language("lang")
+    assert parser.language == "lang"
+    assert DescriptionParser.for_language("lang") is parser
+    assert DescriptionParser.for_language("other") is not parser
+
+
+def test_for_language__reuse_parser():
+    first = ET.Element("description")
+    sub_element(first, "para", text="First description.")
+    second = ET.Element("description")
+    sub_element(second, "ref", text="Second", refid="second", tail=" description.")
+
+    parser = DescriptionParser.for_language("lang")
+    assert parser.parse(first) == "First description."
+    assert parser.parse(second) == "xref:lang-second[Second] description."
+    assert parser.parse(first) == "First description."
+
+
+def test_unknown_tag__contents_only():
+    description = ET.Element("description")
+    para = sub_element(description, "para", text="Text with ")
+    sub_element(para, "unknowntag", text="unknown", tail=" tag.")
+    result = DescriptionParser("lang").parse(description)
+    assert result == "Text with unknown tag."
+
+
+def test_xml_description_source__render():
+    brief = ET.Element("briefdescription")
+    sub_element(brief, "para", text="Brief description.")
+    detailed = ET.Element("detaileddescription")
+    sub_element(detailed, "para", text="Detailed description.")
+
+    source = XmlDescriptionSource("lang", brief, detailed)
+    assert not source.empty
+    assert source.render() == ("Brief description.", "Detailed description.")
+
+
+def test_xml_description_source__render__brief_from_detailed():
+    detailed = ET.Element("detaileddescription")
+    sub_element(detailed, "para", text="First line.")
+    sub_element(detailed, "para", text="More details.")
+
+    source = XmlDescriptionSource("lang", ET.Element("briefdescription"), detailed)
+    assert source.render() == ("First line.", "More details.")
+
+
+def test_parse__descriptions_are_rendered_when_used(parser_driver_factory):
+    driver = parser_driver_factory("cpp/default")
+    element = driver.api_reference.find("asciidoxy::geometry::Coordinate", kind="class")
+    assert element is not None
+    assert element._description_source is not None
+
+    assert element.brief == "Class to hold information about a coordinate."
+    assert element._description_source is None
+    assert element.description == "A coordinate has a latitude, longitude, and an altitude."
@@ -0,0 +1,111 @@
+# Copyright (C) 2019-2020, TomTom (http://tomtom.com).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for sharing identical values created while parsing."""
+
+from asciidoxy.doxygenparser.interning import Interner
+from asciidoxy.model import Parameter, TypeRef
+
+
+def _type_ref(name, namespace=None, prefix="", suffix=""):
+    type_ref = TypeRef("cpp", name)
+    type_ref.namespace = namespace
+    type_ref.prefix = prefix
+    type_ref.suffix = suffix
+    return type_ref
+
+
+def test_string():
+    interner = Interner()
+    first = "".join(["pub", "lic"])
+    second = "".join(["publ", "ic"])
+    assert first is not second
+
+    assert interner.string(first) is first
+    assert interner.string(second) is first
+    assert interner.string(None) is None
+
+
+def test_type_ref__identical_types_are_shared():
+    interner = Interner()
+    first = _type_ref("Coordinate", "asciidoxy::geometry", suffix=" &")
+    second = _type_ref("Coordinate", "asciidoxy::geometry", suffix=" &")
+
+    assert interner.type_ref(first) is first
+    assert interner.type_ref(second) is first
+    assert not interner.is_shared_duplicate(first)
+    assert interner.is_shared_duplicate(second)
+
+
+def test_type_ref__different_namespace_is_not_shared():
+    interner = Interner()
+    first = _type_ref("Coordinate", "asciidoxy::geometry")
+    second = _type_ref("Coordinate", "asciidoxy::traffic")
+
+    assert interner.type_ref(first) is first
+    assert interner.type_ref(second) is second
+
+
+def test_type_ref__different_qualifiers_are_not_shared():
+    interner = Interner()
+    first = _type_ref("Coordinate", prefix="const ")
+    second = _type_ref("Coordinate", suffix="*")
+
+    assert interner.type_ref(first) is first
+    assert interner.type_ref(second) is second
+
+
+def test_type_ref__nested_and_arg_types_are_shared():
+    interner = Interner()
+    int_type = interner.type_ref(_type_ref("int"))
+
+    outer = _type_ref("std::function")
+    outer.nested = [_type_ref("int")]
+    outer.args = [Parameter()]
+    outer.args[0].type = _type_ref("int")
+
+    assert interner.type_ref(outer) is outer
+    assert outer.nested[0] is int_type
+    assert outer.args[0].type is int_type
+    assert not interner.is_shared_duplicate(outer)
+
+    other_outer = _type_ref("std::function")
+    other_outer.nested = []
+    assert interner.type_ref(other_outer) is other_outer
+
+
+def test_clear_type_refs():
+    interner = Interner()
+    first = interner.type_ref(_type_ref("int"))
+    interner.clear_type_refs()
+
+    second = _type_ref("int")
+    assert interner.type_ref(second) is second
+    assert first is not second
+
+
+def test_parse__shared_types_are_registered_once(parser_driver_factory):
+    driver = parser_driver_factory("cpp/default")
+
+    unresolved_ids = [id(ref) for ref in driver._unresolved_refs]
+    assert len(unresolved_ids) == len(set(unresolved_ids))
+
+    coordinate = driver.api_reference.find("asciidoxy::geometry::Coordinate", kind="class")
+    latitude = driver.api_reference.find("asciidoxy::geometry::Coordinate::Latitude",
+                                         kind="function")
+    longitude = driver.api_reference.find("asciidoxy::geometry::Coordinate::Longitude",
+                                          kind="function")
+    assert coordinate is not None
+    assert latitude.returns.type is longitude.returns.type
+    assert latitude.kind is longitude.kind
+    assert latitude.prot is longitude.prot
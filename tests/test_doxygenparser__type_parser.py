@@ -23,7 +23,8 @@ from typing import List, NamedTuple, Optional
 from unittest.mock import MagicMock
 
 from asciidoxy.doxygenparser.language_traits import LanguageTraits, TokenCategory
-from asciidoxy.doxygenparser.type_parser import Token, TypeParser, find_tokens
+from asciidoxy.doxygenparser.type_parser import (Token, TokenPattern, TypeCache, TypeParser,
+                                                 find_tokens)
 from asciidoxy.model import Compound, Member
 from .shared import assert_equal_or_none_if_empty, sub_element
 
@@ -1111,6 +1112,137 @@ def test_type_parser__parse_xml__nested_types_and_args():
     assert not type_ref.args[1].type.kind
 
 
+def _nested_type_element() -> ET.Element:
+    element = ET.Element("type")
+    sub_element(element, "ref", text="MyType", refid="my_type", kindref="compound", tail="<")
+    sub_element(element, "ref", text="NestedType", refid="nested_type", tail=", Other>(Arg a)")
+    return element
+
+
+def test_type_parser__parse_xml__cache_hit_returns_copy():
+    cache = TypeCache()
+    element = _nested_type_element()
+
+    first = TestParser.parse_xml(element, cache=cache)
+    assert cache.hits == 0
+    assert cache.misses == 1
+
+    second = TestParser.parse_xml(_nested_type_element(), cache=cache)
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert cache.hit_rate == 0.5
+
+    assert second is not first
+    assert str(second) == str(first) == "MyType< NestedType, Other >(Arg a )"
+    assert second.id == "mylang-my_type"
+    assert second.nested[0] is not first.nested[0]
+    assert second.args[0] is not first.args[0]
+    assert second.args[0].type is not first.args[0].type
+
+
+def test_type_parser__parse_xml__cache_hit_registers_unresolved_refs():
+    cache = TypeCache()
+
+    first_driver = MagicMock()
+    first = TestParser.parse_xml(_nested_type_element(), driver=first_driver, cache=cache)
+    assert ([args[0] for args, _ in first_driver.unresolved_ref.call_args_list
+             ] == [first.nested[1], first.args[0].type])
+
+    second_driver = MagicMock()
+    second = TestParser.parse_xml(_nested_type_element(), driver=second_driver, cache=cache)
+    assert cache.hits == 1
+    assert ([args[0] for args, _ in second_driver.unresolved_ref.call_args_list
+             ] == [second.nested[1], second.args[0].type])
+
+
+def test_type_parser__parse_xml__cache_not_affected_by_resolving():
+    cache = TypeCache()
+    element = ET.Element("type")
+    element.text = "MyType"
+
+    first = TestParser.parse_xml(element, cache=cache)
+    first.id = "mylang-resolved"
+    first.kind = "class"
+
+    second = TestParser.parse_xml(element, cache=cache)
+    assert cache.hits == 1
+    assert second.name == "MyType"
+    assert not second.id
+    assert not second.kind
+
+
+def test_type_parser__parse_xml__cache_key_includes_namespace_and_array():
+    cache = TypeCache()
+    element = ET.Element("type")
+    element.text = "MyType"
+    array = ET.Element("array")
+    array.text = "[]"
+
+    parent = Compound("mylang")
+    parent.full_name = "asciidoxy::test"
+    other_parent = Compound("mylang")
+    other_parent.full_name = "asciidoxy::other"
+
+    assert TestParser.parse_xml(element, parent=parent, cache=cache).namespace == "asciidoxy::test"
+    assert (TestParser.parse_xml(element, parent=other_parent,
+                                 cache=cache).namespace == "asciidoxy::other")
+    TestParser.parse_xml(element, array, parent=parent, cache=cache)
+    assert cache.hits == 0
+    assert cache.misses == 3
+
+    TestParser.parse_xml(element, array, parent=parent, cache=cache)
+    assert cache.hits == 1
+
+
+def test_type_parser__parse_xml__cache_whitespace_only():
+    cache = TypeCache()
+    element = ET.Element("type")
+    element.text = "  "
+
+    assert TestParser.parse_xml(element, cache=cache) is None
+    assert TestParser.parse_xml(element, cache=cache) is None
+    assert cache.hits == 1
+
+
+def test_type_parser__parse_xml__cache_ignores_indentation_after_type():
+    cache = TypeCache()
+    element = _nested_type_element()
+    element.tail = "\n      "
+    other_element = _nested_type_element()
+    other_element.tail = "\n          "
+
+    first = TestParser.parse_xml(element, cache=cache)
+    second = TestParser.parse_xml(other_element, cache=cache)
+    assert cache.hits == 1
+    assert str(second) == str(first) == str(TestParser.parse_xml(_nested_type_element()))
+
+    changed = _nested_type_element()
+    changed[1].tail = ", Another>(Arg a)"
+    changed_type = TestParser.parse_xml(changed, cache=cache)
+    assert str(changed_type) == "MyType< NestedType, Another >(Arg a )"
+    assert cache.hits == 1
+
+
+def test_type_cache__evict_least_recently_used():
+    cache = TypeCache(maxsize=2)
+    elements = [ET.Element("type") for _ in range(3)]
+    for element, text in zip(elements, ("First", "Second", "Third")):
+        element.text = text
+
+    TestParser.parse_xml(elements[0], cache=cache)
+    TestParser.parse_xml(elements[1], cache=cache)
+    TestParser.parse_xml(elements[0], cache=cache)
+    TestParser.parse_xml(elements[2], cache=cache)
+    assert len(cache) == 2
+    assert cache.hits == 1
+    assert cache.misses == 3
+
+    TestParser.parse_xml(elements[0], cache=cache)
+    assert cache.hits == 2
+    TestParser.parse_xml(elements[1], cache=cache)
+    assert cache.misses == 4
+
+
 @pytest.mark.parametrize("tokens, pattern, expected", [
     ([], [], []),
     ([
@@ -1179,3 +1311,67 @@ def test_type_parser__parse_xml__nested_types_and_args():
 ])
 def test_find_tokens(tokens, pattern, expected):
     assert list(find_tokens(tokens, pattern)) == expected
+
+
+def test_find_tokens__precompiled_pattern():
+    pattern = TokenPattern([[TokenCategory.NAME], [TokenCategory.WHITESPACE, None],
+                            [TokenCategory.OPERATOR]])
+    tokens = [name("Type"), whitespace(), operator("*"), name("Other"), operator("&")]
+
+    assert list(find_tokens(tokens, pattern)) == [tokens[0:3], tokens[3:5]]
+    assert list(pattern.find(tokens)) == [tokens[0:3], tokens[3:5]]
+    assert list(pattern.find(tokens[:2])) == []
+
+
+class SpecialCharacterTraits(LanguageTraits):
+    TAG = "special"
+
+    TOKENS = {
+        TokenCategory.NESTED_START: ("[", "^"),
+        TokenCategory.NESTED_END: ("]", "-"),
+        TokenCategory.OPERATOR: ("\\", "..."),
+    }
+    TOKEN_BOUNDARIES = ("[", "]", "^", "-", "\\", "...", " ")
+
+
+class SpecialCharacterParser(TypeParser):
+    TRAITS = SpecialCharacterTraits
+
+
+def test_type_parser__tokenize_text__regex_special_boundaries():
+    assert SpecialCharacterParser.tokenize_text("a[b]c^d-e\\f...g  h") == [
+        name("a"),
+        nested_start("["),
+        name("b"),
+        nested_end("]"),
+        name("c"),
+        nested_start("^"),
+        name("d"),
+        nested_end("-"),
+        name("e"),
+        operator("\\"),
+        name("f...g"),
+        whitespace(),
+        name("h"),
+    ]
+
+
+def test_type_parser__type_from_tokens__generated_deep_nested_type():
+    depth = 50
+    tokens = []
+    for i in range(depth):
+        tokens.extend([name(f"Type{i}"), nested_start(), name("Sibling"), nested_sep()])
+    tokens.append(name("Innermost"))
+    for _ in range(depth):
+        tokens.append(nested_end())
+
+    type_ref = TestParser.type_from_tokens(tokens)
+
+    for i in range(depth):
+        assert type_ref.name == f"Type{i}"
+        assert len(type_ref.nested) == 2
+        assert type_ref.nested[0].name == "Sibling"
+        assert not type_ref.nested[0].nested
+        type_ref = type_ref.nested[1]
+    assert type_ref.name == "Innermost"
+    assert not type_ref.nested
@@ -19,6 +19,7 @@ import os
 import pytest
 
 from pathlib import Path
+from unittest.mock import patch
 
 from asciidoxy.generator.asciidoc import Api, process_adoc
 from asciidoxy.generator.navigation import DocumentTreeNode
@@ -42,6 +43,11 @@ def sub_document_api(sub_document_file, context):
     return Api(sub_document_file, context)
 
 
+@pytest.fixture(params=[False, True], ids=["full-preprocessing", "lightweight-preprocessing"])
+def lightweight_preprocessing(request):
+    return request.param
+
+
 @pytest.fixture
 def preprocessing_api(input_file, context):
     context.preprocessing_run = True
@@ -502,7 +508,8 @@ def test_multipage_toc__preprocessing_run(preprocessing_api, input_file, multipa
                          ids=["warnings-are-errors", "warnings-are-not-errors"])
 @pytest.mark.parametrize("test_file_name", ["simple_test", "link_to_member"])
 def test_process_adoc_single_file(warnings_are_errors, build_dir, test_file_name,
-                                  single_and_multipage, adoc_data, api_reference):
+                                  single_and_multipage, adoc_data, api_reference,
+                                  lightweight_preprocessing):
     input_file = adoc_data / f"{test_file_name}.input.adoc"
     expected_output_file = adoc_data / f"{test_file_name}.expected.adoc"
 
@@ -511,7 +518,8 @@ def test_process_adoc_single_file(warnings_are_errors, build_dir, test_file_name
                                build_dir,
                                api_reference,
                                warnings_are_errors=warnings_are_errors,
-                               progress=progress_mock)[input_file]
+                               progress=progress_mock,
+                               lightweight_preprocessing=lightweight_preprocessing)[input_file]
     assert output_file.is_file()
 
     content = output_file.read_text()
@@ -522,7 +530,9 @@ def test_process_adoc_single_file(warnings_are_errors, build_dir, test_file_name
     assert progress_mock.total == 2
 
 
-def test_process_adoc_multi_file(build_dir, single_and_multipage, adoc_data, api_reference):
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_process_adoc_multi_file(build_dir, single_and_multipage, adoc_data, api_reference,
+                                 lightweight_preprocessing, jobs):
     main_doc_file = adoc_data / "multifile_test.input.adoc"
     sub_doc_file = main_doc_file.parent / "sub_directory" / "multifile_subdoc_test.input.adoc"
     sub_doc_in_table_file = main_doc_file.parent / "sub_directory" \
@@ -534,7 +544,9 @@ def test_process_adoc_multi_file(build_dir, single_and_multipage, adoc_data, api
                                 api_reference,
                                 warnings_are_errors=True,
                                 multipage=single_and_multipage,
-                                progress=progress_mock)
+                                progress=progress_mock,
+                                lightweight_preprocessing=lightweight_preprocessing,
+                                jobs=jobs)
     assert len(output_files) == 3
     assert (
         output_files[main_doc_file] == main_doc_file.with_name(f".asciidoxy.{main_doc_file.name}"))
@@ -553,12 +565,46 @@ def test_process_adoc_multi_file(build_dir, single_and_multipage, adoc_data, api
     assert progress_mock.total == 2 * len(output_files)
 
 
+def _read_files(files):
+    return {f: f.read_text() for f in files}
+
+
+def test_process_adoc__reuse_fragments(build_dir, single_and_multipage, adoc_data, api_reference):
+    main_doc_file = adoc_data / "multifile_test.input.adoc"
+
+    rendered = []
+    render_fragment = Api._render_fragment
+
+    def count_render_fragment(self, element, *args):
+        rendered.append(element.id)
+        return render_fragment(self, element, *args)
+
+    with patch.object(Api, "_render_fragment", count_render_fragment):
+        output_files = process_adoc(main_doc_file,
+                                    build_dir,
+                                    api_reference,
+                                    multipage=single_and_multipage)
+        reused_content = _read_files(output_files.values())
+        reused_fragments = _read_files((build_dir / "fragments").glob("*.adoc"))
+        reused_count = len(rendered)
+
+        rendered.clear()
+        process_adoc(main_doc_file,
+                     build_dir,
+                     api_reference,
+                     multipage=single_and_multipage,
+                     reuse_fragments=False)
+        assert _read_files(output_files.values()) == reused_content
+        assert _read_files((build_dir / "fragments").glob("*.adoc")) == reused_fragments
+        assert reused_count < len(rendered)
+
+
 @pytest.mark.parametrize("api_reference_set", [("cpp/default", "cpp/consumer")])
 @pytest.mark.parametrize(
     "test_file_name",
     ["dangling_link", "dangling_cross_doc_ref", "double_insert", "dangling_link_in_insert"])
 def test_process_adoc_file_warning(build_dir, test_file_name, single_and_multipage, adoc_data,
-                                   api_reference):
+                                   api_reference, lightweight_preprocessing):
     input_file = adoc_data / f"{test_file_name}.input.adoc"
 
     expected_output_file = adoc_data / f"{test_file_name}.expected.adoc"
@@ -567,8 +613,11 @@ def test_process_adoc_file_warning(build_dir, test_file_name, single_and_multipa
         if expected_output_file_multipage.is_file():
             expected_output_file = expected_output_file_multipage
 
-    output_file = process_adoc(input_file, build_dir, api_reference,
-                               multipage=single_and_multipage)[input_file]
+    output_file = process_adoc(input_file,
+                               build_dir,
+                               api_reference,
+                               multipage=single_and_multipage,
+                               lightweight_preprocessing=lightweight_preprocessing)[input_file]
     assert output_file.is_file()
 
     content = output_file.read_text()
@@ -581,12 +630,19 @@ def test_process_adoc_file_warning(build_dir, test_file_name, single_and_multipa
                                                    ("dangling_cross_doc_ref", ConsistencyError),
                                                    ("double_insert", ConsistencyError),
                                                    ("dangling_link_in_insert", ConsistencyError)])
+@pytest.mark.parametrize("jobs", [1, 2])
 def test_process_adoc_file_warning_as_error(build_dir, test_file_name, error, single_and_multipage,
-                                            adoc_data, api_reference):
+                                            adoc_data, api_reference, lightweight_preprocessing,
+                                            jobs):
     input_file = adoc_data / f"{test_file_name}.input.adoc"
 
     with pytest.raises(error):
-        process_adoc(input_file, build_dir, api_reference, warnings_are_errors=True)
+        process_adoc(input_file,
+                     build_dir,
+                     api_reference,
+                     warnings_are_errors=True,
+                     lightweight_preprocessing=lightweight_preprocessing,
+                     jobs=jobs)
 
 
 def test_require_version__exact_match(api):
@@ -0,0 +1,195 @@
+# Copyright (C) 2019-2020, TomTom (http://tomtom.com).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for caching compiled templates and generated files."""
+
+import os
+import pytest
+
+from mako.exceptions import TopLevelLookupException
+
+from asciidoxy.generator.asciidoc import process_adoc
+from asciidoxy.generator.cache import OutputManifest, TemplateCache
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return tmp_path / "cache"
+
+
+@pytest.fixture
+def document(tmp_path):
+    document = tmp_path / "document.adoc"
+    document.write_text("${1 + 1}", encoding="utf-8")
+    return document
+
+
+def test_api_template__shared(tmp_path):
+    cache = TemplateCache(tmp_path)
+    template = cache.api_template("cpp", "class")
+    assert cache.api_template("cpp", "class") is template
+    assert cache.api_template("cpp", "struct") is not template
+
+
+def test_api_template__missing(tmp_path):
+    with pytest.raises(TopLevelLookupException):
+        TemplateCache(tmp_path).api_template("cpp", "unknown")
+
+
+def test_api_template__not_stored_without_cache_dir(tmp_path, cache_dir):
+    TemplateCache(tmp_path).api_template("cpp", "class")
+    assert not cache_dir.exists()
+
+
+def test_api_template__stored_in_cache_dir(tmp_path, cache_dir):
+    cold = TemplateCache(tmp_path, cache_dir)
+    cold.api_template("cpp", "class")
+    cold.api_template("cpp", "enum")
+    assert cold.hits == 0
+    assert cold.misses == 2
+    assert len(list(cache_dir.glob("*.py"))) == 2
+
+    warm = TemplateCache(tmp_path, cache_dir)
+    warm.api_template("cpp", "class")
+    warm.api_template("cpp", "enum")
+    assert warm.hits == 2
+    assert warm.misses == 0
+
+
+def test_document(document, cache_dir):
+    cache = TemplateCache(document.parent, cache_dir)
+    template = cache.document(document)
+    assert template.render() == "2"
+    assert cache.document(document) is template
+    assert cache.misses == 1
+
+
+def test_document__changed_source(document, cache_dir):
+    TemplateCache(document.parent, cache_dir).document(document)
+
+    document.write_text("${2 + 2}", encoding="utf-8")
+    cache = TemplateCache(document.parent, cache_dir)
+    assert cache.document(document).render() == "4"
+    assert cache.misses == 1
+    assert len(list(cache_dir.glob("*.py"))) == 2
+
+
+def test_document__newer_source_with_same_content(document, cache_dir):
+    TemplateCache(document.parent, cache_dir).document(document)
+    module_file, = cache_dir.glob("*.py")
+    module_file.write_text(module_file.read_text(encoding="utf-8").replace("1 + 1", "3 + 3"),
+                           encoding="utf-8")
+    os.utime(module_file, (0, 0))
+
+    cache = TemplateCache(document.parent, cache_dir)
+    assert cache.document(document).render() == "6"
+    assert cache.hits == 1
+
+
+def test_process_adoc__cold_and_warm_cache(build_dir, adoc_data, api_reference, cache_dir):
+    input_file = adoc_data / "simple_test.input.adoc"
+    expected = process_adoc(input_file, build_dir, api_reference)[input_file].read_text()
+
+    process_adoc(input_file, build_dir, api_reference, cache_dir=cache_dir)
+    module_files = {f: f.stat().st_size for f in (cache_dir / "templates").glob("*.py")}
+    assert module_files
+
+    output_file = process_adoc(input_file, build_dir, api_reference,
+                               cache_dir=cache_dir)[input_file]
+    assert output_file.read_text() == expected
+    assert {f: f.stat().st_size for f in (cache_dir / "templates").glob("*.py")} == module_files
+
+
+def _generated_files(build_dir, input_file):
+    files = list((build_dir / "fragments").glob("*.adoc"))
+    files.extend(input_file.parent.glob(".asciidoxy.*"))
+    return {f: f.stat().st_mtime_ns for f in files}
+
+
+def test_process_adoc__unchanged_files_not_written(build_dir, adoc_data, api_reference, cache_dir,
+                                                   tmp_path):
+    input_file = tmp_path / "input" / "simple_test.input.adoc"
+    input_file.parent.mkdir()
+    input_file.write_text((adoc_data / "simple_test.input.adoc").read_text(encoding="utf-8"),
+                          encoding="utf-8")
+
+    output_file = process_adoc(input_file, build_dir, api_reference,
+                               cache_dir=cache_dir)[input_file]
+    expected = output_file.read_text(encoding="utf-8")
+    generated_files = _generated_files(build_dir, input_file)
+    assert len(generated_files) > 1
+
+    process_adoc(input_file, build_dir, api_reference, cache_dir=cache_dir)
+    assert output_file.read_text(encoding="utf-8") == expected
+    assert _generated_files(build_dir, input_file) == generated_files
+
+
+def test_output_manifest__write(tmp_path):
+    file = tmp_path / "file.adoc"
+    manifest = OutputManifest()
+    assert manifest.write(file, "text\n") is True
+    assert file.read_text(encoding="utf-8") == "text\n"
+    assert manifest.write(file, "text\n") is False
+    assert manifest.write(file, "other text\n") is True
+    assert file.read_text(encoding="utf-8") == "other text\n"
+    assert manifest.written == 2
+    assert manifest.skipped == 1
+
+
+def test_output_manifest__stored(tmp_path, cache_dir):
+    file = tmp_path / "file.adoc"
+    manifest_file = cache_dir / "outputs.json"
+    manifest = OutputManifest(manifest_file)
+    manifest.write(file, "text")
+    manifest.save()
+    mtime = file.stat().st_mtime_ns
+
+    manifest = OutputManifest(manifest_file)
+    assert manifest.write(file, "text") is False
+    assert file.stat().st_mtime_ns == mtime
+
+
+def test_output_manifest__not_stored_without_manifest_file(tmp_path):
+    file = tmp_path / "file.adoc"
+    OutputManifest().write(file, "text")
+    assert OutputManifest().write(file, "text") is True
+
+
+def test_output_manifest__file_changed_on_disk(tmp_path):
+    file = tmp_path / "file.adoc"
+    manifest = OutputManifest()
+    manifest.write(file, "text")
+    file.write_text("changed", encoding="utf-8")
+    os.utime(file, ns=(0, 0))
+
+    assert manifest.write(file, "text") is True
+    assert file.read_text(encoding="utf-8") == "text"
+
+
+def test_output_manifest__file_removed(tmp_path):
+    file = tmp_path / "file.adoc"
+    manifest = OutputManifest()
+    manifest.write(file, "text")
+    file.unlink()
+
+    assert manifest.write(file, "text") is True
+    assert file.read_text(encoding="utf-8") == "text"
+
+
+def test_output_manifest__unreadable_manifest(tmp_path, cache_dir):
+    file = tmp_path / "file.adoc"
+    manifest_file = cache_dir / "outputs.json"
+    manifest_file.parent.mkdir(parents=True)
+    manifest_file.write_text("{not json", encoding="utf-8")
+
+    assert OutputManifest(manifest_file).write(file, "text") is True
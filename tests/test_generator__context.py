@@ -13,8 +13,13 @@
 # limitations under the License.
 """Tests for the generator's context."""
 
+import pytest
+
 from pathlib import Path
 
+from asciidoxy.generator.context import FragmentJob, FragmentResult, RenderedFragment
+from asciidoxy.generator.errors import ConsistencyError
+from asciidoxy.generator.filters import InsertionFilter
 from asciidoxy.model import ReferableElement
 
 
@@ -42,6 +47,8 @@ def test_context_create_sub_context(context):
     assert sub.reference is context.reference
     assert sub.linked is context.linked
     assert sub.inserted is context.inserted
+    assert sub.rendered_fragments is context.rendered_fragments
+    assert sub.fragment_stack is context.fragment_stack
 
     sub.namespace = "other"
     sub.language = "objc"
@@ -85,3 +92,102 @@ def test_context_link_to_element_element_not_inserted(context, single_and_multip
     link_text = "Link"
     assert element_id not in context.inserted
     assert context.link_to_element(element_id, link_text) == f"xref:{element_id}[{link_text}]"
+
+
+def test_context_link_to_element__records_links_in_fragment(context, multipage):
+    context.inserted["element"] = context.current_document.in_file.parent / "other_file.adoc"
+    fragment = RenderedFragment(context.fragment_dir / "fragment.adoc")
+    context.fragment_stack.append(fragment)
+
+    context.link_to_element("element", "Link")
+    context.link_to_element("other", "Other")
+    assert fragment.links == [("element", "other_file.adoc#", None), ("other", "", None)]
+
+
+def test_context_reusable_fragment(context, multipage):
+    context.inserted["element"] = context.current_document.in_file.parent / "other_file.adoc"
+    key = (context.current_document.in_file, "lang", "id", "class", "")
+    fragment = RenderedFragment(context.fragment_dir / "fragment.adoc")
+    fragment.links.append(("element", "other_file.adoc#", None))
+    context.rendered_fragments[key] = fragment
+
+    assert context.reusable_fragment(key) is fragment
+    assert context.reusable_fragment(key[:-1] + ("other filter", )) is None
+
+
+def test_context_reusable_fragment__link_changed(context, multipage):
+    key = (context.current_document.in_file, "lang", "id", "class", "")
+    fragment = RenderedFragment(context.fragment_dir / "fragment.adoc")
+    fragment.children.append(RenderedFragment(context.fragment_dir / "child.adoc"))
+    fragment.children[0].links.append(("element", "", None))
+    context.rendered_fragments[key] = fragment
+
+    assert context.reusable_fragment(key) is fragment
+    context.inserted["element"] = context.current_document.in_file.parent / "other_file.adoc"
+    assert context.reusable_fragment(key) is None
+
+
+def test_context_write_fragment(context):
+    element = ReferableElement("lang")
+    fragment = RenderedFragment(context.fragment_dir / "fragment.adoc")
+    fragment.text = "Fragment"
+    fragment.links.append(("element", "", element))
+    fragment.links.append(("unknown", "", None))
+    fragment.children.append(RenderedFragment(context.fragment_dir / "child.adoc"))
+    fragment.children[0].text = "Child"
+
+    context.write_fragment(fragment)
+    assert (context.fragment_dir / "fragment.adoc").read_text(encoding="utf-8") == "Fragment\n"
+    assert (context.fragment_dir / "child.adoc").read_text(encoding="utf-8") == "Child\n"
+    assert context.linked == [element]
+
+
+def test_context_complete_links(context, multipage):
+    context.lightweight_preprocessing = True
+    output_file = context.fragment_dir / "output.adoc"
+
+    text = (f"{context.link_to_element('element', 'Link')} "
+            f"{context.link_to_element('other', 'Other')}")
+    context.write_file(output_file, text)
+    assert not output_file.exists()
+
+    context.inserted["element"] = context.current_document.in_file.parent / "other_file.adoc"
+    context.complete_links()
+    content = output_file.read_text(encoding="utf-8")
+    assert content == "xref:other_file.adoc#element[Link] xref:other[Other]\n"
+    assert not context.pending_files
+    assert not context.pending_links
+
+
+def test_context_merge_fragment(context, multipage, api_reference):
+    context.lightweight_preprocessing = True
+    context.pending_links.append(("element", context.current_document.in_file))
+    element = api_reference.find("asciidoxy::geometry::Coordinate", kind="class", lang="cpp")
+    other_document = context.current_document.in_file.parent / "other_file.adoc"
+    fragment_file = context.fragment_dir / "fragment.adoc"
+
+    job = FragmentJob(element.id, "class", InsertionFilter(), other_document)
+    result = FragmentResult(files=[(fragment_file, "xref:\x000\x00element[Link]")],
+                            inserted=[("element", "Element")],
+                            pending_links=[("element", other_document)],
+                            linked=[element.id])
+    context.merge_fragment(job, result)
+
+    assert context.inserted["element"] == other_document
+    assert context.linked == [element]
+    assert context.pending_links[1] == ("element", other_document)
+    assert context.pending_files[fragment_file] == "xref:\x001\x00element[Link]"
+
+    context.complete_links()
+    assert fragment_file.read_text(encoding="utf-8") == "xref:element[Link]\n"
+
+
+def test_context_merge_fragment__duplicate_insertion(context, warnings_are_errors):
+    context.inserted["element"] = context.current_document.in_file
+    job = FragmentJob("element", "class", InsertionFilter(), context.current_document.in_file)
+    result = FragmentResult(files=[],
+                            inserted=[("element", "Element")],
+                            pending_links=[],
+                            linked=[])
+    with pytest.raises(ConsistencyError):
+        context.merge_fragment(job, result)
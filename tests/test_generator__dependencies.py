@@ -0,0 +1,299 @@
+# Copyright (C) 2019-2020, TomTom (http://tomtom.com).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for incremental builds using the dependencies of generated documents."""
+
+import pytest
+import shutil
+
+from unittest.mock import patch
+
+from asciidoxy.generator.asciidoc import Api, process_adoc
+from asciidoxy.generator.dependencies import DependencyGraph, document_files
+
+
+@pytest.fixture(params=[False, True], ids=["full-preprocessing", "lightweight-preprocessing"])
+def lightweight_preprocessing(request):
+    return request.param
+
+
+@pytest.fixture
+def input_dir(tmp_path, adoc_data):
+    input_dir = tmp_path / "input"
+    shutil.copytree(str(adoc_data), str(input_dir))
+    return input_dir
+
+
+@pytest.fixture
+def graph_file(tmp_path):
+    return tmp_path / "cache" / "dependencies.json"
+
+
+class _Build:
+    def __init__(self, build_dir, api_reference, graph_file, **options):
+        self.build_dir = build_dir
+        self.api_reference = api_reference
+        self.graph_file = graph_file
+        self.options = options
+        self.rendered = []
+
+    def __call__(self, in_file, api_fingerprint=""):
+        dependencies = DependencyGraph(self.graph_file, api_fingerprint)
+        render_fragment = Api._render_fragment
+
+        def count_render_fragment(api, element, *args):
+            self.rendered.append(element.id)
+            return render_fragment(api, element, *args)
+
+        self.rendered.clear()
+        with patch.object(Api, "_render_fragment", count_render_fragment):
+            output_files = process_adoc(in_file,
+                                        self.build_dir,
+                                        self.api_reference,
+                                        dependencies=dependencies,
+                                        **self.options)
+        dependencies.save()
+        self.dependencies = dependencies
+        return {f: f.read_text(encoding="utf-8") for f in output_files.values()}
+
+
+@pytest.fixture
+def build(build_dir, api_reference, graph_file, single_and_multipage, lightweight_preprocessing):
+    return _Build(build_dir,
+                  api_reference,
+                  graph_file,
+                  multipage=single_and_multipage,
+                  lightweight_preprocessing=lightweight_preprocessing)
+
+
+def _scratch_build(tmp_path, api_reference, in_file, **options):
+    build_dir = tmp_path / "scratch"
+    build_dir.mkdir(exist_ok=True)
+    output_files = process_adoc(in_file, build_dir, api_reference, **options)
+    return {
+        f: f.read_text(encoding="utf-8").replace(str(build_dir), "BUILD_DIR")
+        for f in output_files.values()
+    }
+
+
+def _replace_build_dir(outputs, build_dir):
+    return {f: text.replace(str(build_dir), "BUILD_DIR") for f, text in outputs.items()}
+
+
+def test_no_changes(build, input_dir):
+    in_file = input_dir / "multifile_test.input.adoc"
+    first = build(in_file)
+    assert build.rendered
+    assert len(build.dependencies.rendered) == 3
+
+    assert build(in_file) == first
+    assert not build.rendered
+    assert not build.dependencies.rendered
+    assert build.dependencies.reused == 3
+
+
+def test_changed_document(build, input_dir, tmp_path, api_reference, single_and_multipage,
+                          lightweight_preprocessing):
+    in_file = input_dir / "multifile_test.input.adoc"
+    sub_doc_file = input_dir / "sub_directory" / "multifile_subdoc_test.input.adoc"
+    build(in_file)
+
+    sub_doc_file.write_text(f"{sub_doc_file.read_text(encoding='utf-8')}\nOne more line.\n",
+                            encoding="utf-8")
+    outputs = build(in_file)
+    assert list(build.dependencies.rendered) == [sub_doc_file]
+    assert build.dependencies.reused == 2
+    assert "One more line." in outputs[sub_doc_file.with_name(f".asciidoxy.{sub_doc_file.name}")]
+
+    expected = _scratch_build(tmp_path,
+                              api_reference,
+                              in_file,
+                              multipage=single_and_multipage,
+                              lightweight_preprocessing=lightweight_preprocessing)
+    assert _replace_build_dir(outputs, build.build_dir) == expected
+
+
+def test_changed_title(build, input_dir, single_and_multipage):
+    in_file = input_dir / "multifile_test.input.adoc"
+    sub_doc_file = input_dir / "sub_directory" / "multifile_subdoc_test.input.adoc"
+    build(in_file)
+
+    sub_doc_file.write_text(f"= Changed title\n{sub_doc_file.read_text(encoding='utf-8')}",
+                            encoding="utf-8")
+    build(in_file)
+    if single_and_multipage:
+        # The navigation bars of all documents contain the titles
+        assert len(build.dependencies.rendered) == 3
+    else:
+        assert list(build.dependencies.rendered) == [sub_doc_file]
+
+
+def test_changed_api_reference(build, input_dir):
+    in_file = input_dir / "multifile_test.input.adoc"
+    build(in_file, api_fingerprint="first")
+    build(in_file, api_fingerprint="second")
+    assert build.rendered
+    assert len(build.dependencies.rendered) == 3
+    assert build.dependencies.reused == 0
+
+
+def test_removed_fragment(build, input_dir, build_dir):
+    in_file = input_dir / "multifile_test.input.adoc"
+    first = build(in_file)
+
+    fragment = next((build_dir / "fragments").glob("*.adoc"))
+    fragment.unlink()
+    assert build(in_file) == first
+    assert fragment.is_file()
+
+
+def test_insertion_moved_to_other_document(build, tmp_path, api_reference, single_and_multipage,
+                                           lightweight_preprocessing):
+    input_dir = tmp_path / "moved"
+    input_dir.mkdir()
+    in_file = input_dir / "index.adoc"
+    in_file.write_text(
+        "= Index\n${api.include('a.adoc')}\n${api.include('b.adoc')}\n${api.include('c.adoc')}\n",
+        encoding="utf-8")
+    insert = "${api.insert('asciidoxy::geometry::Coordinate')}\n"
+    (input_dir / "a.adoc").write_text("= A\n${api.link('asciidoxy::geometry::Coordinate')}\n",
+                                      encoding="utf-8")
+    (input_dir / "b.adoc").write_text(f"= B\n{insert}", encoding="utf-8")
+    (input_dir / "c.adoc").write_text("= C\n", encoding="utf-8")
+    build(in_file)
+
+    (input_dir / "b.adoc").write_text("= B\n", encoding="utf-8")
+    (input_dir / "c.adoc").write_text(f"= C\n{insert}", encoding="utf-8")
+    outputs = build(in_file)
+    if single_and_multipage:
+        assert input_dir / "a.adoc" in build.dependencies.rendered
+
+    expected = _scratch_build(tmp_path,
+                              api_reference,
+                              in_file,
+                              multipage=single_and_multipage,
+                              lightweight_preprocessing=lightweight_preprocessing)
+    assert _replace_build_dir(outputs, build.build_dir) == expected
+
+
+def test_inherited_state(build, tmp_path):
+    input_dir = tmp_path / "state"
+    input_dir.mkdir()
+    in_file = input_dir / "index.adoc"
+    in_file.write_text(
+        "= Index\n${api.language('cpp')}\n${api.namespace('asciidoxy::geometry::')}\n"
+        "${api.include('sub.adoc')}\n",
+        encoding="utf-8")
+    sub_doc_file = input_dir / "sub.adoc"
+    sub_doc_file.write_text("= Sub\n${api.insert('Coordinate')}\n", encoding="utf-8")
+    build(in_file)
+
+    sub_doc_file.write_text("= Sub\nOne more line.\n${api.insert('Coordinate')}\n",
+                            encoding="utf-8")
+    outputs = build(in_file)
+    assert list(build.dependencies.rendered) == [sub_doc_file]
+    assert build.dependencies.reused == 1
+    assert "One more line." in outputs[input_dir / ".asciidoxy.sub.adoc"]
+
+
+def test_graph__stored(tmp_path, graph_file):
+    in_file = tmp_path / "document.adoc"
+    in_file.write_text("= Document\n", encoding="utf-8")
+
+    graph = DependencyGraph(graph_file, "api")
+    graph.start(tmp_path, ["option"])
+    graph.record(in_file, [None, None, [None, None, None, None]], [], {}, {}, [])
+    graph.finish("tree")
+    graph.save()
+
+    graph = DependencyGraph(graph_file, "api")
+    graph.start(tmp_path, ["option"])
+    assert graph.reusable(in_file, [None, None, [None, None, None, None]]) is not None
+    assert graph.reusable(in_file, ["ns::", None, [None, None, None, None]]) is None
+    assert graph.tree_unchanged("tree")
+
+    in_file.write_text("= Changed document\n", encoding="utf-8")
+    graph = DependencyGraph(graph_file, "api")
+    graph.start(tmp_path, ["option"])
+    assert graph.reusable(in_file, [None, None, [None, None, None, None]]) is None
+
+
+@pytest.mark.parametrize("api_fingerprint, options, template",
+                         [("other", ["option"], None), ("api", ["other"], None),
+                          ("api", ["option"], "cpp/class.mako")])
+def test_graph__invalidated(tmp_path, graph_file, api_fingerprint, options, template):
+    in_file = tmp_path / "document.adoc"
+    in_file.write_text("= Document\n", encoding="utf-8")
+
+    graph = DependencyGraph(graph_file, "api")
+    graph.start(tmp_path, ["option"])
+    graph.record(in_file, [None, None, []], [], {}, {}, [])
+    graph.save()
+
+    if template is not None:
+        (tmp_path / template).parent.mkdir()
+        (tmp_path / template).write_text("Custom template", encoding="utf-8")
+    graph = DependencyGraph(graph_file, api_fingerprint)
+    graph.start(tmp_path, options)
+    assert graph.reusable(in_file, [None, None, []]) is None
+
+
+def test_graph__unreadable(tmp_path, graph_file):
+    graph_file.parent.mkdir(parents=True)
+    graph_file.write_text("{not json", encoding="utf-8")
+    graph = DependencyGraph(graph_file)
+    graph.start(tmp_path, [])
+    assert graph.recorded(tmp_path / "document.adoc") is None
+
+
+def test_document_files(tmp_path):
+    fragment_dir = tmp_path / "fragments"
+    fragment_dir.mkdir()
+    fragment = fragment_dir / "fragment.adoc"
+    fragment.write_text("include::nested.adoc[]\n", encoding="utf-8")
+    nested = fragment_dir / "nested.adoc"
+    nested.write_text("Nested\n", encoding="utf-8")
+    snippet = tmp_path / "snippet.adoc"
+    snippet.write_text("Snippet\n", encoding="utf-8")
+    document = tmp_path / ".asciidoxy.document.adoc"
+    document.write_text(
+        f"= Document\ninclude::{fragment}[leveloffset=+1]\ninclude::snippet.adoc[]\n",
+        encoding="utf-8")
+    docinfo = tmp_path / ".asciidoxy.document-docinfo-footer.html"
+    docinfo.touch()
+
+    assert document_files(document) == [document, docinfo, fragment, snippet, nested]
+    assert document_files(document, fragment_dir) == [document, docinfo, fragment, nested]
+
+
+def test_conversion(tmp_path, graph_file):
+    snippet = tmp_path / "snippet.adoc"
+    snippet.write_text("Snippet\n", encoding="utf-8")
+    document = tmp_path / ".asciidoxy.document.adoc"
+    document.write_text("= Document\ninclude::snippet.adoc[]\n", encoding="utf-8")
+    out_file = tmp_path / "document.html"
+
+    graph = DependencyGraph(graph_file)
+    key = graph.conversion_key(document, ["html5"])
+    assert not graph.is_converted(out_file, key)
+    graph.converted(out_file, key)
+    assert not graph.is_converted(out_file, key)
+    out_file.touch()
+    assert graph.is_converted(out_file, key)
+    graph.save()
+
+    graph = DependencyGraph(graph_file)
+    assert graph.is_converted(out_file, graph.conversion_key(document, ["html5"]))
+    assert not graph.is_converted(out_file, graph.conversion_key(document, ["pdf"]))
+    snippet.write_text("Changed snippet\n", encoding="utf-8")
+    assert not graph.is_converted(out_file, graph.conversion_key(document, ["html5"]))
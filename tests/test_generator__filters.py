@@ -13,13 +13,14 @@
 # limitations under the License.
 """Test filters for generated parts."""
 
+import pickle
 import pytest
 
 from asciidoxy.generator.filters import (AllStringFilter, NoneStringFilter, IncludeStringFilter,
                                          ExcludeStringFilter, ChainedStringFilter, MemberFilter,
                                          FilterAction, InnerClassFilter, EnumValueFilter,
                                          ExceptionFilter, filter_from_strings, InsertionFilter,
-                                         combine_specs)
+                                         MemberPartition, combine_specs)
 from asciidoxy.model import Compound, EnumValue, InnerTypeReference, ThrowsClause
 
 
@@ -558,3 +559,62 @@ def test_insertion_filer__member__exceptions__filter_name(api_reference):
                          ids=lambda x: type(x).__name__)
 def test_combine_specs(first, second, expected):
     assert combine_specs(first, second) == expected
+
+
+def test_member_partition__select(cpp_class):
+    partition = MemberPartition(cpp_class.members)
+    assert partition.members == cpp_class.members
+
+    assert [m.name for m in partition.select(("variable", ))
+            ] == ["PublicVariable", "ProtectedVariable", "PrivateVariable"]
+    assert [m.name for m in partition.select(("variable", ), ("public", ))] == ["PublicVariable"]
+    assert [m.name for m in partition.select(("enum", "typedef"), ("public", "protected"))
+            ] == ["PublicEnum", "PublicTypedef", "ProtectedEnum", "ProtectedTypedef"]
+    assert [m.name for m in partition.select(("function", ), ("private", ), static=True)
+            ] == ["PrivateStaticMethod"]
+    assert [m.name for m in partition.select(("function", ), ("private", ), static=False)
+            ] == ["MyClass", "operator++", "PrivateMethod"]
+    assert partition.select(("unknown", )) == []
+
+
+def test_member_partition__select_same_order_as_members(cpp_class):
+    partition = MemberPartition(cpp_class.members)
+    kinds = ("function", "variable", "enum")
+    prots = ("protected", "private")
+    for static in (None, True, False):
+        expected = [
+            m for m in cpp_class.members
+            if m.kind in kinds and m.prot in prots and (static is None or m.static == static)
+        ]
+        assert partition.select(kinds, prots, static) == expected
+
+
+def test_insertion_filter__member_partition(cpp_class):
+    insertion_filter = InsertionFilter(members={"kind": "variable"})
+
+    partition = insertion_filter.member_partition(cpp_class)
+    assert partition.members == list(insertion_filter.members(cpp_class))
+    assert insertion_filter.member_partition(cpp_class) is partition
+
+    other_class = Compound("cpp")
+    assert insertion_filter.member_partition(other_class) is not partition
+    assert InsertionFilter().member_partition(cpp_class) is not partition
+
+
+def test_insertion_filter__spec_key():
+    assert InsertionFilter().spec_key() == InsertionFilter().spec_key()
+    assert (InsertionFilter(members=["ALL", "-private"]).spec_key() == InsertionFilter(
+        members=["ALL", "-private"]).spec_key())
+    assert InsertionFilter(members="NONE").spec_key() != InsertionFilter().spec_key()
+    assert (InsertionFilter(members="NONE").spec_key()
+            != InsertionFilter(inner_classes="NONE").spec_key())
+
+
+def test_insertion_filter__pickle(cpp_class):
+    insertion_filter = InsertionFilter(members={"kind": "variable"}, exceptions="NONE")
+    insertion_filter.member_partition(cpp_class)
+
+    copy = pickle.loads(pickle.dumps(insertion_filter))
+    assert copy.spec_key() == insertion_filter.spec_key()
+    assert list(copy.members(cpp_class)) == list(insertion_filter.members(cpp_class))
+    assert copy._partitions == {}
@@ -15,8 +15,10 @@
 Tests for the `asciidoxy.model` module.
 """
 
-from asciidoxy.model import (Compound, EnumValue, Member, Parameter, ReturnValue, ThrowsClause,
-                             TypeRef, InnerTypeReference)
+import json
+
+from asciidoxy.model import (Compound, DescriptionSource, EnumValue, Member, Parameter, ReturnValue,
+                             ThrowsClause, TypeRef, InnerTypeReference, json_repr)
 
 
 def test_minimal_constructed_repr():
@@ -59,3 +61,98 @@ def test_type_ref_to_str():
 
     nested_type_2.nested = [nested_type_1]
     assert str(type_ref) == "const Type< Nested1, const Nested2< Nested1 >* > &"
+
+
+def test_no_instance_dict():
+    for element in (TypeRef("lang"), Parameter(), ReturnValue(), ThrowsClause("lang"),
+                    EnumValue("lang"), Member("lang"), Compound("lang"),
+                    InnerTypeReference("lang")):
+        assert not hasattr(element, "__dict__")
+
+
+def test_defaults():
+    member = Member("lang")
+    assert member.id is None
+    assert member.name == ""
+    assert member.brief == ""
+    assert member.returns is None
+    assert member.static is False
+    assert member.params == []
+
+    assert EnumValue("lang").kind == "enumvalue"
+    assert InnerTypeReference("lang").referred_object is None
+    assert TypeRef("lang").nested is None
+
+
+def test_json_repr():
+    type_ref = TypeRef("lang", "Type")
+    type_ref.id = "lang-type"
+
+    data = json_repr(type_ref)
+    assert data == {
+        "__CLASS__": "TypeRef",
+        "id": "lang-type",
+        "name": "Type",
+        "language": "lang",
+        "namespace": None,
+        "kind": None,
+        "prefix": None,
+        "suffix": None,
+        "nested": None,
+        "args": None,
+    }
+
+
+def test_json_repr__nested():
+    member = Member("lang")
+    member.name = "method"
+    member.params.append(Parameter())
+    member.params[0].name = "arg"
+
+    data = json.loads(json.dumps(member, default=json_repr))
+    assert data["__CLASS__"] == "Member"
+    assert data["name"] == "method"
+    assert data["params"][0]["__CLASS__"] == "Parameter"
+    assert data["params"][0]["name"] == "arg"
+
+
+class _DescriptionSourceMock(DescriptionSource):
+    def __init__(self):
+        self.render_count = 0
+
+    def render(self):
+        self.render_count += 1
+        return "Brief", "Description"
+
+
+def test_described_element__render_on_first_access():
+    source = _DescriptionSourceMock()
+    member = Member("lang")
+    member.set_description_source(source)
+    assert source.render_count == 0
+
+    assert member.brief == "Brief"
+    assert member.description == "Description"
+    assert member.brief == "Brief"
+    assert source.render_count == 1
+
+
+def test_described_element__set_before_rendering():
+    source = _DescriptionSourceMock()
+    compound = Compound("lang")
+    compound.set_description_source(source)
+
+    compound.brief = "Other brief"
+    assert compound.brief == "Other brief"
+    assert compound.description == "Description"
+    assert source.render_count == 1
+
+
+def test_json_repr__renders_descriptions():
+    enum_value = EnumValue("lang")
+    enum_value.set_description_source(_DescriptionSourceMock())
+
+    data = json_repr(enum_value)
+    assert data["brief"] == "Brief"
+    assert data["description"] == "Description"
+    assert "_description_source" not in data